@@ -0,0 +1,242 @@
+"""
+feature_cache.py
+This module caches the feature matrices the linear regression models in parameterised_model.py
+are trained and scored on, so that training every type of model, or training again later, does
+not re-read the splits, join the recent features, drop missing rows and fit the scaler each time.
+
+Each (position, split, variables, data hash) has an entry holding the variables as a contiguous
+float32 array X and the total points as a float32 array y, and the train entry also holds the
+StandardScaler fitted on it. The variables are float32 in the data and the total points are
+integers, so nothing is lost by storing them as float32. The data hash is made from the file the
+split is read from (or the split's values, if the splits are passed in memory) and, if any of the
+variables are joined from them, the recent features table and the understat files, so only a
+change to the variable list or the data makes an entry be built again.
+
+Entries are kept in memory for the rest of the process and saved as .npz files in
+test_and_train_data/feature_cache/, so repeated runs and worker processes load them without
+touching the splits.
+
+Functions
+join_model_variables(gameweeks_df, position_variables):
+Adds the variables a gameweek table lacks from the recent features table and the understat files.
+
+split_data_hash(split, position, position_variables, splits=None):
+Returns the hash of the data a split's matrices are made from.
+
+get_split_matrices(split, position, position_variables, splits=None):
+Returns the cached X and y of a split, building them if the data or variables have changed.
+
+get_position_matrices(position, position_variables, splits=None):
+Returns the X and y of the train, test and validation splits of a position and the fitted scaler.
+
+clear_feature_cache(files=False):
+Empties the in-memory cache, and optionally deletes the saved entries.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn import preprocessing
+
+from src.data import recent_features
+from src.data.create_test_and_train import read_split, read_split_columns, split_source
+from src.data.manifest import hash_file
+from src.data.match_stats import UNDERSTAT_PREFIX, join_understat_features, understat_source_hash
+from src.data.recent_features import join_recent_features
+
+FEATURE_CACHE_LOCATION = str(Path(__file__).parent) + '/../../data/test_and_train_data/feature_cache/'
+SPLITS = ["train", "test", "validation"]
+
+# entries built or loaded in this process, and the hashes of files keyed by their path, size and modification time
+_entries = {}
+_file_hashes = {}
+
+
+def _hash_file(path):
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        _file_hashes[key] = hash_file(path)
+    return _file_hashes[key]
+
+
+def join_model_variables(gameweeks_df, position_variables):
+    """
+    Adds the variables of a model a gameweek table lacks, the understat_ variables from the
+    understat files (see match_stats.py) and the rest from the recent features table (see
+    recent_features.py).
+
+    Parameters
+    ----------
+    gameweeks_df : pd.DataFrame
+        A gameweek table, e.g. one of the test and train splits.
+    position_variables : list
+        The variables of the model.
+
+    Returns
+    -------
+    pd.DataFrame
+        The gameweek table with every variable, with the same index and row order.
+    """
+    return join_recent_features(join_understat_features(gameweeks_df, position_variables), position_variables)
+
+
+def split_data_hash(split, position, position_variables, splits=None):
+    """
+    Returns the hash of the data a split's matrices are made from: the file the split is read
+    from, or the values of its variables and total points if the splits are passed in, and the
+    recent features table or understat files if any of the variables joined from them are not in
+    the split.
+
+    Parameters
+    ----------
+    split : str
+        "train", "test" or "validation".
+    position : str
+        "fwd", "mid", "def" or "gk".
+    position_variables : list
+        The variables of the position's model.
+    splits : dict, optional
+        The splits from make_splits. Default is the splits read with read_split.
+
+    Returns
+    -------
+    str
+        The hash.
+    """
+    sha = hashlib.sha256()
+    if splits is not None:
+        split_df = splits[(split, position)]
+        columns = list(split_df.columns)
+        used = [column for column in position_variables + ["total_points"] if column in columns]
+        sha.update(pd.util.hash_pandas_object(split_df[used], index=False).to_numpy().tobytes())
+    else:
+        columns = read_split_columns(split, position)
+        sha.update(_hash_file(split_source(split, position)).encode())
+
+    joined = [variable for variable in position_variables if variable not in columns]
+    if any(not variable.startswith(UNDERSTAT_PREFIX) for variable in joined):
+        sha.update(_hash_file(recent_features.data_directory_location + recent_features.FEATURE_TABLE).encode())
+    if any(variable.startswith(UNDERSTAT_PREFIX) for variable in joined):
+        sha.update(understat_source_hash().encode())
+    return sha.hexdigest()
+
+
+def _cache_key(position, split, position_variables, data_hash):
+    key = json.dumps([position, split, list(position_variables), data_hash])
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def _cache_path(position, split, key):
+    return FEATURE_CACHE_LOCATION + position + "_" + split + "_" + key + ".npz"
+
+
+def _make_scaler(mean, scale, var, n_samples_seen):
+    scaler = preprocessing.StandardScaler()
+    scaler.mean_, scaler.scale_, scaler.var_ = mean, scale, var
+    scaler.n_samples_seen_ = int(n_samples_seen)
+    scaler.n_features_in_ = len(mean)
+    return scaler
+
+
+def _build_entry(split, position, position_variables, splits):
+    split_df = splits[(split, position)] if splits is not None else read_split(split, position)
+    split_df = join_model_variables(split_df, position_variables).dropna(subset=position_variables)
+    entry = {"X": np.ascontiguousarray(split_df[position_variables].to_numpy(dtype=np.float32)),
+             "y": split_df["total_points"].to_numpy(dtype=np.float32)}
+    if split == "train":
+        if len(split_df) == 0:
+            # e.g. understat_ variables, which are missing for the seasons without understat files
+            raise ValueError(f"No rows of the train split of {position} have every variable of {position_variables}")
+        # fitted in float64, as the models are
+        entry["scaler"] = preprocessing.StandardScaler().fit(entry["X"].astype(np.float64))
+    return entry
+
+
+def _save_entry(path, entry):
+    arrays = {"X": entry["X"], "y": entry["y"]}
+    if "scaler" in entry:
+        scaler = entry["scaler"]
+        arrays.update(mean=scaler.mean_, scale=scaler.scale_, var=scaler.var_,
+                      n_samples_seen=np.asarray(scaler.n_samples_seen_))
+    os.makedirs(FEATURE_CACHE_LOCATION, exist_ok=True)
+    # write then rename so an interrupted write, or another process writing the same entry, does not leave a
+    # broken file
+    temporary_path = path[:-len(".npz")] + "." + str(os.getpid()) + ".tmp.npz"
+    np.savez(temporary_path, **arrays)
+    os.replace(temporary_path, path)
+
+
+def _load_entry(path):
+    with np.load(path) as arrays:
+        entry = {"X": arrays["X"], "y": arrays["y"]}
+        if "mean" in arrays:
+            entry["scaler"] = _make_scaler(arrays["mean"], arrays["scale"], arrays["var"], arrays["n_samples_seen"])
+    return entry
+
+
+def _get_entry(split, position, position_variables, splits=None):
+    key = _cache_key(position, split, position_variables,
+                     split_data_hash(split, position, position_variables, splits))
+    if key not in _entries:
+        path = _cache_path(position, split, key)
+        if os.path.exists(path):
+            _entries[key] = _load_entry(path)
+        else:
+            _entries[key] = _build_entry(split, position, position_variables, splits)
+            _save_entry(path, _entries[key])
+    return _entries[key]
+
+
+def get_split_matrices(split, position, position_variables, splits=None):
+    """
+    Returns the feature matrix of a split, from the cache if the variables and data are unchanged.
+
+    Parameters
+    ----------
+    split : str
+        "train", "test" or "validation".
+    position : str
+        "fwd", "mid", "def" or "gk".
+    position_variables : list
+        The variables of the position's model, in the order of the columns of X.
+    splits : dict, optional
+        The splits from make_splits. Default is the splits read with read_split.
+
+    Returns
+    -------
+    tuple
+        The float32 variables X, one row per gameweek with none missing, and total points y.
+    """
+    entry = _get_entry(split, position, position_variables, splits)
+    return entry["X"], entry["y"]
+
+
+def get_position_matrices(position, position_variables, splits=None):
+    """
+    Returns the feature matrices of every split of a position and the StandardScaler fitted on
+    the train split.
+
+    Returns
+    -------
+    dict
+        The (X, y) of "train", "test" and "validation", and the "scaler".
+    """
+    matrices = {split: get_split_matrices(split, position, position_variables, splits) for split in SPLITS}
+    matrices["scaler"] = _get_entry("train", position, position_variables, splits)["scaler"]
+    return matrices
+
+
+def clear_feature_cache(files=False):
+    """
+    Empties the in-memory cache, and deletes the saved entries if files is True.
+    """
+    _entries.clear()
+    if files and os.path.isdir(FEATURE_CACHE_LOCATION):
+        for file_name in os.listdir(FEATURE_CACHE_LOCATION):
+            if file_name.endswith(".npz"):
+                os.remove(FEATURE_CACHE_LOCATION + file_name)
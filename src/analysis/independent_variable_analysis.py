@@ -17,7 +17,8 @@ Get a list of tuples representing the top performing parameters for a given posi
 
 get_results_dict(iterations: int) -> Dict[str, Any]:
 Get a dictionary containing the results of the variable evaluation for each season, position, and parameter using
-parallel programming to make it go faster.
+parallel programming to make it go faster. The seasons are loaded once into a SeasonCatalog which is shared with the
+worker processes.
 
 Usage:
 To use this module, run the script and obtain the results of variable evaluation for different positions and seasons.
@@ -27,6 +28,7 @@ The resulting data is saved as a pickle file for further analysis and visualizat
 import numpy as np
 from src.utils.calculate_performance import calculate_players_performance_random
 from src.data.player_data import PlayerData
+from src.data.season_catalog import SeasonCatalog
 import pandas as pd
 import pickle
 from concurrent.futures import ProcessPoolExecutor
@@ -34,6 +36,21 @@ from multiprocessing import freeze_support
 
 pd.options.mode.chained_assignment = None  # default='warn'
 
+# catalog of every season's gameweeks for this worker process, set by set_worker_catalog
+worker_catalog = None
+
+
+def set_worker_catalog(catalog):
+    """
+    Sets the season catalog used by evaluate_variables_performance in this process. Used as the initializer of the
+    worker processes so each worker is given the seasons loaded by the parent rather than reading them itself.
+
+    Args:
+        catalog (SeasonCatalog): The loaded season catalog.
+    """
+    global worker_catalog
+    worker_catalog = catalog
+
 
 def evaluate_variables_performance(season, position, iterations):
     """
@@ -50,8 +67,11 @@ def evaluate_variables_performance(season, position, iterations):
     Raises:
         ValueError: If the given season is not a valid season or the given position is not a valid position.
     """
-    # define player data object to obtain player data
-    player_data = PlayerData(season)
+    # define player data object to obtain player data, taken from the catalog if one has been loaded
+    if worker_catalog is not None:
+        player_data = worker_catalog.get_player_data(season)
+    else:
+        player_data = PlayerData(season)
 
     parameters = ["no_transfers", "transfers_on_was_home", "transfers_on_was_away",
                   "transfers_on_higher_recent_total_points",
@@ -254,8 +274,12 @@ def get_results_dict(iterations):
     Returns:
         Dict[str, Any]: A dictionary containing the results of the variable evaluation for each season, position, and parameter.
     """
+    # load every season once here and hand the catalog to each worker, rather than each evaluation reading its season
+    catalog = SeasonCatalog(["2016-17", "2017-18", "2018-19", "2019-20", "2020-21"])
+    catalog.get_all_gameweeks()
+
     # allows use of multiple processes to run the code concurrently
-    with ProcessPoolExecutor() as executor:
+    with ProcessPoolExecutor(initializer=set_worker_catalog, initargs=(catalog,)) as executor:
         results = {
             # results for 2016-17
             "gk_2016-17": executor.submit(evaluate_variables_performance, "2016-17", "GK", iterations),
@@ -0,0 +1,220 @@
+"""
+model_store.py
+This module stores the trained linear regression models of parameterised_model.py as versioned
+artifacts, so a model is only trained again if its type, position, variables, data or
+hyperparameters have changed, and its results can be loaded without training or unpickling
+sklearn objects.
+
+Each artifact is an .npz file in test_and_train_data/models/ named by the model type, position
+and a key hashed from the type, position, variables, data hash and hyperparameters. It holds
+the coefficients and intercept of the model, the mean and scale of the scaler fitted on the
+train split, the errors and r squared on the test and validation splits, the predicted points
+of the test split, the alpha and cross validation curve of lasso and ridge models, and the
+metadata the key was made from with the time the model was trained. Artifacts of a model made
+from other variables or data are kept, so earlier versions can still be loaded.
+
+Functions
+artifact_key(type, position, variables, data_hash, hyperparameters):
+Returns the key of the artifact of a model.
+
+has_artifact(type, position, key):
+Returns True if the artifact has been saved.
+
+save_artifact(type, position, key, position_results, scaler, metadata):
+Saves the results of a model and the scaler of its variables as an artifact.
+
+load_artifact(type, position, key):
+Loads the results of a model from its artifact.
+
+list_artifacts(type=None, position=None):
+Returns a table of the saved artifacts, oldest first.
+
+load_latest_artifact(type, position):
+Loads the results of the most recently trained model of a type and position.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MODEL_STORE_LOCATION = str(Path(__file__).parent) + '/../../data/test_and_train_data/models/'
+METRICS = ["mean_absolute_error", "root_mean_squared_error", "r_squared"]
+
+
+def artifact_key(type, position, variables, data_hash, hyperparameters):
+    """
+    Returns the key of the artifact of a model, a hash of everything the trained model depends on.
+
+    Parameters
+    ----------
+    type : str
+        Type of linear regression model, "standard", "lasso" or "ridge".
+    position : str
+        The position, "fwd", "mid", "def" or "gk".
+    variables : list
+        The variables of the model, in order.
+    data_hash : str
+        The hash of the data the model is trained and scored on.
+    hyperparameters : dict
+        The hyperparameters of the model, e.g. the alphas searched. Must be JSON serialisable.
+
+    Returns
+    -------
+    str
+        The key.
+    """
+    key = json.dumps([type, position, list(variables), data_hash, hyperparameters], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def _artifact_path(type, position, key):
+    return MODEL_STORE_LOCATION + type + "_" + position + "_" + key + ".npz"
+
+
+def has_artifact(type, position, key):
+    """
+    Returns True if the artifact of a model has been saved.
+    """
+    return os.path.exists(_artifact_path(type, position, key))
+
+
+def save_artifact(type, position, key, position_results, scaler, metadata):
+    """
+    Saves the results of a model and the scaler of its variables as arrays in an .npz file.
+
+    Parameters
+    ----------
+    type, position, key : str
+        The type and position of the model and the key from artifact_key.
+    position_results : dict
+        The results of the model, from fit_position_model in parameterised_model.py.
+    scaler : sklearn.preprocessing.StandardScaler
+        The scaler fitted on the variables of the train split.
+    metadata : dict
+        What the key was made from, saved with the time the artifact was made. Must be JSON
+        serialisable.
+
+    Returns
+    -------
+    str
+        The path of the artifact.
+    """
+    test_results = position_results["test"]
+    model = test_results["model"]
+    cv_curve = position_results.get("cv_curve")
+    metadata = {**metadata, "type": type, "position": position, "key": key,
+                "created": datetime.now().isoformat()}
+    arrays = {
+        "variables": np.asarray(test_results["variables"], dtype=str),
+        "coefficients": np.asarray(model.coef_, dtype=np.float64),
+        "intercept": np.asarray(model.intercept_, dtype=np.float64),
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+        "test_metrics": np.array([test_results[metric] for metric in METRICS]),
+        "validation_metrics": np.array([position_results["validation"][metric] for metric in METRICS]),
+        "predicted_points": np.asarray(test_results["predicted_points"], dtype=np.float64),
+        "optimal_alpha": np.asarray(position_results.get("optimal_alpha", np.nan), dtype=np.float64),
+        "cv_alphas": cv_curve.index.to_numpy(dtype=np.float64) if cv_curve is not None else np.empty(0),
+        "cv_scores": cv_curve.to_numpy(dtype=np.float64) if cv_curve is not None else np.empty(0),
+        "metadata": np.asarray(json.dumps(metadata))
+    }
+
+    path = _artifact_path(type, position, key)
+    os.makedirs(MODEL_STORE_LOCATION, exist_ok=True)
+    # write then rename so an interrupted write, or another process saving the same model, does not leave a broken
+    # artifact
+    temporary_path = path[:-len(".npz")] + "." + str(os.getpid()) + ".tmp.npz"
+    np.savez(temporary_path, **arrays)
+    os.replace(temporary_path, path)
+    return path
+
+
+def _read_artifact(path):
+    with np.load(path) as arrays:
+        variables = arrays["variables"].tolist()
+        coefficients = arrays["coefficients"]
+
+        position_results = {"intercept": float(arrays["intercept"]),
+                            "scaler_mean": arrays["scaler_mean"],
+                            "scaler_scale": arrays["scaler_scale"],
+                            "metadata": json.loads(arrays["metadata"].item())}
+        for split in ["test", "validation"]:
+            position_results[split] = {"variables": variables, "coefficients": coefficients,
+                                       **dict(zip(METRICS, arrays[split + "_metrics"].tolist()))}
+        position_results["test"]["predicted_points"] = arrays["predicted_points"]
+
+        if not np.isnan(arrays["optimal_alpha"]):
+            position_results["optimal_alpha"] = float(arrays["optimal_alpha"])
+            position_results["cv_curve"] = pd.Series(arrays["cv_scores"],
+                                                     index=pd.Index(arrays["cv_alphas"], name="alpha"),
+                                                     name="mean_r_squared")
+    return position_results
+
+
+def load_artifact(type, position, key):
+    """
+    Loads the results of a model from its artifact. These are the results fit_position_model
+    gives, without the sklearn model, and with the intercept of the model, the scaler_mean and
+    scaler_scale of its variables and the metadata of the artifact.
+
+    Returns
+    -------
+    dict
+        The results of the model.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the artifact has not been saved.
+    """
+    return _read_artifact(_artifact_path(type, position, key))
+
+
+def list_artifacts(type=None, position=None):
+    """
+    Returns a table of the metadata of the saved artifacts, oldest first.
+
+    Parameters
+    ----------
+    type : str, optional
+        Only list models of this type. Default is every type.
+    position : str, optional
+        Only list models of this position. Default is every position.
+
+    Returns
+    -------
+    pd.DataFrame
+        The type, position, key, variables, data hash, hyperparameters and time made of each
+        artifact.
+    """
+    pattern = MODEL_STORE_LOCATION + (type or "*") + "_" + (position or "*") + "_*.npz"
+    rows = []
+    for path in glob.glob(pattern):
+        if path.endswith(".tmp.npz"):
+            continue
+        with np.load(path) as arrays:
+            rows.append(json.loads(arrays["metadata"].item()))
+    columns = ["type", "position", "key", "variables", "data_hash", "hyperparameters", "created"]
+    artifacts_df = pd.DataFrame(rows, columns=columns)
+    return artifacts_df.sort_values("created", ignore_index=True)
+
+
+def load_latest_artifact(type, position):
+    """
+    Loads the results of the most recently trained model of a type and position.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no model of the type and position has been saved.
+    """
+    artifacts_df = list_artifacts(type, position)
+    if artifacts_df.empty:
+        raise FileNotFoundError(f"No {type} model for {position} has been saved in {MODEL_STORE_LOCATION}")
+    return load_artifact(type, position, artifacts_df["key"].iloc[-1])
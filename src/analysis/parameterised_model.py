@@ -5,28 +5,77 @@ historical football player performance data for each position (Forward, Midfield
 and Goalkeeper) and predicts the total points scored for given test and validation datasets.
 
 Functions
-get_linear_regression_results(type, add_predicted_points_to_file=False):
+get_linear_regression_results(type, add_predicted_points_to_file=False, variables=None, splits=None,
+                              retrain=False):
 Trains a specified type of linear regression model on the training data and predicts total
 points for test and validation datasets, printing the results to the console. Optionally,
-the predicted points can be added to a file.
+the predicted points can be added to a file. Variables which are not in the data files are
+taken from the recent features table (see recent_features.py), or for understat_ variables
+from the understat files (see match_stats.py). The splits are read with
+read_split from create_test_and_train.py, or can be passed in from make_splits. The alphas
+of lasso and ridge models are chosen by cross validation along a regularisation path (see
+regularisation_path.py) and reported with their cross validation curve. The models are trained
+on feature matrices from the feature cache (see feature_cache.py), so the splits are only read
+again if the variables or the data have changed.
+
+load_position_data(position, position_variables, splits=None):
+Returns the train, test and validation data of a position with the rows missing a variable dropped.
+
+fit_position_model(type, position, position_variables, matrices, verbose=True):
+Trains a model of one type for one position and returns its results on the test and validation data.
+
+print_position_results(type, position, position_results):
+Prints the results of a model on the test and validation data.
+
+model_hyperparameters(type):
+Returns the hyperparameters a model of a type is trained with.
+
+get_position_model(type, position, position_variables, splits=None, retrain=False, verbose=True):
+Loads a model of one type for one position from the model store (see model_store.py), or
+trains and saves it if the same model has not been trained before.
+
+train_position_model(type, position, variables=None, splits=None, retrain=False):
+Trains or loads a model of one type for one position, without printing.
+
+train_models(types=None, variables=None, splits=None, max_workers=None, retrain=False):
+Trains every type of model for every position concurrently in a process pool, returning their
+results and a table comparing them.
+
+sweep_recent_windows(type, windows=None, half_lives=None):
+Trains the models with the recent_ variables over each trailing window and decayed sum in
+the recent features table, returning the average mean absolute errors of each.
+
+Usage
+Run the script to train the standard model and save it in the model store, or add --compare to
+train every type of model for every position concurrently and compare them. Models already in
+the store are loaded rather than trained, unless --retrain is added:
+$ python parameterised_model.py --compare
 
 Notes
 This module assumes that the data files are located in a folder relative to the script.
 The data_location variable should be set accordingly.
 Requires the following libraries: numpy, pandas, scikit-learn, pathlib
-The results_dict will store model results, including Mean Absolute Error (MAE),
+The results of each position are returned, including Mean Absolute Error (MAE),
 Root Mean Squared Error (RMSE), R-squared, and model coefficients.
 """
 
-import pickle
+import hashlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression, Lasso, Ridge
+from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn import preprocessing
 from pathlib import Path
 
-from sklearn.model_selection import GridSearchCV
+from src.data.recent_features import (window_feature_name, decayed_feature_name, FEATURE_WINDOWS,
+                                      FEATURE_HALF_LIVES)
+from src.analysis.feature_cache import get_position_matrices, join_model_variables, split_data_hash
+from src.analysis.model_store import MODEL_STORE_LOCATION, artifact_key, has_artifact, load_artifact, save_artifact
+from src.analysis.regularisation_path import fit_lasso_cv, fit_ridge_cv
+from src.data.create_test_and_train import read_split
+from src.data.schema import kickoff_time_to_string, RECENT_PREFIX
 
 data_location = str(Path(__file__).parent) + '/../../data/test_and_train_data/'
 
@@ -41,10 +90,233 @@ variables_dict = {
            "recent_minutes", "was_home"]
 }
 
-results_dict = {}
+# alphas searched by cross validation for the lasso and ridge models
+lasso_alphas = np.arange(0.00001, 0.002, 0.00001)
+ridge_alphas = np.arange(1, 320, 1)
+
+positions = ["fwd", "mid", "def", "gk"]
+model_types = ["standard", "lasso", "ridge"]
+
+
+def load_position_data(position, position_variables, splits=None):
+    """
+    Returns the train, test and validation data of a position, with any variables not in the
+    data joined with join_model_variables and the rows missing a variable dropped.
+
+    Parameters
+    ----------
+    position : str
+        The position, "fwd", "mid", "def" or "gk".
+    position_variables : list
+        The variables of the position's model.
+    splits : dict, optional
+        The splits from make_splits. Default is reading the position's splits with read_split.
+
+    Returns
+    -------
+    tuple
+        The train, test and validation pd.DataFrames.
+    """
+    position_data = []
+    for split in ["train", "test", "validation"]:
+        split_df = splits[(split, position)] if splits is not None else read_split(split, position)
+        position_data.append(join_model_variables(split_df, position_variables).dropna(subset=position_variables))
+    return tuple(position_data)
+
+
+def fit_position_model(type, position, position_variables, matrices, verbose=True):
+    """
+    Trains a linear regression model of one type for one position on the train split and scores
+    it on the test and validation splits.
 
+    Parameters
+    ----------
+    type : str
+        Type of linear regression model to be used. Can be "standard", "lasso", or "ridge".
+    position : str
+        The position, used when printing the results.
+    position_variables : list
+        The variables of the model.
+    matrices : dict
+        The feature matrices of the position and the scaler fitted on its train split, from
+        get_position_matrices in feature_cache.py.
+    verbose : bool, optional
+        If True, the results are printed to the console. Default is True.
+
+    Returns
+    -------
+    dict
+        The "test" and "validation" results (variables, coefficients, errors, r squared, model and,
+        for the test set, the predicted_points), and the optimal_alpha and cv_curve of lasso and
+        ridge models.
+
+    Raises
+    ------
+    ValueError
+        If the type is not one of the following: "standard", "lasso", or "ridge".
+    """
+    # Get training data separated into objective value and variables, and scale the variables with
+    # the scaler fitted on them for standardisation and interpretability
+    # the matrices are float32 in the cache, the models are fitted in float64
+    scaler = matrices["scaler"]
+    X_train, Y_train = matrices["train"]
+    X_train_scaled = scaler.transform(X_train.astype(np.float64))
+    Y_train = Y_train.astype(np.float64)
+
+    # Get test data separated into objective value and variables, also scale variables
+    X_test, Y_test = matrices["test"]
+    X_test_scaled = scaler.transform(X_test.astype(np.float64))
+    Y_test = Y_test.astype(np.float64)
+
+    # Get validation data separated into objective value and variables, also scale variables
+    X_validation, Y_validation = matrices["validation"]
+    X_validation_scaled = scaler.transform(X_validation.astype(np.float64))
+    Y_validation = Y_validation.astype(np.float64)
+
+    # Create and train a linear regression model, choosing the alpha of lasso and ridge models by
+    # 5-fold cross validation over the whole path of alphas, as GridSearchCV would
+    if type == "standard":
+        model = LinearRegression().fit(X_train_scaled, Y_train)
+    elif type == "lasso":
+        model, cv_curve = fit_lasso_cv(X_train_scaled, Y_train, lasso_alphas)
+    elif type == "ridge":
+        model, cv_curve = fit_ridge_cv(X_train_scaled, Y_train, ridge_alphas)
+    else:
+        raise ValueError(f"Type {type} is not one of standard, lasso or ridge")
+
+    # Use the model to predict the number of points earned by the test samples
+    Y_pred = model.predict(X_test_scaled)
+
+    # Calculate the mean absolute error and root mean squared error
+    mae = mean_absolute_error(Y_test, Y_pred)
+    rmse = mean_squared_error(Y_test, Y_pred, squared=False)
+    r2 = r2_score(Y_test, Y_pred)
+
+    position_results = {}
+
+    position_results["test"] = {
+        "variables": position_variables,
+        "coefficients": model.coef_,
+        "mean_absolute_error": mae,
+        "root_mean_squared_error": rmse,
+        "r_squared": r2,
+        "model": model,
+        "predicted_points": Y_pred
+    }
+
+    if type == "lasso" or type == "ridge":
+        position_results["optimal_alpha"] = model.alpha
+        position_results["cv_curve"] = cv_curve
+
+    # Use the model to predict the number of points earned by the validation samples
+    Y_pred_valid = model.predict(X_validation_scaled)
+
+    # Calculate the mean absolute error and root mean squared error
+    mae_valid = mean_absolute_error(Y_validation, Y_pred_valid)
+    rmse_valid = mean_squared_error(Y_validation, Y_pred_valid, squared=False)
+    r2_valid = r2_score(Y_validation, Y_pred_valid)
+
+    position_results["validation"] = {
+        "variables": position_variables,
+        "coefficients": model.coef_,
+        "mean_absolute_error": mae_valid,
+        "root_mean_squared_error": rmse_valid,
+        "r_squared": r2_valid,
+        "model": model
+    }
+
+    if verbose:
+        print_position_results(type, position, position_results)
+
+    return position_results
+
+
+def print_position_results(type, position, position_results):
+    """
+    Prints the results of a model on the test and validation sets, and its alpha if it is a lasso
+    or ridge model.
+    """
+    test_results = position_results["test"]
+    print(f"----------------------------------------For {position}, the test set:")
+    print(f"Mean absolute error: {test_results['mean_absolute_error']}")
+    print(f"Root mean squared error: {test_results['root_mean_squared_error']}")
+    print(f"R squared value: {test_results['r_squared']}")
+
+    if "optimal_alpha" in position_results:
+        # the lasso alpha is chosen by scoring the best alphas of the path again, so it need not be the best of the
+        # curve
+        cv_curve = position_results["cv_curve"]
+        print(f"Alpha value for {type} model: {position_results['optimal_alpha']}, with cross validation R squared "
+              f"{cv_curve.loc[position_results['optimal_alpha']]} (from {cv_curve.min()} to {cv_curve.max()} over "
+              f"the alphas)")
+
+    validation_results = position_results["validation"]
+    print(f"------------------------------------------------For {position}, the validation set:")
+    print(f"Mean absolute error: {validation_results['mean_absolute_error']}")
+    print(f"Root mean squared error: {validation_results['root_mean_squared_error']}")
+    print(f"R squared value: {validation_results['r_squared']}")
+    print(f"Coefficients: {validation_results['coefficients']}")
+
+
+def model_hyperparameters(type):
+    """
+    Returns the hyperparameters a model of a type is trained with, which are part of the key of
+    its artifact in the model store.
+    """
+    if type == "lasso":
+        return {"alphas": lasso_alphas.tolist(), "n_folds": 5, "n_candidates": 10}
+    if type == "ridge":
+        return {"alphas": ridge_alphas.tolist(), "n_folds": 5}
+    return {}
+
+
+def get_position_model(type, position, position_variables, splits=None, retrain=False, verbose=True):
+    """
+    Returns the results of a model of one type for one position, loading them from the model
+    store (see model_store.py) if a model of the same type, position, variables, data and
+    hyperparameters has been trained before, otherwise training the model and saving it.
+
+    Parameters
+    ----------
+    type : str
+        Type of linear regression model to be used. Can be "standard", "lasso", or "ridge".
+    position : str
+        The position, "fwd", "mid", "def" or "gk".
+    position_variables : list
+        The variables of the model.
+    splits : dict, optional
+        The splits from make_splits. Default is the splits read with read_split.
+    retrain : bool, optional
+        If True, the model is trained and saved even if it is in the store. Default is False.
+    verbose : bool, optional
+        If True, the results are printed to the console. Default is True.
 
-def get_linear_regression_results(type, add_predicted_points_to_file=False):
+    Returns
+    -------
+    dict
+        The results of the position, from fit_position_model or, without the sklearn model, from
+        load_artifact.
+    """
+    data_hash = hashlib.sha256("".join(split_data_hash(split, position, position_variables, splits)
+                                       for split in ["train", "test", "validation"]).encode()).hexdigest()
+    hyperparameters = model_hyperparameters(type)
+    key = artifact_key(type, position, position_variables, data_hash, hyperparameters)
+
+    if not retrain and has_artifact(type, position, key):
+        position_results = load_artifact(type, position, key)
+        if verbose:
+            print_position_results(type, position, position_results)
+        return position_results
+
+    matrices = get_position_matrices(position, position_variables, splits)
+    position_results = fit_position_model(type, position, position_variables, matrices, verbose)
+    save_artifact(type, position, key, position_results, matrices["scaler"],
+                  {"variables": list(position_variables), "data_hash": data_hash, "hyperparameters": hyperparameters})
+    return position_results
+
+
+def get_linear_regression_results(type, add_predicted_points_to_file=False, variables=None, splits=None,
+                                  retrain=False):
     """
     Trains a linear regression model on the train_data for each position and then predicts
     total_points for the test_data and validation_data. The results of the predictions are
@@ -58,10 +330,21 @@ def get_linear_regression_results(type, add_predicted_points_to_file=False):
     add_predicted_points_to_file : bool, optional
         If True, the predicted points for each player will be added to a new file.
         Default is False.
+    variables : dict, optional
+        The variables to use for each position. Variables which are not in the data files,
+        e.g. recent_total_points_8 or understat_xG, are joined from the recent features table
+        or the understat files. Default is variables_dict.
+    splits : dict, optional
+        The train, test and validation data of each position, from make_splits in
+        create_test_and_train.py, so that they do not have to be written and read again.
+        Default is reading them with read_split.
+    retrain : bool, optional
+        If True, the models are trained even if they are in the model store. Default is False.
 
     Returns
     -------
-    None
+    dict
+        The results of each position, from get_position_model.
 
     Raises
     ------
@@ -74,120 +357,23 @@ def get_linear_regression_results(type, add_predicted_points_to_file=False):
     The data_location variable should be set accordingly.
     """
     list_of_positions_with_pp = []
+    if variables is None:
+        variables = variables_dict
+    results = {}
 
-    for position in ["fwd", "mid", "def", "gk"]:
-
-        # Split the data into train, test and validation sets
-        train_data = pd.read_csv(data_location + position + "s_train.csv", encoding="utf-8", low_memory=False)
-        train_data = train_data.dropna(subset=variables_dict[position])
-        test_data = pd.read_csv(data_location + position + "s_test.csv", encoding="utf-8", low_memory=False)
-        test_data = test_data.dropna(subset=variables_dict[position])
-        validation_data = pd.read_csv(data_location + position + "s_validation.csv", encoding="utf-8", low_memory=False)
-        validation_data = validation_data.dropna(subset=variables_dict[position])
-
-        # Get training data separated into objective value and variables, also fit scalar and scale variables
-        X_train = train_data[variables_dict[position]]
-        # Fit scaler for standardisation and interpretability
-        scaler = preprocessing.StandardScaler().fit(X_train)
-        X_train_scaled = scaler.transform(X_train)
-        Y_train = train_data['total_points']
-
-        # Get test data separated into objective value and variables, also scale variables
-        X_test = test_data[variables_dict[position]]
-        X_test_scaled = scaler.transform(X_test)
-        Y_test = test_data['total_points']
-
-        # Get test data separated into objective value and variables, also scale variables
-        X_validation = validation_data[variables_dict[position]]
-        X_validation_scaled = scaler.transform(X_validation)
-        Y_validation = validation_data['total_points']
-
-        # Create a linear regression model
-        if type == "standard":
-            model = LinearRegression()
-        elif type == "lasso":
-            # Use GridSearchCV to find the best alpha
-            alphas = np.arange(0.00001, 0.002, 0.00001)
-            model = GridSearchCV(Lasso(), {'alpha': alphas})
-        elif type == "ridge":
-            # Use GridSearchCV to find the best alpha
-            alphas = np.arange(1, 320, 1)
-            model = GridSearchCV(Ridge(), {'alpha': alphas})
-
-        # Train the model on the training data
-        model.fit(X_train_scaled, Y_train)
-
-        if type != "standard":
-            # print(model.cv_results_)
-            model = model.best_estimator_
-
-        # Use the model to predict the number of points earned by the test samples
-        Y_pred = model.predict(X_test_scaled)
+    for position in positions:
+        results[position] = get_position_model(type, position, variables[position], splits, retrain)
 
         if add_predicted_points_to_file:
-            test_data["predicted_points"] = Y_pred
-            list_of_positions_with_pp.append(test_data)
-
-        # Calculate the mean absolute error and root mean squared error
-        mae = mean_absolute_error(Y_test, Y_pred)
-        rmse = mean_squared_error(Y_test, Y_pred, squared=False)
-        r2 = r2_score(Y_test, Y_pred)
-
-        # Initialise results key for position
-        results_dict[position] = {}
-
-        results_dict[position]["test"] = {
-            "variables": variables_dict[position],
-            "coefficients": model.coef_,
-            "mean_absolute_error": mae,
-            "root_mean_squared_error": rmse,
-            "r_squared": r2,
-            "model": model
-        }
-
-        # Print the results for test
-        print(f"----------------------------------------For {position}, the test set:")
-        print(f"Mean absolute error: {mae}")
-        print(f"Root mean squared error: {rmse}")
-        print(f"R squared value: {r2}")
-
-        if type == "lasso" or type == "ridge":
-            results_dict[position]["optimal_alpha"] = model.alpha
-            print(f"Alpha value for {type} model: {model.alpha}")
-
-        # Use the model to predict the number of points earned by the validation samples
-        Y_pred_valid = model.predict(X_validation_scaled)
-
-        # Calculate the mean absolute error and root mean squared error
-        mae_valid = mean_absolute_error(Y_validation, Y_pred_valid)
-        rmse_valid = mean_squared_error(Y_validation, Y_pred_valid, squared=False)
-        r2_valid = r2_score(Y_validation, Y_pred_valid)
-
-        results_dict[position]["validation"] = {
-            "variables": variables_dict[position],
-            "coefficients": model.coef_,
-            "mean_absolute_error": mae_valid,
-            "root_mean_squared_error": rmse_valid,
-            "r_squared": r2_valid,
-            "model": model
-        }
-
-        # Print the results for validation
-        print(f"------------------------------------------------For {position}, the validation set:")
-        print(f"Mean absolute error: {mae_valid}")
-        print(f"Root mean squared error: {rmse_valid}")
-        print(f"R squared value: {r2_valid}")
-        print(f"Coefficients: {model.coef_}")
-
-        if type == "lasso" or type == "ridge":
-            results_dict[position]["optimal_alpha"] = model.alpha
-            print(f"Alpha value for {type} model: {model.alpha}")
+            _, test_data, _ = load_position_data(position, variables[position], splits)
+            list_of_positions_with_pp.append(
+                test_data.assign(predicted_points=results[position]["test"]["predicted_points"]))
 
     list_of_mae_test = []
     list_of_mae_valid = []
-    for position in ["fwd", "mid", "def", "gk"]:
-        list_of_mae_test.append(results_dict[position]["test"]["mean_absolute_error"])
-        list_of_mae_valid.append(results_dict[position]["validation"]["mean_absolute_error"])
+    for position in positions:
+        list_of_mae_test.append(results[position]["test"]["mean_absolute_error"])
+        list_of_mae_valid.append(results[position]["validation"]["mean_absolute_error"])
 
     print("------------------------------------------------------------------------------------------")
     print(f"The average mae on the test for {type} is {sum(list_of_mae_test) / len(list_of_mae_test)}")
@@ -195,15 +381,134 @@ def get_linear_regression_results(type, add_predicted_points_to_file=False):
 
     if add_predicted_points_to_file:
         merged_gw_df = pd.concat(list_of_positions_with_pp, axis=0)
+        merged_gw_df["kickoff_time"] = kickoff_time_to_string(merged_gw_df["kickoff_time"])
         merged_gw_df.to_csv(data_location + "2021-22_merged_gws_alpha.csv", encoding="utf-8-sig", index=False)
         print(f"File 2021-22_merged_gws_alpha.csv made at {data_location}")
 
+    return results
+
+
+def sweep_recent_windows(type, windows=None, half_lives=None):
+    """
+    Trains the models of each position with their recent_ variables swapped for each trailing window
+    and decayed sum in the recent features table, e.g. recent_assists for recent_assists_3, to compare
+    how far back the recent statistics should look.
+
+    Parameters
+    ----------
+    type : str
+        Type of linear regression model to be used. Can be "standard", "lasso", or "ridge".
+    windows : list, optional
+        The trailing windows to compare. Default is FEATURE_WINDOWS.
+    half_lives : list, optional
+        The half lives of the decayed sums to compare. Default is FEATURE_HALF_LIVES.
+
+    Returns
+    -------
+    pd.DataFrame
+        The average mean absolute error on the test and validation sets of each window.
+    """
+    windows = FEATURE_WINDOWS if windows is None else windows
+    half_lives = FEATURE_HALF_LIVES if half_lives is None else half_lives
+    # (label, function giving the feature name of a column) of each window and decayed sum
+    feature_names = [(str(window), partial(window_feature_name, window=window)) for window in windows]
+    feature_names += [("ewm" + str(half_life), partial(decayed_feature_name, half_life=half_life))
+                      for half_life in half_lives]
+
+    sweep_results = {}
+    for label, feature_name in feature_names:
+        variables = {position: [feature_name(variable[len(RECENT_PREFIX):]) if variable.startswith(RECENT_PREFIX)
+                                else variable for variable in position_variables]
+                     for position, position_variables in variables_dict.items()}
+        results = get_linear_regression_results(type, variables=variables)
+        sweep_results[label] = {
+            "test_mean_absolute_error": np.mean([results[position]["test"]["mean_absolute_error"]
+                                                 for position in variables]),
+            "validation_mean_absolute_error": np.mean([results[position]["validation"]["mean_absolute_error"]
+                                                       for position in variables])
+        }
+
+    sweep_df = pd.DataFrame.from_dict(sweep_results, orient="index")
+    print(sweep_df)
+    return sweep_df
+
+
+def train_position_model(type, position, variables=None, splits=None, retrain=False):
+    """
+    Trains a model of one type for one position, or loads it from the model store, without
+    printing. Used by train_models in each worker process.
+
+    Returns
+    -------
+    dict
+        The results of the position, from get_position_model.
+    """
+    if variables is None:
+        variables = variables_dict
+    return get_position_model(type, position, variables[position], splits, retrain, verbose=False)
+
+
+def train_models(types=None, variables=None, splits=None, max_workers=None, retrain=False):
+    """
+    Trains a model of every type for every position concurrently, one (type, position) per
+    task in a process pool, and prints a table comparing them.
+
+    Parameters
+    ----------
+    types : list, optional
+        The types of linear regression model to train. Default is model_types.
+    variables : dict, optional
+        The variables to use for each position. Default is variables_dict.
+    splits : dict, optional
+        The splits from make_splits, which are then sent to every worker. Default is each
+        worker reading its position's splits with read_split.
+    max_workers : int, optional
+        The number of processes. Default is the number of CPUs.
+    retrain : bool, optional
+        If True, the models are trained even if they are in the model store. Default is False.
+
+    Returns
+    -------
+    tuple
+        A dictionary of the results of each type and position, results[type][position], and
+        a pd.DataFrame comparing the errors, r squared and alpha of each (type, position).
+    """
+    if types is None:
+        types = model_types
+
+    # allows use of multiple processes to train the models concurrently
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {(type, position): executor.submit(train_position_model, type, position, variables, splits,
+                                                     retrain)
+                   for type in types for position in positions}
+
+    results = {type: {} for type in types}
+    for (type, position), future in futures.items():
+        results[type][position] = future.result()
+
+    comparison = pd.DataFrame([
+        {"type": type, "position": position,
+         "test_mae": results[type][position]["test"]["mean_absolute_error"],
+         "test_rmse": results[type][position]["test"]["root_mean_squared_error"],
+         "test_r_squared": results[type][position]["test"]["r_squared"],
+         "validation_mae": results[type][position]["validation"]["mean_absolute_error"],
+         "validation_rmse": results[type][position]["validation"]["root_mean_squared_error"],
+         "validation_r_squared": results[type][position]["validation"]["r_squared"],
+         "alpha": results[type][position].get("optimal_alpha")}
+        for type in types for position in positions]).set_index(["type", "position"])
+
+    print(comparison.to_string())
+    print()
+    print("Average over the positions:")
+    print(comparison.drop(columns="alpha").groupby(level="type", sort=False).mean().to_string())
+    return results, comparison
+
 
 if __name__ == "__main__":
-    get_linear_regression_results("standard", True)
+    if "--compare" in sys.argv:
+        train_models(retrain="--retrain" in sys.argv)
+        sys.exit()
+
+    get_linear_regression_results("standard", True, retrain="--retrain" in sys.argv)
     print()
-    print("Saving to pickle file")
-    pickle_out = open("../visualisation/model_results_dict.pickle", "wb")
-    pickle.dump(results_dict, pickle_out)
-    pickle_out.close()
-    print("Pickle file saved as 'model_results_dict.pickle'")
+    print(f"Models saved in the model store at {MODEL_STORE_LOCATION}")
@@ -5,10 +5,10 @@ This module uses Linear Programming (LP) to optimize the selection of an initial
 on historical player data.
 
 Functions:
-- get_historical_stats_with_curr_price(season): Retrieves a dataframe of filtered historical player stats combined with
-                                                the current season's initial price.
-- make_initial_team_lp(season): Uses LP to pick the initial team for a season based on historical points scored, budget,
-                                and other constraints.
+- get_historical_stats_with_curr_price(season, catalog): Retrieves a dataframe of filtered historical player stats
+                                                         combined with the current season's initial price.
+- make_initial_team_lp(season, catalog): Uses LP to pick the initial team for a season based on historical points
+                                         scored, budget, and other constraints.
 - update_players_stats(players_df, all_players_df, players_names_list): Updates the statistics of the players in the
                                                                         'players_df' dataframe with the statistics from
                                                                         the specified gameweek in the 'all_players_df'
@@ -24,19 +24,20 @@ from src.data.player_data import PlayerData
 import pandas as pd
 
 
-def get_historical_stats_with_curr_price(season):
+def get_historical_stats_with_curr_price(season, catalog=None):
     """
     Retrieves a Pandas dataframe of filtered, historical season player stats combined with current seasons inital
     price. Useful for using LP to pick a starter team based on previous points earnt and current price.
 
     params:
     season - season with the current price
+    catalog - optional SeasonCatalog to take the cleaned players from rather than reading them
 
     returns:
     merged_df - dataframe with previous seasons merged stats
     """
     # get previous seasons player stats
-    players = PlayerData(season)
+    players = PlayerData(season, catalog=catalog)
     last_s_data = players.get_all_players_prev_season_stats()
     last_s_data = last_s_data[['first_name', 'second_name', 'total_points', 'minutes', 'team_name', 'position']]
     # remove players who have not played around 30 games
@@ -53,20 +54,21 @@ def get_historical_stats_with_curr_price(season):
     return merged_df
 
 
-def make_initial_team_lp(season):
+def make_initial_team_lp(season, catalog=None):
     """
     Uses linear programming python module PuLP to pick the initial team for a season based on amount of points
     scored historically with position, budget and team constraints.
 
     params:
     season - season to pick the team for
+    catalog - optional SeasonCatalog to take the player data from rather than reading it
 
     returns:
     selected_players_names - a list of players names from the optimal team
     left_over_money - the amount of money left over from picking the team
     """
     # filtered dataframe
-    data = get_historical_stats_with_curr_price(season)
+    data = get_historical_stats_with_curr_price(season, catalog)
 
     # constraint variables
     POS = data.position.unique()
@@ -0,0 +1,182 @@
+"""
+predict_points.py
+This module scores whole gameweek tables with the linear regression models saved in the model
+store (see model_store.py), giving the predicted_points of every row without training a model,
+concatenating the test splits or writing a file.
+
+The coefficients of each position's model are divided by the scale of its scaler and the scaled
+means folded into its intercept, so the model is a weight vector over its unscaled variables. The
+weight vectors of every position are stacked into one matrix over all of their variables, and a
+table is scored by taking the weight row of each row's position and summing its product with the
+row's variables, one vectorised operation over the whole table. Rows missing a variable their
+position's model uses, or of a position without a model, are given no prediction.
+
+Functions
+load_scoring_weights(type="standard", variables=None):
+Returns the stacked weights of the stored models of every position.
+
+predict_points(gameweeks_df, scoring_weights=None, type="standard", variables=None):
+Returns the predicted points of each row of a gameweek table.
+
+add_predicted_points(gameweeks_df, scoring_weights=None, type="standard", variables=None):
+Returns the gameweek table with a predicted_points column.
+
+predict_season_points(season, type="standard", variables=None, catalog=None):
+Returns a season's merged gameweek table with a predicted_points column.
+
+Usage
+Run the script to print the predicted points of the 2021-22 season from the standard models:
+$ python predict_points.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.feature_cache import join_model_variables
+from src.analysis.model_store import list_artifacts, load_artifact
+from src.data.create_test_and_train import POSITIONS
+from src.data.season_store import read_merged_gameweeks, sort_gameweeks
+
+
+def _find_artifact_key(type, position, position_variables=None):
+    artifacts_df = list_artifacts(type, position)
+    if position_variables is not None:
+        artifacts_df = artifacts_df[[variables == list(position_variables) for variables in artifacts_df["variables"]]]
+    if artifacts_df.empty:
+        raise FileNotFoundError(f"No {type} model for {position} with variables {position_variables} has been saved, "
+                                f"train one with parameterised_model.py")
+    return artifacts_df["key"].iloc[-1]
+
+
+def load_scoring_weights(type="standard", variables=None):
+    """
+    Loads the most recently trained model of a type for every position from the model store, and
+    stacks their weights over their unscaled variables into one matrix.
+
+    Parameters
+    ----------
+    type : str, optional
+        Type of linear regression model, "standard", "lasso" or "ridge". Default is "standard".
+    variables : dict, optional
+        The variables of each position's model, to choose between models trained on different
+        variables. Default is the latest model of each position, whatever its variables.
+
+    Returns
+    -------
+    dict
+        The "positions" (as in the position column, e.g. "FWD"), the union of their "variables",
+        the "weights" matrix with a row for each position and a column for each variable, the
+        "intercepts" of each position and the "used" mask of the variables each position uses.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a position has no model of the type (and variables) in the store.
+    """
+    position_models = {}
+    for position_column, position in POSITIONS.items():
+        position_variables = variables[position] if variables is not None else None
+        position_models[position_column] = load_artifact(type, position,
+                                                         _find_artifact_key(type, position, position_variables))
+
+    all_variables = []
+    for position_results in position_models.values():
+        all_variables += [variable for variable in position_results["test"]["variables"]
+                          if variable not in all_variables]
+    variable_columns = {variable: column for column, variable in enumerate(all_variables)}
+
+    weights = np.zeros((len(position_models), len(all_variables)))
+    intercepts = np.zeros(len(position_models))
+    used = np.zeros((len(position_models), len(all_variables)), dtype=bool)
+    for row, position_results in enumerate(position_models.values()):
+        columns = [variable_columns[variable] for variable in position_results["test"]["variables"]]
+        # ((X - mean) / scale) @ coefficients + intercept, as weights and an intercept of the unscaled X
+        scaled_coefficients = position_results["test"]["coefficients"] / position_results["scaler_scale"]
+        weights[row, columns] = scaled_coefficients
+        intercepts[row] = position_results["intercept"] - scaled_coefficients @ position_results["scaler_mean"]
+        used[row, columns] = True
+
+    return {"positions": list(position_models), "variables": all_variables, "weights": weights,
+            "intercepts": intercepts, "used": used}
+
+
+def predict_points(gameweeks_df, scoring_weights=None, type="standard", variables=None):
+    """
+    Returns the predicted points of each row of a gameweek table, with the weights of its
+    position's model. Variables which are not in the table are joined with join_model_variables
+    (see feature_cache.py).
+
+    Parameters
+    ----------
+    gameweeks_df : pd.DataFrame
+        A gameweek table of any season, with a position column.
+    scoring_weights : dict, optional
+        The weights from load_scoring_weights, so they are only loaded once when scoring many
+        tables. Default is loading them for the type and variables.
+    type : str, optional
+        Type of linear regression model, used if scoring_weights is not given. Default is
+        "standard".
+    variables : dict, optional
+        The variables of each position's model, used if scoring_weights is not given.
+
+    Returns
+    -------
+    pd.Series
+        The predicted points of each row, with the index of the table, missing for rows lacking a
+        variable of their position's model or of a position without one.
+    """
+    if scoring_weights is None:
+        scoring_weights = load_scoring_weights(type, variables)
+
+    gameweeks_df = join_model_variables(gameweeks_df, scoring_weights["variables"])
+    X = gameweeks_df[scoring_weights["variables"]].to_numpy(dtype=np.float64)
+    position_rows = pd.Index(scoring_weights["positions"]).get_indexer(gameweeks_df["position"].astype(str))
+    known = position_rows >= 0
+    position_rows = np.where(known, position_rows, 0)
+
+    # the weight row of each table row's position, multiplied with its variables and summed in one operation
+    missing = np.isnan(X)
+    points = np.einsum("ij,ij->i", np.where(missing, 0, X), scoring_weights["weights"][position_rows])
+    points += scoring_weights["intercepts"][position_rows]
+    points[~known | (missing & scoring_weights["used"][position_rows]).any(axis=1)] = np.nan
+    return pd.Series(points, index=gameweeks_df.index, name="predicted_points")
+
+
+def add_predicted_points(gameweeks_df, scoring_weights=None, type="standard", variables=None):
+    """
+    Returns a copy of a gameweek table with a predicted_points column, from predict_points.
+    """
+    return gameweeks_df.assign(predicted_points=predict_points(gameweeks_df, scoring_weights, type, variables))
+
+
+def predict_season_points(season, type="standard", variables=None, catalog=None):
+    """
+    Returns the merged gameweek table of a season, sorted by GW then position as PlayerData sorts
+    it, with a predicted_points column.
+
+    Parameters
+    ----------
+    season : str
+        The season to score, e.g. "2021-22".
+    type : str, optional
+        Type of linear regression model. Default is "standard".
+    variables : dict, optional
+        The variables of each position's model. Default is the latest model of each position.
+    catalog : SeasonCatalog, optional
+        A catalog holding the season, to take its table from rather than reading it.
+
+    Returns
+    -------
+    pd.DataFrame
+        The season's gameweek table with a predicted_points column.
+    """
+    if catalog is not None:
+        gameweeks_df = catalog.get_season_gw_stats(season)
+    else:
+        gameweeks_df = sort_gameweeks(read_merged_gameweeks(season))
+    return add_predicted_points(gameweeks_df, type=type, variables=variables)
+
+
+if __name__ == "__main__":
+    season_df = predict_season_points("2021-22")
+    print(season_df[["name", "position", "GW", "total_points", "predicted_points"]])
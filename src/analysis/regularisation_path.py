@@ -0,0 +1,202 @@
+"""
+regularisation_path.py
+This module chooses the alpha of Ridge and Lasso models by cross validation over a whole path
+of alphas at once, giving the same choice as GridSearchCV(Ridge()) or GridSearchCV(Lasso()) with
+their defaults (5 unshuffled folds, the mean R squared over the folds, the first of the best
+alphas) without fitting a model from scratch for every alpha and fold.
+
+For ridge, each fold's centred training data is decomposed once with an SVD, after which the
+coefficients for every alpha are a rescaling of the same vectors. For lasso, each fold is fitted
+along the path with coordinate descent warm-started from the previous alpha's coefficients
+(sklearn's lasso_path), going from the largest alpha to the smallest. The path's scores are
+converged further than Lasso's default tolerance allows, and GridSearchCV's choice can sit one
+alpha away from the best of them, so the best few alphas of the path are scored again with
+Lasso's defaults, fitting from scratch as GridSearchCV does, and the alpha is chosen from those.
+
+Functions
+ridge_cv_scores(X, y, alphas, n_folds=5):
+Returns the mean R squared over the folds of a ridge model for every alpha.
+
+lasso_cv_scores(X, y, alphas, n_folds=5, tol=1e-7, max_iter=10000):
+Returns the mean R squared over the folds of a lasso model for every alpha.
+
+lasso_grid_scores(X, y, alphas, n_folds=5):
+Returns the mean R squared over the folds of a Lasso() model for each alpha, fitted as GridSearchCV fits it.
+
+select_alpha(alphas, scores):
+Returns the alpha with the best mean score, and the first of them if several are best.
+
+fit_ridge_cv(X, y, alphas, n_folds=5):
+Chooses the alpha of a ridge model by cross validation and fits it on all of the data.
+
+fit_lasso_cv(X, y, alphas, n_folds=5, n_candidates=10):
+Chooses the alpha of a lasso model by cross validation and fits it on all of the data.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Lasso, Ridge, lasso_path
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+
+def _r2_scores(y_true, y_preds):
+    # R squared of each column of predictions, as r2_score would give for each
+    residual = ((y_true[:, None] - y_preds) ** 2).sum(axis=0)
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    return 1 - residual / total
+
+
+def _folds(X, y, n_folds):
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    for train_index, test_index in KFold(n_splits=n_folds).split(X):
+        X_train, y_train = X[train_index], y[train_index]
+        X_mean, y_mean = X_train.mean(axis=0), y_train.mean()
+        yield X_train - X_mean, y_train - y_mean, X[test_index] - X_mean, y[test_index], y_mean
+
+
+def ridge_cv_scores(X, y, alphas, n_folds=5):
+    """
+    Returns the mean R squared over the folds of a ridge model for every alpha, using one SVD of
+    each fold's training data.
+
+    Parameters
+    ----------
+    X : array-like
+        The variables, one row per sample.
+    y : array-like
+        The objective values.
+    alphas : array-like
+        The alphas to score.
+    n_folds : int, optional
+        The number of unshuffled folds. Default is 5.
+
+    Returns
+    -------
+    np.ndarray
+        The mean R squared of each alpha.
+    """
+    alphas = np.asarray(alphas, dtype=np.float64)
+    fold_scores = []
+    for X_train, y_train, X_test, y_test, y_mean in _folds(X, y, n_folds):
+        U, s, Vt = np.linalg.svd(X_train, full_matrices=False)
+        # coefficients of alpha are V diag(s / (s^2 + alpha)) U^T y, one column per alpha
+        shrinkage = s[:, None] / (s[:, None] ** 2 + alphas[None, :])
+        coefficients = Vt.T @ (shrinkage * (U.T @ y_train)[:, None])
+        fold_scores.append(_r2_scores(y_test, X_test @ coefficients + y_mean))
+    return np.mean(fold_scores, axis=0)
+
+
+def lasso_cv_scores(X, y, alphas, n_folds=5, tol=1e-7, max_iter=10000):
+    """
+    Returns the mean R squared over the folds of a lasso model for every alpha, fitting each fold
+    along a warm-started coordinate descent path. The tolerance is tighter than Lasso's default so
+    the scores of neighbouring alphas are not separated by convergence error.
+
+    Parameters
+    ----------
+    X : array-like
+        The variables, one row per sample.
+    y : array-like
+        The objective values.
+    alphas : array-like
+        The alphas to score.
+    n_folds : int, optional
+        The number of unshuffled folds. Default is 5.
+    tol : float, optional
+        The tolerance of the coordinate descent. Default is 1e-7.
+    max_iter : int, optional
+        The maximum number of coordinate descent iterations for each alpha. Default is 10000.
+
+    Returns
+    -------
+    np.ndarray
+        The mean R squared of each alpha, in the order of alphas.
+    """
+    alphas = np.asarray(alphas, dtype=np.float64)
+    # lasso_path goes from the largest alpha to the smallest
+    order = np.argsort(-alphas, kind="stable")
+    fold_scores = []
+    for X_train, y_train, X_test, y_test, y_mean in _folds(X, y, n_folds):
+        _, coefficients, _ = lasso_path(X_train, y_train, alphas=alphas[order], tol=tol, max_iter=max_iter)
+        scores = np.empty(len(alphas))
+        scores[order] = _r2_scores(y_test, X_test @ coefficients + y_mean)
+        fold_scores.append(scores)
+    return np.mean(fold_scores, axis=0)
+
+
+def lasso_grid_scores(X, y, alphas, n_folds=5):
+    """
+    Returns the mean R squared over the folds of a Lasso() model for each alpha, fitting every fold
+    from scratch with Lasso's default tolerance, so the scores are those GridSearchCV(Lasso()) gives.
+    Used to choose between the best alphas of the path, and slow for many alphas.
+
+    Parameters
+    ----------
+    X : array-like
+        The variables, one row per sample.
+    y : array-like
+        The objective values.
+    alphas : array-like
+        The alphas to score.
+    n_folds : int, optional
+        The number of unshuffled folds. Default is 5.
+
+    Returns
+    -------
+    np.ndarray
+        The mean R squared of each alpha.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    fold_scores = []
+    for train_index, test_index in KFold(n_splits=n_folds).split(X):
+        fold_scores.append([r2_score(y[test_index], Lasso(alpha=alpha).fit(X[train_index], y[train_index])
+                                     .predict(X[test_index])) for alpha in alphas])
+    return np.mean(fold_scores, axis=0)
+
+
+def select_alpha(alphas, scores):
+    """
+    Returns the alpha with the best mean score, taking the first of them if several are best as
+    GridSearchCV does.
+    """
+    return np.asarray(alphas)[int(np.argmax(scores))]
+
+
+def fit_ridge_cv(X, y, alphas, n_folds=5):
+    """
+    Chooses the alpha of a ridge model by cross validation and fits it on all of the data.
+
+    Returns
+    -------
+    tuple
+        The fitted Ridge model and the cross validation curve, a pd.Series of the mean R squared
+        of each alpha.
+    """
+    scores = ridge_cv_scores(X, y, alphas, n_folds)
+    model = Ridge(alpha=select_alpha(alphas, scores)).fit(X, y)
+    return model, pd.Series(scores, index=pd.Index(alphas, name="alpha"), name="mean_r_squared")
+
+
+def fit_lasso_cv(X, y, alphas, n_folds=5, n_candidates=10):
+    """
+    Chooses the alpha of a lasso model by cross validation and fits it on all of the data. The
+    n_candidates best alphas of the path are scored again with lasso_grid_scores and the alpha is
+    the first best of those, as GridSearchCV(Lasso()) would choose unless an alpha outside them
+    was within Lasso's convergence error of the best.
+
+    Returns
+    -------
+    tuple
+        The fitted Lasso model and the cross validation curve, a pd.Series of the mean R squared
+        of each alpha along the path.
+    """
+    alphas = np.asarray(alphas)
+    scores = lasso_cv_scores(X, y, alphas, n_folds)
+    # the candidates in the order of alphas, so ties go to the first as in GridSearchCV
+    candidates = np.sort(np.argsort(-scores, kind="stable")[:n_candidates])
+    candidate_scores = lasso_grid_scores(X, y, alphas[candidates], n_folds)
+    model = Lasso(alpha=select_alpha(alphas[candidates], candidate_scores)).fit(X, y)
+    return model, pd.Series(scores, index=pd.Index(alphas, name="alpha"), name="mean_r_squared")
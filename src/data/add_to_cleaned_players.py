@@ -3,10 +3,13 @@ add_to_cleaned_players.py: A Python script that adds extra information to cleane
 
 This script performs the following tasks:
 
-Adds position, initial cost, and team name columns to the cleaned players DataFrame.
+Adds position, initial cost, and team name columns to the cleaned players DataFrame, the position and initial cost
+calculated for every player at once by convert_to_positions and calculate_initial_costs.
 Selects and orders the columns.
 Adds a name column that combines first name and second name columns.
 Creates a name column with player ID.
+Runs the position, cost and team name steps for a season, unless the manifest (see manifest.py) shows its
+cleaned_players.csv was made from the same players_raw.csv and teams.csv by the same code.
 
 Usage:
 Simply run the script with Python interpreter. No arguments are required.
@@ -20,14 +23,34 @@ Example:
 $ python add_to_cleaned_players.py
 """
 
+import sys
+
 import pandas as pd
 from pathlib import Path
 
 from IPython.core.display_functions import display
 
+from src.data.manifest import make_fingerprint, is_up_to_date, record_artefact
+
 seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
 data_directory_location = str(Path(__file__).parent) + '/../../data/'
-from pathlib import Path
+
+# element_type in players_raw.csv to position
+POSITIONS = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+
+
+def convert_to_positions(element_types):
+    """
+    Returns the position of each element_type, e.g. 'GK' for 1, and 'N/A' for an unknown or missing element_type.
+    """
+    return element_types.map(POSITIONS).fillna('N/A')
+
+
+def calculate_initial_costs(clean_df):
+    """
+    Returns the cost of each player at the start of the season, their now_cost less their cost_change_start.
+    """
+    return clean_df['now_cost'] - clean_df['cost_change_start']
 
 
 def add_position_to_clean(seasons):
@@ -43,19 +66,7 @@ def add_position_to_clean(seasons):
         raw_df = raw_df[['first_name', 'second_name', 'element_type', 'total_points']]
         clean_df = pd.merge(clean_df, raw_df, on=["first_name", "second_name", 'total_points'], how="left")
 
-        def convert_to_position(row):
-            if row['element_type'] == 1:
-                return 'GK'
-            elif row['element_type'] == 2:
-                return 'DEF'
-            elif row['element_type'] == 3:
-                return 'MID'
-            elif row['element_type'] == 4:
-                return 'FWD'
-            else:
-                return 'N/A'
-
-        clean_df['position'] = clean_df.apply(lambda row: convert_to_position(row), axis=1)
+        clean_df['position'] = convert_to_positions(clean_df['element_type'])
         if len(clean_df) != len(old_clean_df): raise ValueError('Lengths not equal')
         clean_df.to_csv(data_location + "cleaned_players.csv", encoding="utf-8-sig", index=False)
         print(f"Position added for season {season}")
@@ -75,7 +86,7 @@ def add_costs_to_clean(seasons):
             raw_df = raw_df[['first_name', 'second_name', 'now_cost', 'cost_change_start', 'total_points']]
         clean_df = pd.merge(clean_df, raw_df, on=["first_name", "second_name", 'total_points'], how="left")
 
-        clean_df['initial_cost'] = clean_df.apply(lambda row: row['now_cost'] - row['cost_change_start'], axis=1)
+        clean_df['initial_cost'] = calculate_initial_costs(clean_df)
         clean_df = clean_df.drop('cost_change_start', axis=1)
         if len(clean_df) != len(old_clean_df): raise ValueError('Lengths not equal')
         clean_df.to_csv(data_location + "cleaned_players.csv", encoding="utf-8-sig", index=False)
@@ -150,11 +161,39 @@ def add_name_column(seasons):
         merged_players.to_csv(data_location + "cleaned_players_with_name_id.csv", index=False, encoding="utf-8-sig")
 
 
-seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
-# add_position_to_clean(seasons)
-# add_costs_to_clean(seasons)
-# add_team_name_to_clean(seasons)
-# select_cols(seasons)
-add_name_column(["2021-22"])
-
-print("done")
+def clean_season(season, force=False):
+    """
+    Adds position, initial cost and team name to a season's cleaned players. Nothing is done if the manifest shows
+    cleaned_players.csv was made from the same players_raw.csv and teams.csv by the same code.
+
+    Args:
+        season (str): The season to clean.
+        force (bool, optional): Clean the season even if it is up to date. Defaults to False.
+
+    Returns:
+        bool: True if the season was cleaned, False if it was up to date.
+    """
+    data_location = data_directory_location + season + "/"
+    # cleaned_players.csv is rewritten in place, so it is an output rather than an input
+    fingerprint = make_fingerprint([data_location + "players_raw.csv", data_location + "teams.csv"],
+                                   modules=[sys.modules[__name__]])
+    outputs = [data_location + "cleaned_players.csv"]
+    if not force and is_up_to_date(data_location, "cleaned_players.csv", fingerprint, outputs):
+        print(f"cleaned_players.csv is up to date for season {season}")
+        return False
+
+    add_position_to_clean([season])
+    add_costs_to_clean([season])
+    add_team_name_to_clean([season])
+    record_artefact(data_location, "cleaned_players.csv", fingerprint, outputs)
+    return True
+
+
+if __name__ == "__main__":
+    # add_position_to_clean(seasons)
+    # add_costs_to_clean(seasons)
+    # add_team_name_to_clean(seasons)
+    # select_cols(seasons)
+    add_name_column(["2021-22"])
+
+    print("done")
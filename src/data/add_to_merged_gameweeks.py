@@ -3,171 +3,223 @@ add_to_merged_gameweeks.py
 This module enriches merged gameweeks data for fantasy football players from different seasons by adding various
 attributes such as team, position, and recent statistics. The seasons considered are from 2016-17 to 2021-22.
 
+The enrichment is a pipeline of stages which each take a season's gameweek table and return it with a column added.
+For each season the original merged_gw.csv is read once (with cleaned_players.csv and player_idlist.csv if needed),
+every stage is run in memory, the result is checked against a fingerprint of the original table and then written to merged_gw2.csv
+once. The time taken by each stage is printed. A stage is skipped if its column is already in the data, and a season is skipped
+entirely if the manifest (see manifest.py) shows its merged_gw2.csv was made from the same inputs and code.
+
 Functions
-add_team_to_gameweeks():
-Adds the team name to each player's gameweek record for all seasons.
+make_player_names(players_df: pd.DataFrame, with_id: bool) -> pd.Series:
+Joins the first and second names of players, and their ids if with_id, into the names used in the gameweek data.
+
+read_player_names(season: str) -> pd.DataFrame:
+Reads the cleaned players of a season with a name column matching the names in the gameweek data.
+
+add_team_to_gameweeks(gameweeks_df: pd.DataFrame, players_df: pd.DataFrame) -> pd.DataFrame:
+Adds the team name to each player's gameweek record.
+
+add_position_to_gameweeks(gameweeks_df: pd.DataFrame, players_df: pd.DataFrame) -> pd.DataFrame:
+Adds the position of each player to their gameweek record.
+
+add_won_game_to_gameweeks(gameweeks_df: pd.DataFrame) -> pd.DataFrame:
+Adds a binary variable (1 for win, 0 for loss/draw) to each player's gameweek record.
 
-add_position_to_gameweeks():
-Adds the position of each player to their gameweek record for all seasons.
+calculate_recent_stats(gameweeks_df: pd.DataFrame, column_names: list, window: int = 5) -> pd.DataFrame:
+Calculates the recent statistics of several columns of a season's gameweek table in one vectorised pass.
 
-add_won_game_to_gameweeks():
-Adds a binary variable (1 for win, 0 for loss/draw) to each player's gameweek record for all seasons.
+add_recent_stats(gameweeks_df: pd.DataFrame, column_names: list) -> pd.DataFrame:
+Adds recent statistics for the given columns (e.g. total_points, bps, minutes) for each player.
 
-add_recent_stats(column_name: str):
-Adds recent statistics for a given column (e.g. total_points, bps, minutes) for each player in all seasons.
+add_id_to_player_name(gameweeks_df: pd.DataFrame) -> pd.DataFrame:
+Adds the player's ID to their name, used for season 2021-22. This is needed for duplicate names (e.g. Ben Davies).
+
+get_enrichment_stages(season: str, columns: list) -> list:
+Returns the (name, stage) pairs run for a season, in order.
 
 select_cols():
 Selects a list of relevant columns for further analysis.
 
-find_errors_in_gw(season: str):
-Compares the length of the original and enriched gameweek data for a given season and raises an error
-if the lengths are not equal.
+fingerprint_gameweeks(gameweeks_df: pd.DataFrame) -> dict:
+Returns the number of rows, a hash of the (element, GW) keys and the rows per fixture of an original gameweek table.
+
+find_errors_in_gw(season: str, source_fingerprint: dict, gameweeks_df: pd.DataFrame):
+Checks enriched gameweek data against the fingerprint of the original data in memory, and raises an error reporting
+the keys which occur a different number of times if they do not match.
+
+get_enrichment_fingerprint(season: str) -> dict:
+Returns the fingerprint of a season's merged_gw2.csv recorded in the manifest.
+
+enrich_season(season: str, force: bool = False) -> pd.DataFrame:
+Runs the pipeline for a season, reading its inputs once and writing merged_gw2.csv once, unless it is up to date.
+
+write_recent_state(season: str, gameweeks_df: pd.DataFrame):
+Saves the rows of the last five gameweeks of a season, needed to calculate the next gameweek's recent statistics.
 
-add_id_to_player_name():
-Adds the player's ID to their name for season 2021-22. This is needed for duplicate names (e.g. Ben Davies).
+read_recent_state(season: str) -> pd.DataFrame:
+Reads the rows saved by write_recent_state.
+
+append_gameweek(season: str, gameweek: int) -> pd.DataFrame:
+Enriches a new gameweek's gw<gameweek>.csv file on its own and appends it to merged_gw.csv and merged_gw2.csv.
 
 Usage
-To enrich the gameweek data, simply call the functions at the end of the script.
+Run the script to enrich the gameweek data of every season with a merged_gw.csv file:
+$ python add_to_merged_gameweeks.py
 
-Finally, run the script to process the data.
+Seasons which are up to date are skipped, add --force to enrich them anyway. Or to append a new gameweek of a season during the season:
+$ python add_to_merged_gameweeks.py 2021-22 38
 """
 
 
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from src.data.manifest import make_fingerprint, is_up_to_date, record_artefact
+
 seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+
+RECENT_WINDOW = 5
+RECENT_STAT_COLUMNS = ["total_points", "bps", "minutes", "goals_scored", "goals_conceded", "assists", "clean_sheets",
+                       "saves", "yellow_cards", "red_cards", "creativity", "won_game"]
+RECENT_STATE_FILE = "gws/recent_state.csv"
+# identify a row of the gameweek data, unlike names these are not changed by any stage
+GAMEWEEK_KEY_COLUMNS = ["element", "GW"]
+# tackles not recorded for seasons 2019-20 onward, and transfers_in/transfers_out are not sure to be relevant
+
+
+def make_player_names(players_df, with_id):
+    """
+    Returns first_name_second_name for each player, or first_name_second_name_id if with_id.
+    """
+    names = players_df['first_name'] + '_' + players_df['second_name']
+    if with_id:
+        names = names + '_' + players_df['id'].astype(str)
+    return names
+
+
+def read_player_names(season):
+    data_location = data_directory_location + season + "/"
+    clean_df = pd.read_csv(data_location + "cleaned_players.csv", encoding="utf-8-sig")
+    # this is due to name column changing from name to name with player id
+    if season in ["2016-17", "2017-18"]:
+        clean_df['name'] = make_player_names(clean_df, with_id=False)
+    else:
+        id_df = pd.read_csv(data_location + 'player_idlist.csv', encoding="utf-8-sig")
+        clean_df = pd.merge(clean_df, id_df, on=["first_name", "second_name"], how="left")
+        clean_df['name'] = make_player_names(clean_df, with_id=True)
+    clean_df.rename(columns={'team_name': 'team'}, inplace=True)
+    return clean_df[['name', 'team', 'position']]
 
 
-def add_team_to_gameweeks():
-    for season in seasons:
-        gw_file = '../../data/' + season + "/gws/merged_gw2.csv"
-        gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
+def add_team_to_gameweeks(gameweeks_df, players_df):
+    return pd.merge(gameweeks_df, players_df[['name', 'team']], on=["name"], how="left")
 
-        if 'team' not in gameweeks_df.columns:
-            file = '../../data/' + season + "/cleaned_players.csv"
-            clean_df = pd.read_csv(file, encoding="utf-8-sig")
-            # this is due to name column changing from name to name with player id
-            if season in ["2016-17", "2017-18"]:
-                clean_df['name'] = clean_df.apply(lambda row: row["first_name"] + "_" + row["second_name"], axis=1)
-            else:
-                idlist_file = '../../data/' + season + '/player_idlist.csv'
-                id_df = pd.read_csv(idlist_file, encoding="utf-8-sig")
-                clean_df = pd.merge(clean_df, id_df, on=["first_name", "second_name"], how="left")
-                clean_df['name'] = clean_df.apply(lambda row: row['first_name'] + '_' + row['second_name'] +
-                                                              '_' + str(row['id']), axis=1)
-            clean_df.rename(columns={'team_name': 'team'}, inplace=True)
-            # clean_df = clean_df.rename({'team_name': 'team'})
-            clean_df = clean_df[['name', 'team']]
-            clean_df = pd.merge(gameweeks_df, clean_df, on=["name"], how="left")
-            find_errors_in_gw(season)
-            clean_df.to_csv(gw_file, encoding="utf-8-sig", index=False)
-            print(f"Team added for season {season}")
-        else:
-            print(f"Team already in data for season {season}")
-
-
-def add_position_to_gameweeks():
-    for season in seasons:
-        gw_file = '../../data/' + season + "/gws/merged_gw2.csv"
-        gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
-
-        file = '../../data/' + season + "/cleaned_players.csv"
-        clean_df = pd.read_csv(file, encoding="utf-8-sig")
-
-        if 'position' not in gameweeks_df.columns:
-
-            # this is due to name column changing from name to name with player id
-            if season in ["2016-17", "2017-18"]:
-                clean_df['name'] = clean_df.apply(lambda row: row["first_name"] + "_" + row["second_name"], axis=1)
-            else:
-                idlist_file = '../../data/' + season + '/player_idlist.csv'
-                id_df = pd.read_csv(idlist_file, encoding="utf-8-sig")
-                clean_df = pd.merge(clean_df, id_df, on=["first_name", "second_name"], how="left")
-                clean_df['name'] = clean_df.apply(lambda row: row['first_name'] + '_' + row['second_name'] +
-                                                              '_' + str(row['id']), axis=1)
-
-            clean_df = clean_df[['name', 'position', 'team_name']]
-            clean_df.rename(columns={'team_name': 'team'}, inplace=True)
-            clean_df = pd.merge(gameweeks_df, clean_df, on=["name", "team"], how="left")
-            find_errors_in_gw(season)
-            clean_df.to_csv(gw_file, encoding="utf-8-sig", index=False)
-            print(f"Position added for season {season}")
-        else:
-            print(f"Position already in data for season {season}")
-
-
-def add_won_game_to_gameweeks():
-    for season in seasons:
-        gw_file = '../../data/' + season + "/gws/merged_gw2.csv"
-        gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
-
-        if 'won_game' not in gameweeks_df.columns:
-
-            def calculate_won_game(row):
-                if row['team_h_score'] > row['team_a_score']:
-                    if row['was_home']:
-                        return 1
-                    else:
-                        return 0
-                if row['team_h_score'] < row['team_a_score']:
-                    if row['was_home']:
-                        return 0
-                    else:
-                        return 1
-                return 0
-
-            gameweeks_df["won_game"] = gameweeks_df.apply(lambda row: calculate_won_game(row), axis=1)
-            gameweeks_df.to_csv(gw_file, encoding="utf-8-sig", index=False)
-
-            print(f"Won game added for season {season}")
-        else:
-            print(f"Won game already in data for season {season}")
-
-
-def add_recent_stats(column_name):
-    for season in seasons:
-        gw_file = '../../data/' + season + "/gws/merged_gw2.csv"
-        gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
-
-        if ('recent_' + column_name) not in gameweeks_df.columns:
-            # gets the list of gameweek values
-            gameweeks = sorted(gameweeks_df['GW'].unique())
-
-            # initialise dataframe to contain recent stats for players to add to merged gameweeks
-            to_merge_df_list = []
-
-            # add first recent stats which is 0 at the start of the season
-            first_to_merge_df = gameweeks_df.loc[gameweeks_df['GW'] == 1]
-            first_to_merge_df = first_to_merge_df[['name', 'GW']]
-            first_to_merge_df['recent_' + column_name] = 0
-            to_merge_df_list.append(first_to_merge_df)
-
-            # initialise gameweek subsets with subsets of length <5
-            gameweek_subsets = [[1], [1, 2], [1, 2, 3], [1, 2, 3, 4]]
-            # get gameweek subsets of 5 all the way to the end for getting parameters for gameweeks 5-final
-            for i in range(0, len(gameweeks) - 5, 1):
-                gameweek_subsets.append(gameweeks[i:i + 5])
-            for subset in gameweek_subsets:
-                subset_df = gameweeks_df[gameweeks_df['GW'].isin(subset)]
-                df_totals = subset_df.groupby('name')[column_name].sum().to_frame(name='recent_' + column_name)
-                df_totals = df_totals.reset_index()
-                # have to do it this way for the gameweek value inconsistency, to put it onto the next gw
-                df_totals["GW"] = gameweeks[gameweeks.index(subset[len(subset) - 1]) + 1]
-                # df_totals["GW"] = subset[len(subset)-1]
-
-                to_merge_df_list.append(df_totals)
-
-            to_merge_df = pd.concat(to_merge_df_list)
-            gameweeks_df = pd.merge(gameweeks_df, to_merge_df, on=["name", "GW"], how="left")
-            # print(gameweeks_df[['name', 'GW', column_name, 'recent_' + column_name]])
-
-            # save new merged_gw dataframe
-            find_errors_in_gw(season)
-            gameweeks_df.to_csv(gw_file, encoding="utf-8-sig", index=False)
-
-            print('recent_' + column_name + f" added for season {season}")
-        else:
-            print('recent_' + column_name + f" already in data for season {season}")
+
+def add_position_to_gameweeks(gameweeks_df, players_df):
+    return pd.merge(gameweeks_df, players_df[['name', 'position', 'team']], on=["name", "team"], how="left")
+
+
+def add_won_game_to_gameweeks(gameweeks_df):
+    # a home win for a home player or an away win for an away player, and 0 for a draw
+    was_home = gameweeks_df['was_home'].astype(bool)
+    home_win = gameweeks_df['team_h_score'] > gameweeks_df['team_a_score']
+    away_win = gameweeks_df['team_h_score'] < gameweeks_df['team_a_score']
+    gameweeks_df["won_game"] = ((home_win & was_home) | (away_win & ~was_home)).astype(np.int64)
+    return gameweeks_df
+
+
+def calculate_recent_stats(gameweeks_df, column_names, window=RECENT_WINDOW):
+    """
+    Calculates the recent statistics of several columns in one pass over a season's gameweek table. The recent value
+    of a column for a player in a gameweek is the sum of that column over the player's rows in the previous `window`
+    gameweeks in the data (fewer at the start of the season), and 0 in gameweek 1.
+
+    Rather than taking a subset of the table for every gameweek, each row is repeated once for each of the next
+    `window` gameweeks it counts towards, and a single groupby on (name, gameweek) sums every column at once. The rows
+    of each group are summed in their original order, as when summing each gameweek subset, so the totals are the same.
+
+    Args:
+        gameweeks_df (pd.DataFrame): A season's gameweek table.
+        column_names (list): The columns to calculate recent statistics for.
+        window (int, optional): The number of previous gameweeks to sum over. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: A 'recent_' column for each column name, with the same index as gameweeks_df. Players with no
+        rows in their window are NaN.
+    """
+    # position of each row's gameweek in the sorted list of gameweeks in the data, as some gameweeks can be missing
+    gameweeks = np.sort(gameweeks_df['GW'].unique())
+    positions = np.searchsorted(gameweeks, gameweeks_df['GW'].to_numpy())
+
+    # each row counts towards the `window` gameweeks after its own
+    row_numbers = np.repeat(np.arange(len(gameweeks_df)), window)
+    targets = np.repeat(positions, window) + np.tile(np.arange(1, window + 1), len(gameweeks_df))
+    in_season = targets < len(gameweeks)
+    row_numbers, targets = row_numbers[in_season], targets[in_season]
+
+    windows_df = gameweeks_df[column_names].iloc[row_numbers].reset_index(drop=True)
+    windows_df['name'] = gameweeks_df['name'].to_numpy()[row_numbers]
+    windows_df['target'] = targets
+    totals = windows_df.groupby(['name', 'target'], sort=False)[column_names].sum()
+
+    row_keys = pd.MultiIndex.from_arrays([gameweeks_df['name'].to_numpy(), positions])
+    totals = totals.reindex(row_keys)
+    totals.index = gameweeks_df.index
+    totals.loc[(gameweeks_df['GW'] == 1).to_numpy()] = 0
+
+    recent_df = pd.DataFrame(index=gameweeks_df.index)
+    for column_name in column_names:
+        recent = totals[column_name]
+        if not recent.isna().any():
+            recent = recent.astype(windows_df[column_name].sum().dtype)
+        recent_df['recent_' + column_name] = recent
+    return recent_df
+
+
+def add_recent_stats(gameweeks_df, column_names):
+    recent_df = calculate_recent_stats(gameweeks_df, column_names)
+    return pd.concat([gameweeks_df, recent_df], axis=1)
+
+
+def add_id_to_player_name(gameweeks_df):
+    gameweeks_df["name"] = gameweeks_df["name"] + "_" + gameweeks_df["element"].astype(str)
+    return gameweeks_df
+
+
+def get_enrichment_stages(season, columns):
+    """
+    Returns the stages to run for a season, skipping those whose columns are already in the data. The season's players
+    are read once here if the team or position stages need them.
+
+    Args:
+        season (str): The season being enriched.
+        columns (list): The columns of the season's original gameweek table.
+
+    Returns:
+        list: (name, stage) pairs, where each stage takes a gameweek table and returns it enriched.
+    """
+    stages = []
+    # the 2021-22 names in merged_gw.csv have no player id, which is needed for the duplicate Ben Davies
+    if season == "2021-22":
+        stages.append(("Player id", add_id_to_player_name))
+    if 'team' not in columns or 'position' not in columns:
+        players_df = read_player_names(season)
+    if 'team' not in columns:
+        stages.append(("Team", partial(add_team_to_gameweeks, players_df=players_df)))
+    if 'position' not in columns:
+        stages.append(("Position", partial(add_position_to_gameweeks, players_df=players_df)))
+    if 'won_game' not in columns:
+        stages.append(("Won game", add_won_game_to_gameweeks))
+    recent_columns = [column_name for column_name in RECENT_STAT_COLUMNS if 'recent_' + column_name not in columns]
+    if recent_columns:
+        stages.append(("Recent stats", partial(add_recent_stats, column_names=recent_columns)))
+    return stages
 
 
 def select_cols():
@@ -178,66 +230,213 @@ def select_cols():
             'own_goals', 'kickoff_time', 'team_h_score']
 
 
-def find_errors_in_gw(season):
+def fingerprint_gameweeks(gameweeks_df):
+    """
+    Returns a fingerprint of a gameweek table to check enriched versions of it against, without keeping the table: its
+    number of rows, an order-independent hash of its (element, GW) keys, the number of rows of each key and the number
+    of rows of each fixture. The enrichment stages only add columns (and the player id to names), so none of these
+    should change.
+
+    Args:
+        gameweeks_df (pd.DataFrame): The original gameweek table.
+
+    Returns:
+        dict: The fingerprint.
+    """
+    key_hashes = pd.util.hash_pandas_object(gameweeks_df[GAMEWEEK_KEY_COLUMNS], index=False).to_numpy()
+    return {"rows": len(gameweeks_df),
+            # a sum of the key hashes is the same for the same keys in any order, and changes if any key is repeated
+            "key_hash": key_hashes.sum(dtype=np.uint64),
+            "key_counts": pd.Series(key_hashes).value_counts(),
+            "fixture_counts": gameweeks_df["fixture"].value_counts().sort_index()}
+
+
+def find_errors_in_gw(season, source_fingerprint, gameweeks_df):
+    """
+    Checks an enriched gameweek table against the fingerprint of the table it was made from, in memory. If the number
+    of rows, keys or rows per fixture have changed, e.g. because a merge on a duplicated name repeated rows, the keys
+    whose number of rows changed are printed and an error is raised.
+
+    Args:
+        season (str): The season being checked.
+        source_fingerprint (dict): The fingerprint of the original table, from fingerprint_gameweeks.
+        gameweeks_df (pd.DataFrame): The enriched table.
+
+    Raises:
+        ValueError: If the enriched table does not match the fingerprint.
+    """
+    key_hashes = pd.util.hash_pandas_object(gameweeks_df[GAMEWEEK_KEY_COLUMNS], index=False).to_numpy()
+    if len(gameweeks_df) == source_fingerprint["rows"] and \
+            key_hashes.sum(dtype=np.uint64) == source_fingerprint["key_hash"] and \
+            gameweeks_df["fixture"].value_counts().sort_index().equals(source_fingerprint["fixture_counts"]):
+        return
+
+    print(f"--------------------- Checking keys of gameweeks: ---------------------")
+    # checks which (element, GW) keys occur a different number of times to the original
+    key_counts = pd.Series(key_hashes).value_counts()
+    difference = key_counts.subtract(source_fingerprint["key_counts"], fill_value=0)
+    difference = difference[difference != 0]
+    rows = np.flatnonzero(np.isin(key_hashes, difference.index.to_numpy()))
+    offending = gameweeks_df.iloc[rows][["name"] + GAMEWEEK_KEY_COLUMNS]
+    offending["change"] = difference.reindex(key_hashes[rows]).to_numpy()
+    offending = offending.drop_duplicates(GAMEWEEK_KEY_COLUMNS)
+    for name, gameweek, change in zip(offending["name"][:20], offending["GW"][:20], offending["change"][:20]):
+        print(f"{name} in gameweek {gameweek} has occured {int(change)} more times in the altered dataframe")
+    if len(offending) > 20:
+        print(f"... and {len(offending) - 20} more keys")
+    missing = len(difference) - len(offending)
+    if missing:
+        print(f"{missing} keys of the original dataframe are no longer in the altered dataframe")
+    raise ValueError(f"""Gameweek data does not match the original for season {season}
+        Unaltered data has {source_fingerprint["rows"]} entries
+        New data has {len(gameweeks_df)} entries, with {len(difference)} keys occurring a different number of times""")
+
+
+def get_enrichment_fingerprint(season):
+    """
+    Returns the fingerprint of a season's merged_gw2.csv for the manifest: the hashes of the files it is made from, the
+    recent statistics parameters and the code of this module.
+    """
+    data_location = data_directory_location + season + "/"
+    inputs = [data_location + "gws/merged_gw.csv", data_location + "cleaned_players.csv",
+              data_location + "player_idlist.csv"]
+    params = {"recent_window": RECENT_WINDOW, "recent_stat_columns": RECENT_STAT_COLUMNS}
+    return make_fingerprint(inputs, params, [sys.modules[__name__]])
+
+
+def enrich_season(season, force=False):
+    """
+    Enriches the merged gameweeks of a season, reading merged_gw.csv once, running every stage in memory and writing
+    merged_gw2.csv once. Nothing is done if the manifest shows merged_gw2.csv was made from the same inputs, parameters
+    and code.
+
+    Args:
+        season (str): The season to enrich.
+        force (bool, optional): Enrich the season even if it is up to date. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The enriched gameweek table, or None if it was up to date.
+    """
     print(f"----------------------------------------- For season {season}: -----------------------------------------")
-
-    gw_file = '../../data/' + season + "/gws/merged_gw.csv"
-    unaltered_gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
-    gw_file = '../../data/' + season + "/gws/merged_gw2.csv"
-    gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
-
-    if len(unaltered_gameweeks_df) != len(gameweeks_df):
-        print(f"--------------------- Checking length of files: ---------------------")
-        # checks if anyone's name occurs more than the original amount of times
-        unaltered_name_counts = unaltered_gameweeks_df['name'].value_counts()
-        name_counts = gameweeks_df['name'].value_counts()
-        difference = name_counts - unaltered_name_counts
-        for name, count in difference.items():
-            if count != 0:
-                print(f"{name} has occured {count} more times in the altered dataframe")
-        raise ValueError(f"""Gameweek files are not equal length
-        Unaltered file has {len(unaltered_gameweeks_df)} entries
-        New file has {len(gameweeks_df)} entries""")
+    season_location = data_directory_location + season + "/gws/"
+    outputs = [season_location + "merged_gw2.csv", data_directory_location + season + "/" + RECENT_STATE_FILE]
+    fingerprint = get_enrichment_fingerprint(season)
+    if not force and is_up_to_date(season_location, "merged_gw2.csv", fingerprint, outputs):
+        print(f"merged_gw2.csv is up to date for season {season}")
+        return None
+
+    start_time = time.perf_counter()
+    gameweeks_df = pd.read_csv(season_location + "merged_gw.csv", encoding="utf-8-sig")
+    stages = get_enrichment_stages(season, gameweeks_df.columns)
+    # only the fingerprint of the original table is kept to check each stage against
+    source_fingerprint = fingerprint_gameweeks(gameweeks_df)
+    print(f"Read in {time.perf_counter() - start_time:.2f}s")
+
+    for stage_name, stage in stages:
+        start_time = time.perf_counter()
+        gameweeks_df = stage(gameweeks_df)
+        find_errors_in_gw(season, source_fingerprint, gameweeks_df)
+        print(f"{stage_name} added in {time.perf_counter() - start_time:.2f}s")
+
+    start_time = time.perf_counter()
+    gameweeks_df.to_csv(season_location + "merged_gw2.csv", encoding="utf-8-sig", index=False)
+    write_recent_state(season, gameweeks_df)
+    record_artefact(season_location, "merged_gw2.csv", fingerprint, outputs)
+    print(f"Written in {time.perf_counter() - start_time:.2f}s")
+    return gameweeks_df
+
+
+def write_recent_state(season, gameweeks_df):
+    """
+    Saves the rows of the last RECENT_WINDOW gameweeks of an enriched season, which are all that is needed to calculate
+    the recent statistics of the next gameweek.
+    """
+    gameweeks = np.sort(gameweeks_df['GW'].unique())[-RECENT_WINDOW:]
+    state_df = gameweeks_df.loc[gameweeks_df['GW'].isin(gameweeks), ['name', 'GW'] + RECENT_STAT_COLUMNS]
+    state_df.to_csv(data_directory_location + season + "/" + RECENT_STATE_FILE, encoding="utf-8-sig", index=False)
+
+
+def read_recent_state(season):
+    """
+    Reads the rows of the last RECENT_WINDOW gameweeks of an enriched season, building them from merged_gw2.csv if
+    enrich_season has not saved them.
+    """
+    path = data_directory_location + season + "/" + RECENT_STATE_FILE
+    if not Path(path).exists():
+        gameweeks_df = pd.read_csv(data_directory_location + season + "/gws/merged_gw2.csv", encoding="utf-8-sig")
+        write_recent_state(season, gameweeks_df)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def append_gameweek(season, gameweek):
+    """
+    Enriches a new gws/gw<gameweek>.csv file and appends it to the end of merged_gw.csv and merged_gw2.csv, without
+    re-reading or re-enriching the rest of the season. The recent statistics of the new rows are calculated from the
+    saved rows of the previous RECENT_WINDOW gameweeks, so the cost depends on the size of a gameweek, not the season.
+
+    Args:
+        season (str): The season the gameweek belongs to.
+        gameweek (int): The new gameweek, which must come after every gameweek already in the data.
+
+    Returns:
+        pd.DataFrame: The enriched rows appended.
+
+    Raises:
+        ValueError: If the gameweek is not after the gameweeks already in the data.
+    """
+    print(f"---------------------------------- For season {season} gameweek {gameweek}: ----------------------------------")
+    season_location = data_directory_location + season + "/gws/"
+
+    start_time = time.perf_counter()
+    state_df = read_recent_state(season)
+    if gameweek <= state_df['GW'].max():
+        raise ValueError(f"Gameweek {gameweek} is not after the last gameweek ({state_df['GW'].max()}) in the data "
+                         f"for season {season}")
+    unaltered_gameweek_df = pd.read_csv(season_location + "gw" + str(gameweek) + ".csv", encoding="utf-8-sig")
+    unaltered_gameweek_df['GW'] = gameweek
+    stages = [(stage_name, stage) for stage_name, stage in get_enrichment_stages(season, unaltered_gameweek_df.columns)
+              if stage_name != "Recent stats"]
+    print(f"Read in {time.perf_counter() - start_time:.2f}s")
+
+    source_fingerprint = fingerprint_gameweeks(unaltered_gameweek_df)
+    gameweek_df = unaltered_gameweek_df.copy()
+    for stage_name, stage in stages:
+        start_time = time.perf_counter()
+        gameweek_df = stage(gameweek_df)
+        find_errors_in_gw(season, source_fingerprint, gameweek_df)
+        print(f"{stage_name} added in {time.perf_counter() - start_time:.2f}s")
+
+    # the new rows come after the state rows, so only their own recent statistics are kept
+    start_time = time.perf_counter()
+    window_df = pd.concat([state_df, gameweek_df[['name', 'GW'] + RECENT_STAT_COLUMNS]], ignore_index=True)
+    recent_df = calculate_recent_stats(window_df, RECENT_STAT_COLUMNS).iloc[len(state_df):]
+    recent_df.index = gameweek_df.index
+    gameweek_df = pd.concat([gameweek_df, recent_df.astype(np.float64)], axis=1)
+    print(f"Recent stats added in {time.perf_counter() - start_time:.2f}s")
+
+    # append using the column order of the files being appended to
+    start_time = time.perf_counter()
+    for file_name, df in [("merged_gw.csv", unaltered_gameweek_df), ("merged_gw2.csv", gameweek_df)]:
+        columns = pd.read_csv(season_location + file_name, encoding="utf-8-sig", nrows=0).columns
+        df.reindex(columns=columns).to_csv(season_location + file_name, mode="a", header=False, index=False)
+    write_recent_state(season, pd.concat([state_df, gameweek_df[state_df.columns]], ignore_index=True))
+    # merged_gw2.csv now matches the longer merged_gw.csv, so a full run does not need to rebuild it
+    record_artefact(season_location, "merged_gw2.csv", get_enrichment_fingerprint(season),
+                    [season_location + "merged_gw2.csv", data_directory_location + season + "/" + RECENT_STATE_FILE])
+    print(f"Appended in {time.perf_counter() - start_time:.2f}s")
+    return gameweek_df
+
+
+if __name__ == "__main__":
+    # python add_to_merged_gameweeks.py <season> <gameweek> appends a new gameweek rather than rebuilding every season
+    if len(sys.argv) == 3:
+        append_gameweek(sys.argv[1], int(sys.argv[2]))
     else:
-        print("Gameweek files are equal length")
-
+        for season in seasons:
+            if Path(data_directory_location + season + "/gws/merged_gw.csv").exists():
+                enrich_season(season, force="--force" in sys.argv)
+            else:
+                print(f"No merged gameweeks file for season {season}")
 
-def add_id_to_player_name():
-    season = "2021-22"
-    gw_file = '../../data/' + season + "/gws/merged_gw2.csv"
-    gameweeks_df = pd.read_csv(gw_file, encoding="utf-8-sig")
-    gameweeks_df["name"] = gameweeks_df["name"] + "_" + gameweeks_df["element"].astype(str)
-    # save new merged_gw dataframe
-    find_errors_in_gw(season)
-    gameweeks_df.to_csv(gw_file, encoding="utf-8-sig", index=False)
-
-    print(f"Player id added to name for season {season}")
-
-
-# do not uncomment unless starting from scratch enriching data. Needed this for duplicate Ben Davies
-# add_id_to_player_name()
-
-add_team_to_gameweeks()
-add_position_to_gameweeks()
-add_won_game_to_gameweeks()
-add_recent_stats("total_points")
-add_recent_stats("bps")
-add_recent_stats("minutes")
-add_recent_stats("goals_scored")
-add_recent_stats("goals_conceded")
-add_recent_stats("assists")
-add_recent_stats("clean_sheets")
-add_recent_stats("saves")
-add_recent_stats("yellow_cards")
-add_recent_stats("red_cards")
-add_recent_stats("creativity")
-add_recent_stats("won_game")
-
-# tackles not recorded for seasons 2019-20 onward
-# add_recent_stats("tackles")
-# not sure if these are relevant
-# add_recent_stats("transfers_in")
-# add_recent_stats("transfers_out")
-
-print()
-print("Enriching data complete.")
+    print()
+    print("Enriching data complete.")
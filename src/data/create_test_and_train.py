@@ -5,71 +5,213 @@ player performance prediction models. The data is separated by player positions
 (forwards, midfielders, defenders, and goalkeepers) to create position-specific
 models.
 
-The script performs the following tasks:
-
-Import required libraries (pandas and pathlib).
-Define the path to the data directory.
-Load and concatenate gameweek data for the seasons 2016-17 to 2019-20.
-Preprocess the data and create separate DataFrames for each player position.
-Save the position-specific training data to CSV files.
-Load and preprocess the test data for the 2021-22 season.
-Save the position-specific test data to CSV files.
-Load and preprocess the validation data for the 2020-21 season.
-Save the position-specific validation data to CSV files.
-"""
+The seasons 2016-17 to 2019-20 are used for training, 2020-21 for validation and 2021-22 for testing. Every season is
+loaded once into a SeasonCatalog, each row is labelled with the split of its season, and the rows are partitioned by
+(split, position) with a single groupby. The catalog sorts each season by gameweek then position, so the rows are put
+back in the order of the seasons' merged gameweek files first, keeping the splits in the order the models were
+trained and cross-validated on.
 
-import pandas as pd
-from pathlib import Path
+The splits are saved as one partitioned columnar dataset, test_and_train_data/splits.feather, holding every split
+sorted by split then position with a partition index in its metadata, so one split of one position is read by
+memory-mapping the file and slicing its rows. The position CSV files (e.g. fwds_train.csv) can still be written for
+use outside of Python, and are read if the dataset has not been made.
 
-path_to_data = str(Path(__file__).parent) + '/../../data/'
+The splits are only made again if the manifest (see manifest.py) shows that the merged gameweeks of a season, or the
+code reading them, have changed since they were last made.
 
-#get training data separated into positions for models
+Functions
+make_splits(catalog: SeasonCatalog = None) -> dict:
+Partitions the gameweeks of every season by (split, position) in memory, without writing anything.
 
-gameweeks_dfs = []
-for season in ["2016-17", "2017-18", "2018-19", "2019-20"]:
-    gw_file = path_to_data + season + "/gws/merged_gw2.csv"
-    gameweeks_dfs.append(pd.read_csv(gw_file, encoding="utf-8-sig"))
+write_splits(splits: dict, write_csv: bool = False) -> list:
+Writes the splits as the partitioned dataset, and optionally as the position CSV files.
 
-training_data = pd.concat(gameweeks_dfs)
-training_data['was_home'] = training_data['was_home'].astype(int)
-training_data_fwds = training_data[training_data['position'] == 'FWD']
-training_data_mids = training_data[training_data['position'] == 'MID']
-training_data_defs = training_data[training_data['position'] == 'DEF']
-training_data_gks = training_data[training_data['position'] == 'GK']
+read_split(split: str, position: str) -> pd.DataFrame:
+Reads one split of one position from the dataset, or from its CSV file if the dataset has not been made.
 
-training_data_fwds.to_csv(path_to_data + "test_and_train_data/fwds_train.csv", encoding="utf-8-sig", index=False)
-training_data_mids.to_csv(path_to_data + "test_and_train_data/mids_train.csv", encoding="utf-8-sig", index=False)
-training_data_defs.to_csv(path_to_data + "test_and_train_data/defs_train.csv", encoding="utf-8-sig", index=False)
-training_data_gks.to_csv(path_to_data + "test_and_train_data/gks_train.csv", encoding="utf-8-sig", index=False)
+split_source(split: str, position: str) -> str:
+Returns the path of the file read_split reads a split from.
 
-#get test data separated into positions for models
+read_split_columns(split: str, position: str) -> list:
+Returns the columns of a split without reading its rows.
 
-test_data_file = path_to_data + "2021-22" + "/gws/merged_gw2.csv"
-test_data = pd.read_csv(test_data_file, encoding="utf-8-sig")
-test_data['was_home'] = test_data['was_home'].astype(int)
-test_data_fwds = test_data[test_data['position'] == 'FWD']
-test_data_mids = test_data[test_data['position'] == 'MID']
-test_data_defs = test_data[test_data['position'] == 'DEF']
-test_data_gks = test_data[test_data['position'] == 'GK']
+create_test_and_train(force: bool = False, write_csv: bool = False) -> dict:
+Makes and writes the splits unless the manifest shows they are up to date.
 
-test_data_fwds.to_csv(path_to_data + "test_and_train_data/fwds_test.csv", encoding="utf-8-sig", index=False)
-test_data_mids.to_csv(path_to_data + "test_and_train_data/mids_test.csv", encoding="utf-8-sig", index=False)
-test_data_defs.to_csv(path_to_data + "test_and_train_data/defs_test.csv", encoding="utf-8-sig", index=False)
-test_data_gks.to_csv(path_to_data + "test_and_train_data/gks_test.csv", encoding="utf-8-sig", index=False)
+Usage
+Run the script to make the splits, adding --csv to also write the position CSV files and --force to make them even if
+they are up to date:
+$ python create_test_and_train.py
+"""
 
-#get validation data separated into positions for models
+import json
+import os
+import sys
+from pathlib import Path
 
-validation_data_file = path_to_data + "2020-21" + "/gws/merged_gw2.csv"
-validation_data = pd.read_csv(validation_data_file, encoding="utf-8-sig")
-validation_data['was_home'] = validation_data['was_home'].astype(int)
-validation_data_fwds = validation_data[validation_data['position'] == 'FWD']
-validation_data_mids = validation_data[validation_data['position'] == 'MID']
-validation_data_defs = validation_data[validation_data['position'] == 'DEF']
-validation_data_gks = validation_data[validation_data['position'] == 'GK']
+import numpy as np
+import pandas as pd
 
-validation_data_fwds.to_csv(path_to_data + "test_and_train_data/fwds_validation.csv", encoding="utf-8-sig", index=False)
-validation_data_mids.to_csv(path_to_data + "test_and_train_data/mids_validation.csv", encoding="utf-8-sig", index=False)
-validation_data_defs.to_csv(path_to_data + "test_and_train_data/defs_validation.csv", encoding="utf-8-sig", index=False)
-validation_data_gks.to_csv(path_to_data + "test_and_train_data/gks_validation.csv", encoding="utf-8-sig", index=False)
+from src.data import schema, season_catalog, season_store
+from src.data.manifest import make_fingerprint, is_up_to_date, record_artefact
+from src.data.schema import kickoff_time_to_string, read_gameweeks_csv
+from src.data.season_catalog import SeasonCatalog
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional, the position CSV files are written without it
+    pa = None
+    feather = None
 
+path_to_data = str(Path(__file__).parent) + '/../../data/'
+seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+
+SPLIT_SEASONS = {"train": ["2016-17", "2017-18", "2018-19", "2019-20"], "validation": ["2020-21"], "test": ["2021-22"]}
+POSITIONS = {"FWD": "fwd", "MID": "mid", "DEF": "def", "GK": "gk"}
+SPLITS_DATASET = "test_and_train_data/splits.feather"
+PARTITION_METADATA_KEY = b"split_partitions"
+
+split_files = [path_to_data + "test_and_train_data/" + position + "s_" + split + ".csv"
+               for split in ["train", "test", "validation"] for position in POSITIONS.values()]
+
+
+def _split_csv_path(split, position):
+    return path_to_data + "test_and_train_data/" + position + "s_" + split + ".csv"
+
+
+def make_splits(catalog=None):
+    """
+    Partitions the gameweeks of every season by (split, position) in memory, so models can be trained on the splits
+    without writing and re-reading them.
+
+    Args:
+        catalog (SeasonCatalog, optional): A catalog holding every season of SPLIT_SEASONS. Defaults to loading one.
+
+    Returns:
+        dict: The table of each (split, position), e.g. ("train", "fwd"), typed as in schema.py with was_home as 1/0.
+    """
+    # read every season once, the splits are groups of this
+    catalog = SeasonCatalog(seasons) if catalog is None else catalog
+    gameweeks_df = catalog.get_all_gameweeks()
+    # the catalog keeps each row's position in its season's file as its index, so this restores the file order the
+    # splits were made in before the catalog, which the unshuffled cross validation folds depend on
+    gameweeks_df = gameweeks_df.iloc[np.lexsort((gameweeks_df.index, gameweeks_df["season"].cat.codes))]
+
+    season_splits = {season: split for split, split_seasons in SPLIT_SEASONS.items() for season in split_seasons}
+    split_labels = gameweeks_df["season"].astype(str).map(season_splits)
+    gameweeks_df = gameweeks_df.drop(columns="season")
+    gameweeks_df["was_home"] = gameweeks_df["was_home"].astype("int8")
+
+    return {(split, POSITIONS[position]): split_df
+            for (split, position), split_df in gameweeks_df.groupby([split_labels, "position"], sort=False,
+                                                                    observed=True)
+            if position in POSITIONS}
+
+
+def write_splits(splits, write_csv=False):
+    """
+    Writes the splits as one uncompressed Feather file sorted by split then position, with the (start, stop) rows of
+    each (split, position) in its metadata.
+
+    Args:
+        splits (dict): The splits, from make_splits.
+        write_csv (bool, optional): Also write the position CSV files. Defaults to False, and is always done if pyarrow
+        is not installed.
+
+    Returns:
+        list: The paths of the files written.
+    """
+    paths = []
+    if feather is not None:
+        keys = [(split, position) for split in SPLIT_SEASONS for position in POSITIONS.values()
+                if (split, position) in splits]
+        partitions = {}
+        start = 0
+        for split, position in keys:
+            partitions[split + "/" + position] = [start, start + len(splits[(split, position)])]
+            start += len(splits[(split, position)])
+
+        table = pa.Table.from_pandas(pd.concat([splits[key] for key in keys], ignore_index=True),
+                                     preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata,
+                                               PARTITION_METADATA_KEY: json.dumps(partitions)})
+        feather.write_feather(table, path_to_data + SPLITS_DATASET, compression="uncompressed")
+        paths.append(path_to_data + SPLITS_DATASET)
+
+    if write_csv or feather is None:
+        for (split, position), split_df in splits.items():
+            split_df = split_df.copy()
+            split_df["kickoff_time"] = kickoff_time_to_string(split_df["kickoff_time"])
+            split_df.to_csv(_split_csv_path(split, position), encoding="utf-8-sig", index=False)
+            paths.append(_split_csv_path(split, position))
+    return paths
+
+
+def split_source(split, position):
+    """
+    Returns the path of the file read_split reads a split from, the dataset if it has been made or the position's CSV.
+    """
+    if feather is not None and os.path.exists(path_to_data + SPLITS_DATASET):
+        return path_to_data + SPLITS_DATASET
+    return _split_csv_path(split, position)
+
+
+def read_split_columns(split, position):
+    """
+    Returns the columns of a split, reading only the schema of the dataset or the header of the CSV.
+    """
+    path = split_source(split, position)
+    if path.endswith(".feather"):
+        return feather.read_table(path, memory_map=True).schema.names
+    return list(pd.read_csv(path, encoding="utf-8-sig", nrows=0).columns)
+
+
+def read_split(split, position):
+    """
+    Reads one split of one position. The rows are sliced out of the memory-mapped dataset if it has been made,
+    otherwise the position CSV file is read.
+
+    Args:
+        split (str): "train", "test" or "validation".
+        position (str): "fwd", "mid", "def" or "gk".
+
+    Returns:
+        pd.DataFrame: The split, typed as in schema.py.
+    """
+    path = split_source(split, position)
+    if path.endswith(".feather"):
+        table = feather.read_table(path, memory_map=True)
+        start, stop = json.loads(table.schema.metadata[PARTITION_METADATA_KEY])[split + "/" + position]
+        return table.slice(start, stop - start).to_pandas()
+    return read_gameweeks_csv(path)
+
+
+def create_test_and_train(force=False, write_csv=False):
+    """
+    Makes the splits and writes them, unless the manifest shows they were made from the same merged gameweeks and code.
+
+    Args:
+        force (bool, optional): Make the splits even if they are up to date. Defaults to False.
+        write_csv (bool, optional): Also write the position CSV files. Defaults to False.
+
+    Returns:
+        dict: The splits, from make_splits, or None if they were up to date.
+    """
+    # the splits are made from each season's merged gameweeks, read through the catalog
+    fingerprint = make_fingerprint([path_to_data + season + "/" + season_store.MERGED_GW_CSV for season in seasons],
+                                   params={"write_csv": write_csv},
+                                   modules=[sys.modules[__name__], season_catalog, season_store, schema])
+    outputs = ([path_to_data + SPLITS_DATASET] if feather is not None else []) + \
+        (split_files if write_csv or feather is None else [])
+    if not force and is_up_to_date(path_to_data + "test_and_train_data", "splits", fingerprint, outputs):
+        print("Test and train data is up to date")
+        return None
+
+    splits = make_splits()
+    record_artefact(path_to_data + "test_and_train_data", "splits", fingerprint, write_splits(splits, write_csv))
+    return splits
+
+
+if __name__ == "__main__":
+    create_test_and_train(force="--force" in sys.argv, write_csv="--csv" in sys.argv)
@@ -0,0 +1,337 @@
+"""
+ingest_gameweeks.py
+This module rebuilds a season's merged_gw.csv from its per-gameweek files (gws/gw1.csv, gws/gw2.csv, ...), which was
+previously done by hand. The gameweek files are read concurrently by a thread pool, their columns and types are
+checked against each other, and they are concatenated in gameweek order with a GW column added, as in the existing
+merged_gw.csv files.
+
+As well as merged_gw.csv, the merged table is written to gws/merged_gw.feather with a partition index in its metadata
+giving the (start, stop) rows of each gameweek and the hash of the file the rows were read from. Re-ingesting a season
+after a gameweek file has been corrected only parses the files whose hash has changed; the rows of the other
+gameweeks are taken from the memory-mapped Feather file. A season whose gameweek files, code and outputs are all
+unchanged in the manifest (see manifest.py) is not ingested again.
+
+The Feather file keeps the types pandas reads from the gameweek files (rather than the schema in schema.py). merged_gw.csv
+is written from the lines of the gameweek files themselves, with the gameweek appended, as it was made by hand: pandas
+would write a column made float by a missing value in any gameweek as 5.0 rather than 5, so rebuilding merged_gw.csv
+from unchanged gameweek files would change its bytes and its hash in the manifest.
+
+Functions
+list_gameweek_files(season: str) -> List[Tuple[int, str]]:
+Returns the gameweek and path of each gameweek file of a season, in gameweek order.
+
+check_gameweek_schemas(gameweek_dfs: dict) -> list:
+Checks that the gameweek files of a season have the same columns, and that no column is numeric in some files but
+text in others, returning the columns in order.
+
+read_partition_index(season: str) -> dict:
+Reads the gameweek partition index of a season's ingested Feather file.
+
+read_ingested_gameweeks(season: str, gameweeks: list = None) -> pd.DataFrame:
+Reads a season's ingested merged gameweeks, or only some of its gameweeks, from the Feather file.
+
+ingest_season(season: str, max_workers: int = None, force: bool = False) -> dict:
+Ingests the gameweek files of a season into merged_gw.csv and the Feather file, returning its throughput.
+
+ingest_seasons(seasons: list = None, max_workers: int = None, force: bool = False) -> pd.DataFrame:
+Ingests several seasons and prints a throughput report.
+
+Usage
+Run the script to ingest every season, or name the seasons to ingest, adding --force to re-parse every file:
+$ python ingest_gameweeks.py 2020-21 2021-22
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.data.manifest import make_fingerprint, hash_code, is_up_to_date, record_artefact
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional, merged_gw.csv is still written without it
+    pa = None
+    feather = None
+
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+available_seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+
+GAMEWEEK_FILE_PATTERN = re.compile(r"^gw(\d+)\.csv$")
+MERGED_GW_RAW_CSV = "gws/merged_gw.csv"
+MERGED_GW_RAW_FEATHER = "gws/merged_gw.feather"
+PARTITION_METADATA_KEY = b"gw_partitions"
+
+
+def list_gameweek_files(season):
+    """
+    Returns the gameweek files of a season, e.g. (12, ".../gws/gw12.csv"), sorted by gameweek rather than by name.
+    """
+    gws_location = data_directory_location + season + "/gws/"
+    files = []
+    for file_name in os.listdir(gws_location):
+        match = GAMEWEEK_FILE_PATTERN.match(file_name)
+        if match:
+            files.append((int(match.group(1)), gws_location + file_name))
+    return sorted(files)
+
+
+def _read_gameweek_file(path):
+    # the gameweek files of 2016-17 to 2018-19 are latin-1 rather than utf-8
+    try:
+        return pd.read_csv(path, encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding="latin-1")
+
+
+def _read_gameweek_lines(path):
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            return file.read().splitlines()
+    except UnicodeDecodeError:
+        with open(path, encoding="latin-1", newline="") as file:
+            return file.read().splitlines()
+
+
+def _write_merged_csv(path, files, gameweek_dfs, columns):
+    # each gameweek's rows are its file's lines with the gameweek appended, so values are written as in the file;
+    # a file with its columns in another order has its rows written by pandas in the merged order instead
+    header = ",".join(columns)
+    with open(path, "w", encoding="utf-8-sig", newline="") as file:
+        file.write(header + ",GW\n")
+        for gameweek, gameweek_path in files:
+            lines = _read_gameweek_lines(gameweek_path)
+            if lines and lines[0] == header:
+                file.writelines(line + "," + str(gameweek) + "\n" for line in lines[1:] if line)
+            elif len(gameweek_dfs[gameweek]):
+                gameweek_dfs[gameweek][columns].assign(GW=gameweek).to_csv(file, header=False, index=False)
+
+
+def _kind_of_column(column):
+    # integer and float columns can be mixed, as a column with a missing value is read as float
+    if pd.api.types.is_bool_dtype(column):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(column):
+        return "numeric"
+    return "text"
+
+
+def check_gameweek_schemas(gameweek_dfs):
+    """
+    Checks the gameweek files of a season against each other before they are merged. Every file must have the same
+    columns, though not necessarily in the same order, and a column must not be read as numbers in some files but as
+    text in others, which would happen if a value in one file were corrupted. Files with no rows, such as the gameweeks
+    of 2019-20 postponed by the pandemic, only have their columns checked.
+
+    Args:
+        gameweek_dfs (dict): A dictionary of gameweek to the table read from its file.
+
+    Returns:
+        list: The columns of the first gameweek, in the order the merged table uses.
+
+    Raises:
+        ValueError: Listing every file with different columns or differently typed columns.
+    """
+    gameweeks = sorted(gameweek_dfs)
+    columns = list(gameweek_dfs[gameweeks[0]].columns)
+    errors = []
+    for gameweek in gameweeks:
+        df = gameweek_dfs[gameweek]
+        missing = [column for column in columns if column not in df.columns]
+        extra = [column for column in df.columns if column not in columns]
+        if missing or extra:
+            errors.append(f"gw{gameweek}.csv: missing columns {missing}, extra columns {extra}")
+
+    kinds = {}
+    for gameweek in gameweeks:
+        df = gameweek_dfs[gameweek]
+        if len(df) == 0:
+            continue
+        for column in columns:
+            if column in df.columns:
+                kinds.setdefault(column, {}).setdefault(_kind_of_column(df[column]), []).append(gameweek)
+    for column, column_kinds in kinds.items():
+        if len(column_kinds) > 1:
+            found = ", ".join(f"{kind} in gameweeks {gws}" for kind, gws in column_kinds.items())
+            errors.append(f"column {column} is {found}")
+
+    if errors:
+        raise ValueError("The gameweek files do not have the same schema:\n" + "\n".join(errors))
+    return columns
+
+
+def _feather_path(season):
+    return data_directory_location + season + "/" + MERGED_GW_RAW_FEATHER
+
+
+def read_partition_index(season):
+    """
+    Reads the partition index of a season's ingested Feather file.
+
+    Args:
+        season (str): The season to read.
+
+    Returns:
+        dict: The code hash the file was made with ("code") and, for each gameweek ("partitions"), its (start, stop)
+        rows and the hash of its gameweek file. None if the file has not been made or pyarrow is not installed.
+    """
+    path = _feather_path(season)
+    if feather is None or not os.path.exists(path):
+        return None
+    metadata = feather.read_table(path, memory_map=True).schema.metadata or {}
+    if PARTITION_METADATA_KEY not in metadata:
+        return None
+    index = json.loads(metadata[PARTITION_METADATA_KEY])
+    index["partitions"] = {int(gameweek): partition for gameweek, partition in index["partitions"].items()}
+    return index
+
+
+def read_ingested_gameweeks(season, gameweeks=None):
+    """
+    Reads a season's ingested merged gameweeks from the memory-mapped Feather file, using the partition index to read
+    only the rows of the gameweeks wanted.
+
+    Args:
+        season (str): The season to read.
+        gameweeks (list, optional): Only read these gameweeks. Defaults to reading every gameweek.
+
+    Returns:
+        pd.DataFrame: The merged gameweeks, as read from the gameweek files.
+
+    Raises:
+        FileNotFoundError: If the season has not been ingested, or pyarrow is not installed.
+    """
+    index = read_partition_index(season)
+    if index is None:
+        raise FileNotFoundError(f"Season {season} has not been ingested to {_feather_path(season)}")
+    table = feather.read_table(_feather_path(season), memory_map=True)
+    if gameweeks is None:
+        return table.to_pandas()
+
+    partitions = [index["partitions"][gameweek] for gameweek in gameweeks if gameweek in index["partitions"]]
+    return pa.concat_tables([table.slice(partition["start"], partition["stop"] - partition["start"])
+                             for partition in partitions]).to_pandas()
+
+
+def _write_feather(season, df, partitions, code):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    index = {"code": code, "partitions": {str(gameweek): partition for gameweek, partition in partitions.items()}}
+    # keep the pandas metadata so the table is read back with the same types
+    table = table.replace_schema_metadata({**table.schema.metadata, PARTITION_METADATA_KEY: json.dumps(index)})
+    # compression has to be off for the file to be memory-mapped rather than decompressed into memory
+    feather.write_feather(table, _feather_path(season), compression="uncompressed")
+
+
+def ingest_season(season, max_workers=None, force=False):
+    """
+    Merges the gameweek files of a season into gws/merged_gw.csv and gws/merged_gw.feather. Only the gameweek files
+    whose hash differs from the partition index of the previous ingest are parsed, by a thread pool; the other
+    gameweeks are sliced out of the previous Feather file. Nothing is done if the manifest shows the outputs were made
+    from the same files and code.
+
+    Args:
+        season (str): The season to ingest, e.g. "2021-22".
+        max_workers (int, optional): The number of threads reading files. Defaults to the ThreadPoolExecutor default.
+        force (bool, optional): Parse every file and rewrite the outputs even if they are up to date. Defaults to False.
+
+    Returns:
+        dict: The season, status ("done" or "up to date"), number of files, number parsed and reused, rows, megabytes
+        parsed, seconds taken and the rows and megabytes parsed per second.
+
+    Raises:
+        ValueError: If the gameweek files do not have the same schema, or a file's rows are from another round.
+    """
+    start_time = time.perf_counter()
+    season_location = data_directory_location + season + "/"
+    files = list_gameweek_files(season)
+    outputs = [season_location + MERGED_GW_RAW_CSV] + ([_feather_path(season)] if feather is not None else [])
+
+    fingerprint = make_fingerprint([path for _, path in files], modules=[sys.modules[__name__]])
+    report = {"season": season, "status": "up to date", "files": len(files), "parsed": 0, "reused": 0, "rows": 0,
+              "mb_parsed": 0.0}
+    if not force and is_up_to_date(season_location, "merged_gw.csv", fingerprint, outputs):
+        report["seconds"] = time.perf_counter() - start_time
+        return report
+
+    # gameweeks whose file is unchanged since the last ingest, made by the same code, are taken from the Feather file
+    file_hashes = {gameweek: fingerprint["inputs"][os.path.basename(path)] for gameweek, path in files}
+    code = hash_code([sys.modules[__name__]])
+    index = None if force else read_partition_index(season)
+    reusable = {}
+    if index is not None and index["code"] == code:
+        reusable = {gameweek: partition for gameweek, partition in index["partitions"].items()
+                    if file_hashes.get(gameweek) == partition["hash"]}
+
+    gameweek_dfs = {}
+    if reusable:
+        previous = feather.read_table(_feather_path(season), memory_map=True)
+        for gameweek, partition in reusable.items():
+            rows = previous.slice(partition["start"], partition["stop"] - partition["start"]).to_pandas()
+            gameweek_dfs[gameweek] = rows.drop(columns="GW")
+
+    to_parse = [(gameweek, path) for gameweek, path in files if gameweek not in reusable]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        parsed_dfs = list(executor.map(_read_gameweek_file, [path for _, path in to_parse]))
+    gameweek_dfs.update({gameweek: df for (gameweek, _), df in zip(to_parse, parsed_dfs)})
+
+    columns = check_gameweek_schemas(gameweek_dfs)
+    wrong_round = [gameweek for gameweek, df in gameweek_dfs.items() if (df["round"] != gameweek).any()]
+    if wrong_round:
+        raise ValueError(f"Gameweek files {sorted(wrong_round)} of season {season} have rows from another round")
+
+    # empty gameweeks are left out of the concat so they do not turn every column into objects
+    merged_dfs = []
+    partitions = {}
+    start = 0
+    for gameweek, _ in files:
+        df = gameweek_dfs[gameweek][columns]
+        partitions[gameweek] = {"start": start, "stop": start + len(df), "hash": file_hashes[gameweek]}
+        start += len(df)
+        if len(df):
+            merged_dfs.append(df.assign(GW=gameweek))
+    merged_df = pd.concat(merged_dfs, ignore_index=True)
+
+    _write_merged_csv(season_location + MERGED_GW_RAW_CSV, files, gameweek_dfs, columns)
+    if feather is not None:
+        _write_feather(season, merged_df, partitions, code)
+    record_artefact(season_location, "merged_gw.csv", fingerprint, outputs)
+
+    seconds = time.perf_counter() - start_time
+    mb_parsed = sum(os.path.getsize(path) for _, path in to_parse) / 1024 ** 2
+    report.update({"status": "done", "parsed": len(to_parse), "reused": len(reusable), "rows": len(merged_df),
+                   "mb_parsed": mb_parsed, "seconds": seconds, "rows_per_second": len(merged_df) / seconds,
+                   "mb_per_second": mb_parsed / seconds})
+    return report
+
+
+def ingest_seasons(seasons=None, max_workers=None, force=False):
+    """
+    Ingests several seasons, one after another, each using a thread pool to read its files.
+
+    Args:
+        seasons (list, optional): The seasons to ingest. Defaults to every season.
+        max_workers (int, optional): The number of threads reading files. Defaults to the ThreadPoolExecutor default.
+        force (bool, optional): Parse every file and rewrite the outputs even if they are up to date. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The throughput report of each season.
+    """
+    if seasons is None:
+        seasons = available_seasons
+
+    start_time = time.perf_counter()
+    report = pd.DataFrame([ingest_season(season, max_workers, force) for season in seasons]).set_index("season")
+
+    print(report.round(2).to_string())
+    print(f"Ingested {len(seasons)} seasons in {time.perf_counter() - start_time:.2f}s")
+    return report
+
+
+if __name__ == "__main__":
+    ingest_seasons([arg for arg in sys.argv[1:] if not arg.startswith("--")] or None, force="--force" in sys.argv)
@@ -0,0 +1,126 @@
+"""
+manifest.py
+This module keeps a manifest of the derived data files (merged_gw2.csv, cleaned_players.csv and the test and train
+splits) so that the scripts making them can tell whether they need to run again. Checking whether a column is already
+in a file does not notice when the files it was made from, or the code making it, have changed.
+
+Each data directory has a manifest.json recording, for every artefact made in it, a fingerprint of what it was made
+from (the SHA-256 hashes of its input files, the parameters of the stage and a hash of the source code of the modules
+making it) and the hashes of the output files written. An artefact is up to date if its fingerprint is unchanged and
+its output files are still the ones written, so editing an input, a parameter or the code, or changing an output by
+hand, makes it be rebuilt.
+
+There is one manifest per directory, rather than one for all the data, so that seasons being prepared in parallel
+never write to the same manifest.
+
+Functions
+hash_file(path: str) -> str:
+Returns the SHA-256 hash of a file, or None if it does not exist.
+
+hash_code(modules: list) -> str:
+Returns a hash of the source code of some modules, used as the version of the code making an artefact.
+
+make_fingerprint(inputs: list, params: dict = None, modules: list = None) -> dict:
+Returns the fingerprint of an artefact from its input files, stage parameters and code.
+
+is_up_to_date(directory: str, artefact: str, fingerprint: dict, outputs: list) -> bool:
+Checks whether an artefact was made from the same fingerprint and its output files are unchanged.
+
+record_artefact(directory: str, artefact: str, fingerprint: dict, outputs: list):
+Records the fingerprint and output hashes of an artefact after it has been made.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_FILE = "manifest.json"
+
+
+def hash_file(path):
+    if not os.path.exists(path):
+        return None
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def hash_code(modules):
+    sha = hashlib.sha256()
+    for module in modules:
+        sha.update(Path(module.__file__).read_bytes())
+    return sha.hexdigest()
+
+
+def make_fingerprint(inputs, params=None, modules=None):
+    """
+    Returns the fingerprint of an artefact.
+
+    Args:
+        inputs (list): The paths of the files the artefact is made from.
+        params (dict, optional): The parameters of the stage making it, which must be JSON serialisable.
+        modules (list, optional): The modules whose code makes it.
+
+    Returns:
+        dict: The input file hashes (keyed by file name), parameters and code hash.
+    """
+    return {"inputs": {os.path.basename(path): hash_file(path) for path in inputs},
+            # round trip through JSON so the fingerprint compares equal to the one read back from the manifest
+            "params": json.loads(json.dumps(params or {})),
+            "code": hash_code(modules or [])}
+
+
+def _manifest_path(directory):
+    return os.path.join(directory, MANIFEST_FILE)
+
+
+def read_manifest(directory):
+    path = _manifest_path(directory)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def is_up_to_date(directory, artefact, fingerprint, outputs):
+    """
+    Checks whether an artefact needs to be made again.
+
+    Args:
+        directory (str): The directory holding the manifest, i.e. the directory the artefact is written to.
+        artefact (str): The name of the artefact in the manifest.
+        fingerprint (dict): The fingerprint of the artefact now, from make_fingerprint.
+        outputs (list): The paths of the files making up the artefact.
+
+    Returns:
+        bool: True if the artefact was made from the same fingerprint and its files have not changed since.
+    """
+    entry = read_manifest(directory).get(artefact)
+    if entry is None or entry["fingerprint"] != fingerprint:
+        return False
+    return all(entry["outputs"].get(os.path.basename(path)) == hash_file(path) for path in outputs) and \
+        len(entry["outputs"]) == len(outputs)
+
+
+def record_artefact(directory, artefact, fingerprint, outputs):
+    """
+    Records an artefact in the manifest of its directory after it has been made.
+
+    Args:
+        directory (str): The directory holding the manifest.
+        artefact (str): The name of the artefact in the manifest.
+        fingerprint (dict): The fingerprint it was made from, from make_fingerprint.
+        outputs (list): The paths of the files written.
+    """
+    manifest = read_manifest(directory)
+    manifest[artefact] = {"fingerprint": fingerprint,
+                          "outputs": {os.path.basename(path): hash_file(path) for path in outputs}}
+
+    # write then rename so an interrupted write does not leave a broken manifest
+    path = _manifest_path(directory)
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,321 @@
+"""
+match_stats.py
+This module loads the per-match statistics scraped from fbref and understat (data/<season>/fbref/ and
+data/<season>/understat/), which hold one small CSV file per player, and joins the understat statistics onto the FPL
+gameweek table.
+
+The files of a source are read in parallel by a thread pool and stacked into one typed table, with the file each row
+came from kept as an id column (fbref_id, the name of an fbref file, or understat_id, the number at the end of an
+understat file name). Text columns are categoricals, numbers float32 and dates datetime64. The tables can be saved as
+uncompressed Feather files in the season's directory so later loads only memory-map them.
+
+The understat statistics are joined onto the gameweek table through id_dict.csv, which gives the FPL element id of
+each understat id, by looking up each gameweek row's (element, match date) in an index of the understat rows rather
+than by matching names. The fbref files have no player name or id in them, and id_dict.csv only covers understat, so
+the fbref table is keyed by fbref_id alone and is not joined. Seasons without per-player understat files or an
+id_dict.csv (2016-17 to 2020-21 in the data) get missing understat_ columns.
+
+The understat_ columns can be used as variables of the models in parameterised_model.py, as join_understat_features
+adds the ones a table lacks to the test and train splits, finding the season of each row from its kickoff time.
+
+Functions
+load_match_files(season: str, source: str, max_workers: int = None) -> pd.DataFrame:
+Reads every per-player file of a source ("fbref" or "understat") of a season in parallel into one typed table.
+
+build_match_stats(season: str, max_workers: int = None) -> Dict[str, str]:
+Saves the tables of every source a season has as Feather files.
+
+read_match_stats(season: str, source: str) -> pd.DataFrame:
+Reads the table of a source, memory-mapping the Feather file if it is up to date, otherwise loading the files.
+
+read_id_dict(season: str) -> pd.DataFrame:
+Reads the understat id to FPL element id mapping of a season.
+
+join_understat_to_gameweeks(gameweeks_df: pd.DataFrame, season: str, columns: list = None,
+                            understat_df: pd.DataFrame = None) -> pd.DataFrame:
+Adds understat statistics of each player's match to a gameweek table as understat_<column> columns.
+
+join_understat_features(gameweeks_df: pd.DataFrame, feature_names: list) -> pd.DataFrame:
+Adds the understat_ features a gameweek table of any seasons lacks, e.g. one of the test and train splits.
+
+understat_source_hash() -> str:
+Returns a hash of the understat files and id_dict.csv of every season, which changes when any of them do.
+
+Usage
+Run the script to save the tables of every season with per-player files:
+$ python match_stats.py
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data.recent_features import season_of_kickoff
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional, the per-player files are always available
+    feather = None
+
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+
+MATCH_STATS_FILES = {"fbref": "fbref_matches.feather", "understat": "understat_matches.feather"}
+MATCH_ID_COLUMNS = {"fbref": "fbref_id", "understat": "understat_id"}
+ID_DICT_FILE = "id_dict.csv"
+
+UNDERSTAT_PREFIX = "understat_"
+UNDERSTAT_COLUMNS = ["shots", "xG", "xA", "key_passes", "npg", "npxG", "xGChain", "xGBuildup"]
+
+
+def _match_files(season, source):
+    """
+    Returns the (id, path) of each per-player file of a source. The understat directory also holds a file per team
+    (understat_<team>.csv), which are left out as they do not end in an id.
+    """
+    source_location = data_directory_location + season + "/" + source + "/"
+    if not os.path.isdir(source_location):
+        return []
+
+    files = []
+    for file_name in sorted(os.listdir(source_location)):
+        stem, extension = os.path.splitext(file_name)
+        if extension != ".csv":
+            continue
+        if source == "understat":
+            stem = stem.rsplit("_", 1)[-1]
+            if not stem.isdigit():
+                continue
+        files.append((stem, source_location + file_name))
+    return files
+
+
+def _type_match_stats(df):
+    df["date"] = pd.to_datetime(df["date"])
+    for column in df.columns:
+        if column == "date":
+            continue
+        if pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = df[column].astype("float32")
+        else:
+            df[column] = df[column].astype("category")
+    return df
+
+
+def load_match_files(season, source, max_workers=None):
+    """
+    Reads every per-player file of a source of a season, using a thread pool, and stacks them into one typed table.
+
+    Args:
+        season (str): The season to load, e.g. "2021-22".
+        source (str): "fbref" or "understat".
+        max_workers (int, optional): The number of threads reading files. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        pd.DataFrame: Every row of every file, with the id of the file it came from as the first column, or None if
+        the season has no files for the source.
+    """
+    files = _match_files(season, source)
+    if not files:
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        player_dfs = list(executor.map(lambda path: pd.read_csv(path, encoding="utf-8-sig"),
+                                       [path for _, path in files]))
+
+    df = pd.concat(player_dfs, ignore_index=True)
+    ids = np.repeat([file_id for file_id, _ in files], [len(player_df) for player_df in player_dfs])
+    if source == "understat":
+        df.insert(0, MATCH_ID_COLUMNS[source], ids.astype(np.int64))
+    else:
+        df.insert(0, MATCH_ID_COLUMNS[source], pd.Categorical(ids))
+    return _type_match_stats(df)
+
+
+def _feather_path(season, source):
+    return data_directory_location + season + "/" + MATCH_STATS_FILES[source]
+
+
+def build_match_stats(season, max_workers=None):
+    """
+    Loads the tables of every source a season has files for and saves each as an uncompressed Feather file in the
+    season's directory.
+
+    Args:
+        season (str): The season to save.
+        max_workers (int, optional): The number of threads reading files. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        Dict[str, str]: The path of the file written for each source.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required to save the match statistics")
+
+    paths = {}
+    for source in MATCH_STATS_FILES:
+        start_time = time.perf_counter()
+        df = load_match_files(season, source, max_workers)
+        if df is None:
+            continue
+        paths[source] = _feather_path(season, source)
+        feather.write_feather(df, paths[source], compression="uncompressed")
+        print(f"Saved {len(df)} {source} rows for season {season} in {time.perf_counter() - start_time:.2f}s")
+    return paths
+
+
+def _is_feather_up_to_date(season, source):
+    # adding, removing or replacing a file in the source directory updates the directory's modification time
+    path = _feather_path(season, source)
+    if feather is None or not os.path.exists(path):
+        return False
+    source_location = data_directory_location + season + "/" + source
+    newest = max([os.path.getmtime(source_location)] +
+                 [os.path.getmtime(file_path) for _, file_path in _match_files(season, source)])
+    return newest <= os.path.getmtime(path)
+
+
+def read_match_stats(season, source):
+    """
+    Reads the table of a source of a season. The Feather file is memory-mapped if it is newer than every file of the
+    source, otherwise the files are loaded.
+
+    Args:
+        season (str): The season to read.
+        source (str): "fbref" or "understat".
+
+    Returns:
+        pd.DataFrame: The table, or None if the season has no files for the source.
+    """
+    if _is_feather_up_to_date(season, source):
+        return feather.read_table(_feather_path(season, source), memory_map=True).to_pandas()
+    return load_match_files(season, source)
+
+
+def read_id_dict(season):
+    """
+    Reads id_dict.csv of a season, whose column names have spaces after the commas.
+
+    Args:
+        season (str): The season to read.
+
+    Returns:
+        pd.DataFrame: The understat_id and FPL element of each player.
+
+    Raises:
+        FileNotFoundError: If the season has no id_dict.csv.
+    """
+    id_dict = pd.read_csv(data_directory_location + season + "/" + ID_DICT_FILE, encoding="utf-8-sig",
+                          skipinitialspace=True)
+    return id_dict.rename(columns={"Understat_ID": "understat_id", "FPL_ID": "element"})[["understat_id", "element"]]
+
+
+def _match_dates(kickoff_times):
+    # understat dates are the day of the match in England, which is not always the UTC day of the kickoff
+    return pd.to_datetime(kickoff_times, utc=True).dt.tz_convert("Europe/London").dt.tz_localize(None).dt.normalize()
+
+
+def join_understat_to_gameweeks(gameweeks_df, season, columns=None, understat_df=None):
+    """
+    Adds the understat statistics of each player's match to a gameweek table. The understat rows are indexed by
+    (element, match date), using id_dict.csv to find the element of each understat id, and each gameweek row is looked
+    up in the index. Rows of players who are not in id_dict.csv, or who did not play, are left missing, as is every
+    row if the season has no per-player understat files or no id_dict.csv.
+
+    Args:
+        gameweeks_df (pd.DataFrame): A gameweek table of the season, with element and kickoff_time columns.
+        season (str): The season of the table, whose id_dict.csv is used.
+        columns (list, optional): The understat columns to add. Defaults to UNDERSTAT_COLUMNS.
+        understat_df (pd.DataFrame, optional): The understat table of the season. Defaults to reading it.
+
+    Returns:
+        pd.DataFrame: The gameweek table with an understat_<column> column (as float32) for each column, with the same
+        index and row order.
+    """
+    columns = UNDERSTAT_COLUMNS if columns is None else columns
+    if understat_df is None:
+        understat_df = read_match_stats(season, "understat")
+    if understat_df is None or not os.path.exists(data_directory_location + season + "/" + ID_DICT_FILE):
+        return gameweeks_df.assign(**{UNDERSTAT_PREFIX + column: np.full(len(gameweeks_df), np.nan, dtype=np.float32)
+                                      for column in columns})
+    id_dict = read_id_dict(season)
+
+    # element of each understat row, -1 for players not in id_dict.csv
+    id_rows = pd.Index(id_dict["understat_id"]).get_indexer(understat_df["understat_id"])
+    elements = np.where(id_rows >= 0, id_dict["element"].to_numpy()[id_rows], -1)
+    understat_index = pd.MultiIndex.from_arrays([elements, understat_df["date"].dt.normalize()])
+    # a player has at most one match a day, but keep the first row if a file repeats one
+    unique_rows = ~understat_index.duplicated()
+
+    gameweeks_index = pd.MultiIndex.from_arrays([gameweeks_df["element"].to_numpy(),
+                                                 _match_dates(gameweeks_df["kickoff_time"]).to_numpy()])
+    rows = understat_index[unique_rows].get_indexer(gameweeks_index)
+
+    gameweeks_df = gameweeks_df.copy()
+    for column in columns:
+        values = understat_df[column].to_numpy()[unique_rows]
+        gameweeks_df[UNDERSTAT_PREFIX + column] = np.where(rows >= 0, values[rows], np.nan).astype(np.float32)
+    return gameweeks_df
+
+
+
+def join_understat_features(gameweeks_df, feature_names):
+    """
+    Adds the understat_ features a gameweek table lacks, joining each season's rows with join_understat_to_gameweeks.
+    Features already in the table, and features which are not understat_ columns, are left as they are.
+
+    Args:
+        gameweeks_df (pd.DataFrame): A gameweek table of one or more seasons, with element and kickoff_time columns.
+        feature_names (list): The features wanted, e.g. the variables of a model.
+
+    Returns:
+        pd.DataFrame: The gameweek table with the understat_ features added, with the same index and row order.
+    """
+    missing = [feature_name[len(UNDERSTAT_PREFIX):] for feature_name in feature_names
+               if feature_name.startswith(UNDERSTAT_PREFIX) and feature_name not in gameweeks_df.columns]
+    if not missing:
+        return gameweeks_df
+
+    row_seasons = (gameweeks_df["season"].astype(str) if "season" in gameweeks_df.columns
+                   else season_of_kickoff(gameweeks_df["kickoff_time"])).to_numpy()
+    features = np.full((len(gameweeks_df), len(missing)), np.nan, dtype=np.float32)
+    for season in pd.unique(row_seasons):
+        rows = np.flatnonzero(row_seasons == season)
+        season_df = join_understat_to_gameweeks(gameweeks_df.iloc[rows], season, missing)
+        features[rows] = season_df[[UNDERSTAT_PREFIX + column for column in missing]].to_numpy()
+
+    gameweeks_df = gameweeks_df.copy()
+    for i, column in enumerate(missing):
+        gameweeks_df[UNDERSTAT_PREFIX + column] = features[:, i]
+    return gameweeks_df
+
+
+def understat_source_hash():
+    """
+    Returns a hash of the names, sizes and modification times of the understat files, the understat Feather file and
+    id_dict.csv of every season, so anything cached from the understat_ features can be rebuilt when they change.
+
+    Returns:
+        str: The hash.
+    """
+    sha = hashlib.sha256()
+    for season in seasons:
+        paths = [path for _, path in _match_files(season, "understat")]
+        paths += [_feather_path(season, "understat"), data_directory_location + season + "/" + ID_DICT_FILE]
+        for path in paths:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                sha.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return sha.hexdigest()
+
+
+if __name__ == "__main__":
+    for season in seasons:
+        build_match_stats(season)
@@ -5,21 +5,35 @@ retrieve various types of player data for Fantasy Premier League (FPL) analysis.
 The PlayerData class includes methods to:
 
 Retrieve player data based on season, position, or specified conditions.
-Get player IDs, team IDs, and historical or current season statistics.
+Get player IDs, team IDs, and historical or current season statistics, for one or many players at once. IDs, teams
+and each player's games are looked up in indexes built once per season rather than by reading files.
 Determine if a player played in a specific gameweek or if a game was played at home.
 Get all player stats from the previous season or total current season stats.
 Retrieve all player stats for a specific gameweek, filtered by position if needed.
 Select random players from the first gameweek, filtered by position.
 Check if a player is present in a specific gameweek.
+Attach a predicted_points column scored by the models in the model store, made when the merged gameweek table is
+first needed, so any season or model can be simulated without writing a file.
 """
 
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from src.data.player_store import read_player_store
+from src.data.schema import memory_usage_mb
+from src.data.season_store import read_merged_gameweeks, sort_gameweeks, build_gameweek_offsets
+from src.utils.utils import LRUCache
+
 
 class PlayerData:
-    def __init__(self, season):
+    # columns needed to slice the merged gameweek table and index each player's games, so they are always loaded
+    _key_columns = ["name", "GW", "position", "element", "kickoff_time"]
+    # each projection copies its columns of the whole season, so only the few most recently used are kept
+    _projection_cache_size = 8
+
+    def __init__(self, season, condition_cache_size=128, columns=None, catalog=None):
         print("placeholder")
         self._data_location = str(Path(__file__).parent) + '/../../data/' + season + "/"
         self._available_seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
@@ -39,24 +53,99 @@ class PlayerData:
         else:
             self._season = season
 
+        # a SeasonCatalog to take the season's tables from rather than reading them
+        self._catalog = catalog
+
+        # if given, only these columns of the merged gameweek table are loaded
+        self._columns = None
+        if columns is not None:
+            self._columns = self._key_columns + [column for column in columns if column not in self._key_columns]
+
         self._merged_gw_stats = None
-        self._gw_stats_dict = None
-        self._gw_pos_stats_dict = None
-        self._gw_condition_stats_dict = None
+        # copies of the sorted merged gameweek table holding only the columns asked for, keyed by the columns
+        self._projections = LRUCache(self._projection_cache_size)
+        # (start, stop) row offsets into the merged gameweek table, which is sorted by GW then position on load
+        self._gw_offsets = None
+        self._gw_pos_offsets = None
+        # boolean masks over a gameweek's rows, keyed by (gameweek, condition)
+        self._condition_cache = LRUCache(condition_cache_size)
+
+        # indexes for looking up single players, built the first time they are needed
+        self._player_id_index = None
+        self._player_team_index = None
+        self._player_rows = None
+        self._player_row_starts = None
+        self._player_row_counts = None
+        self._player_history = None
+        self._player_history_offsets = None
+
+        # (type, variables, scoring_weights) of the models scoring the predicted_points column, if it is to be attached
+        self._points_model = None
+
+    def _get_player_id_index(self):
+        # (first_name, second_name) -> id, read once from player_idlist.csv
+        if self._player_id_index is None:
+            df = pd.read_csv(self._data_location + 'player_idlist.csv', encoding="utf-8-sig")
+            self._player_id_index = dict(zip(zip(df.first_name, df.second_name), df.id))
+        return self._player_id_index
+
+    def _get_player_team_index(self):
+        # id -> team id, read once from players_raw.csv
+        if self._player_team_index is None:
+            df = pd.read_csv(self._data_location + 'players_raw.csv', encoding="utf-8-sig", usecols=["id", "team"])
+            self._player_team_index = dict(zip(df.id, df.team))
+        return self._player_team_index
+
+    def _build_player_row_index(self):
+        # order of the merged gameweek table's rows by player id then kickoff time, so each player's games are a
+        # contiguous run of this array. The run for player id i starts at _player_row_starts[i]
+        df = self.get_all_players_all_gw_stats()
+        elements = df["element"].to_numpy().astype(np.int64)
+        self._player_rows = np.lexsort((df["kickoff_time"].to_numpy(), elements))
+        self._player_row_counts = np.bincount(elements, minlength=elements.max() + 1)
+        self._player_row_starts = np.r_[0, np.cumsum(self._player_row_counts)[:-1]]
+
+    def _require_columns(self, columns):
+        # a clear error, rather than a KeyError from deep in pandas, when a column was left out of the columns loaded
+        if self._columns is None:
+            return
+        loaded = self._columns + (["predicted_points"] if self._points_model is not None else [])
+        missing = [column for column in columns if column not in loaded]
+        if missing:
+            raise ValueError(f"Columns {missing} were not loaded, add them to the columns of PlayerData for season "
+                             f"{self._season}")
 
     def get_player_id(self, first_name, last_name):
-        player_id_path = self._data_location + 'player_idlist.csv'
-        df = pd.read_csv(player_id_path)
-        player_id = (df.loc[(df.first_name == self.first_name) & (df.second_name == self.last_name), "id"]).tolist()[0]
-        return player_id
+        return self._get_player_id_index()[(first_name, last_name)]
+
+    def get_player_ids(self, names):
+        """
+        Returns the ids of many players at once.
+
+        Args:
+            names (List[Tuple[str, str]]): A list of (first_name, last_name) tuples.
+
+        Returns:
+            List[int]: The id of each player.
+        """
+        player_id_index = self._get_player_id_index()
+        return [player_id_index[(first_name, last_name)] for first_name, last_name in names]
 
     def get_player_id_string(self, first_name, last_name):
         player_id = self.get_player_id(first_name, last_name)
-        player_id_string = self.first_name + "_" + self.last_name + "_" + str(player_id)
+        player_id_string = first_name + "_" + last_name + "_" + str(player_id)
         return player_id_string
 
     def get_player_historical_seasons_statistics(self, first_name, last_name):
         player_id = self.get_player_id_string(first_name, last_name)
+
+        # slice the player out of the packed history of every player, if player_store.py has been run for the season
+        if self._player_history is None:
+            self._player_history, self._player_history_offsets = read_player_store(self._season, "history")
+        if self._player_history is not None:
+            start, stop = self._player_history_offsets.get(player_id, (0, 0))
+            return self._player_history.iloc[start:stop, 1:]
+
         historical_player_data_path = self._data_location + '/players/' + player_id + '/history.csv'
         df = pd.read_csv(historical_player_data_path)
 
@@ -64,27 +153,61 @@ class PlayerData:
 
     def get_player_current_seasons_statistics(self, first_name, last_name, game_week):
         if game_week == 0: return None
-        player_id = self.get_player_id_string(first_name, last_name)
-        historical_player_data_path = self._data_location + '/players/' + player_id + '/gw.csv'
-        df = pd.read_csv(historical_player_data_path)
-        df = df.head(game_week)
+        if self._player_rows is None:
+            self._build_player_row_index()
 
-        return df
+        # the player's first game_week games, in kickoff order
+        player_id = self.get_player_id(first_name, last_name)
+        start = self._player_row_starts[player_id] if player_id < len(self._player_row_starts) else 0
+        count = self._player_row_counts[player_id] if player_id < len(self._player_row_counts) else 0
+        rows = self._player_rows[start:start + min(game_week, count)]
+        return self._merged_gw_stats.iloc[rows]
+
+    def get_players_game_stats(self, names, game_week):
+        """
+        Returns the stats of many players for their game_week-th game of the season at once (or their last game, if
+        they have played fewer games than that).
+
+        Args:
+            names (List[Tuple[str, str]]): A list of (first_name, last_name) tuples.
+            game_week (int): The number of the game, counting from 1.
+
+        Returns:
+            pd.DataFrame: One row per player, in the order given.
+
+        Raises:
+            ValueError: If game_week is less than 1, or any of the players has no games in the season.
+        """
+        # a game_week below 1 would index back into the previous player's games
+        if game_week < 1:
+            raise ValueError(f"game_week must be at least 1, not {game_week}")
+        if self._player_rows is None:
+            self._build_player_row_index()
+
+        player_ids = np.asarray(self.get_player_ids(names))
+        in_index = player_ids < len(self._player_row_counts)
+        counts = np.where(in_index, self._player_row_counts[np.where(in_index, player_ids, 0)], 0)
+        if (counts == 0).any():
+            missing = [names[i] for i in np.flatnonzero(counts == 0)]
+            raise ValueError(f"No games found in season {self._season} for players {missing}")
+
+        starts = self._player_row_starts[player_ids]
+        rows = self._player_rows[starts + np.minimum(game_week, counts) - 1]
+        return self._merged_gw_stats.iloc[rows]
 
     def get_player_team_id(self, first_name, last_name):
         player_id = self.get_player_id(first_name, last_name)
-        player_id_path = self._data_location + 'players_raw.csv'
-        df = pd.read_csv(player_id_path)
-        team_id = (df.loc[df.id == player_id, "team"]).tolist()[0]
-        return team_id
+        return self._get_player_team_index()[player_id]
 
     def get_player_points_earned(self, first_name, last_name, game_week):
-        game = self.get_player_current_seasons_statistics(first_name, last_name, game_week).tail(1)
+        self._require_columns(["total_points"])
+        game = self.get_players_game_stats([(first_name, last_name)], game_week)
         points_earned = game["total_points"].tolist()[0]
         return points_earned
 
     def is_player_home(self, first_name, last_name, game_week):
-        game = self.get_player_current_seasons_statistics(first_name, last_name, game_week).tail(1)
+        self._require_columns(["was_home"])
+        game = self.get_players_game_stats([(first_name, last_name)], game_week)
         home_or_away = game["was_home"].tolist()[0]
         return home_or_away
 
@@ -93,59 +216,132 @@ class PlayerData:
         # changes data location to previous season
         season = self._season[:2] + str((int(self._season[2:4]) - 1)) + "-" + str((int(self._season[-2:]) - 1))
 
+        if self._catalog is not None:
+            return self._catalog.get_cleaned_players(self._season)
+
         data_location = self._data_location + "cleaned_players.csv"
         df = pd.read_csv(data_location, encoding="utf-8")
         return df
 
     def get_all_players_total_curr_season_stats(self):
+        if self._catalog is not None:
+            return self._catalog.get_cleaned_players(self._season)
+
         data_location = self._data_location + "cleaned_players.csv"
         df = pd.read_csv(data_location, encoding="utf-8")
         return df
 
     def get_all_players_all_gw_stats(self):
         if self._merged_gw_stats is None:
-            data_location = self._data_location + "/gws/merged_gw2.csv"
-            self._merged_gw_stats = pd.read_csv(data_location, encoding="utf-8")
+            # memory-maps the Feather copy of merged_gw2.csv if it has been made, otherwise parses the CSV
+            if self._catalog is not None:
+                # the catalog has already loaded and sorted the season
+                self._merged_gw_stats = self._catalog.get_season_gw_stats(self._season)
+            else:
+                # memory-maps the Feather copy of merged_gw2.csv if it has been made, otherwise parses the CSV
+                df = read_merged_gameweeks(self._season, self._columns)
+                # sort once so each gameweek, and each position within a gameweek, is a contiguous block of rows
+                self._merged_gw_stats = sort_gameweeks(df)
+            self._gw_offsets, self._gw_pos_offsets = build_gameweek_offsets(self._merged_gw_stats)
+            if self._points_model is not None:
+                self._score_predicted_points()
 
         df = self._merged_gw_stats
         return df
 
-    def get_all_players_gw_stats(self, gameweek):
-        if self._gw_stats_dict is None:
-            merged_gw_df = self.get_all_players_all_gw_stats()
-            self._gw_stats_dict = {gw: df for gw, df in merged_gw_df.groupby("GW")}
-
-        df = self._gw_stats_dict[gameweek]
-        return df
-
-    def get_position_players_gw_stats(self, gameweek, position):
-        if self._gw_pos_stats_dict is None:
-            self._gw_pos_stats_dict = {}
-
-        if gameweek not in self._gw_pos_stats_dict:
-            gw_df = self.get_all_players_gw_stats(gameweek)
-            self._gw_pos_stats_dict[gameweek] = {}
-            self._gw_pos_stats_dict[gameweek]["FWD"] = gw_df[gw_df["position"] == "FWD"]
-            self._gw_pos_stats_dict[gameweek]["MID"] = gw_df[gw_df["position"] == "MID"]
-            self._gw_pos_stats_dict[gameweek]["DEF"] = gw_df[gw_df["position"] == "DEF"]
-            self._gw_pos_stats_dict[gameweek]["GK"] = gw_df[gw_df["position"] == "GK"]
-
-        return self._gw_pos_stats_dict[gameweek][position]
+    def attach_predicted_points(self, type="standard", variables=None, scoring_weights=None):
+        """
+        Sets the predicted_points column of the merged gameweek table to the points predicted by the models of a type
+        in the model store (see predict_points.py), replacing any predicted_points the table was loaded with. The
+        column is scored when the table is first needed, or straight away if it has already been loaded.
+
+        Args:
+            type (str, optional): "standard", "lasso" or "ridge". Defaults to "standard".
+            variables (dict, optional): The variables of each position's model, to choose between models trained on
+            different variables. Defaults to the latest model of each position.
+            scoring_weights (dict, optional): The weights from load_scoring_weights, so they are only loaded once when
+            scoring many seasons. Defaults to loading them.
+        """
+        self._points_model = (type, variables, scoring_weights)
+        if self._merged_gw_stats is not None:
+            self._score_predicted_points()
+
+    def _score_predicted_points(self):
+        # imported here as the analysis modules import the data modules, and so this one through the season catalog
+        from src.analysis.predict_points import load_scoring_weights, predict_points
+
+        type, variables, scoring_weights = self._points_model
+        if scoring_weights is None:
+            scoring_weights = load_scoring_weights(type, variables)
+            self._points_model = (type, variables, scoring_weights)
+
+        scored_df = self._merged_gw_stats
+        if self._columns is not None:
+            # the variables of the models may not have been loaded, so score the whole table, which sorts into the
+            # same row order
+            scored_df = sort_gameweeks(read_merged_gameweeks(self._season))
+        points = predict_points(scored_df, scoring_weights).to_numpy()
+
+        # the rows keep their order, so the offsets and player index still apply, but projections and cached
+        # conditions may hold the old predicted points
+        self._merged_gw_stats = self._merged_gw_stats.assign(predicted_points=points)
+        self._projections.clear()
+        self._condition_cache.clear()
+
+    def get_memory_usage(self):
+        """
+        Returns the megabytes used by each table loaded so far.
+        """
+        tables = {"merged_gw": self._merged_gw_stats}
+        for columns, df in self._projections.items():
+            tables["merged_gw" + str(list(columns))] = df
+        return {name: memory_usage_mb(df) for name, df in tables.items() if df is not None}
+
+    def _get_projection(self, columns):
+        if self._gw_offsets is None:
+            self.get_all_players_all_gw_stats()
+        if columns is None:
+            return self._merged_gw_stats
+        self._require_columns(columns)
+
+        # the projection keeps the row order of the sorted table, so the same offsets apply to it
+        columns = tuple(columns)
+        projection = self._projections.get(columns)
+        if projection is None:
+            projection = self._merged_gw_stats[list(columns)]
+            self._projections.put(columns, projection)
+        return projection
+
+    def get_all_players_gw_stats(self, gameweek, columns=None):
+        df = self._get_projection(columns)
+
+        # slicing a contiguous block of rows returns a view rather than a copy of the gameweek
+        start, stop = self._gw_offsets[gameweek]
+        return df.iloc[start:stop]
+
+    def get_position_players_gw_stats(self, gameweek, position, columns=None):
+        df = self._get_projection(columns)
+
+        # a position with no players in the gameweek gives an empty block at the start of the gameweek
+        start, stop = self._gw_pos_offsets.get((gameweek, position), (self._gw_offsets[gameweek][0],) * 2)
+        return df.iloc[start:stop]
 
     def get_players_meeting_condition_or_not(self, gameweek, condition, meeting):
-        if self._gw_condition_stats_dict is None:
-            self._gw_condition_stats_dict = {}
-            self._gw_condition_stats_dict[condition] = {}
-            df = self.get_all_players_gw_stats(gameweek)
-            players_not_meeting_condition = df[~df.eval(condition)]
-            players_meeting_condition = df[df.eval(condition)]
-            self._gw_condition_stats_dict[condition]["nm"] = players_not_meeting_condition
-            self._gw_condition_stats_dict[condition]["m"] = players_meeting_condition
+        df = self.get_all_players_gw_stats(gameweek)
+
+        # only the mask is cached, the split itself is a cheap take from the gameweek's rows
+        mask = self._condition_cache.get((gameweek, condition))
+        if mask is None:
+            mask = df.eval(condition).to_numpy(dtype=bool)
+            self._condition_cache.put((gameweek, condition), mask)
 
         if meeting:
-            return self._gw_condition_stats_dict[condition]["m"]
+            return df[mask]
         else:
-            return self._gw_condition_stats_dict[condition]["nm"]
+            return df[~mask]
+
+    def get_condition_cache_info(self):
+        return self._condition_cache.info()
 
     def select_random_players_from_gw_one(self, number_of_players, position):
         """
@@ -168,11 +364,11 @@ class PlayerData:
         # make sure position is upper case
         position = position.upper()
 
-        # obtain a dataframe of all players for that season
-        all_players_df = self.get_all_players_gw_stats(1)
+        # obtain a dataframe of all players of that position in the first gameweek
+        position_players_df = self.get_position_players_gw_stats(1, position)
 
-        # randomly select 'number_of_players' players from this dataframe satisfying condition 'condition'
-        players_df = all_players_df[all_players_df.eval(f"position == '{position}'")].sample(number_of_players)
+        # randomly select 'number_of_players' players from this dataframe
+        players_df = position_players_df.sample(number_of_players)
 
         return players_df
 
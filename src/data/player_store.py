@@ -0,0 +1,121 @@
+"""
+player_store.py
+This module packs the hundreds of per-player files of a season (players/<First_Last_id>/gw.csv and history.csv) into
+one indexed columnar file each, so a player's history can be sliced out of a shared table rather than opening and
+parsing a file per player.
+
+Each packed table holds every player's rows one after the other, with a player_dir column naming the directory the
+rows came from. Players are stored in sorted directory order, so the rows of any one player are contiguous and can be
+found from an offsets index.
+
+Functions
+build_player_store(season: str, max_workers: int = None) -> Dict[str, str]:
+Reads every per-player gw.csv and history.csv file of a season in parallel and writes them out as two Feather files.
+
+read_player_store(season: str, kind: str) -> Tuple[pd.DataFrame, dict]:
+Reads a packed table of a season ("gw" or "history") and returns it with a dictionary of player_dir -> (start, stop).
+
+Usage
+Run the script to pack the player files of every season:
+$ python player_store.py
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional, the per-player files are always available
+    feather = None
+
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+
+PLAYER_STORE_FILES = {"gw": "players_gw.feather", "history": "players_history.feather"}
+
+
+def _read_player_file(path):
+    # players without a previous season have an empty history file
+    try:
+        return pd.read_csv(path, encoding="utf-8-sig")
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return None
+
+
+def build_player_store(season, max_workers=None):
+    """
+    Reads every per-player gw.csv and history.csv file of a season using a thread pool and writes each kind out as
+    one uncompressed Feather file in the season's directory.
+
+    Args:
+        season (str): The season to pack, e.g. "2021-22".
+        max_workers (int, optional): The number of threads reading files. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        Dict[str, str]: The path of the file written for each kind of table.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required to build the player store")
+
+    start_time = time.perf_counter()
+    season_location = data_directory_location + season + "/"
+    player_dirs = sorted(os.listdir(season_location + "players"))
+
+    paths = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for kind in PLAYER_STORE_FILES:
+            file_paths = [season_location + "players/" + player_dir + "/" + kind + ".csv" for player_dir in player_dirs]
+            player_dfs = list(executor.map(_read_player_file, file_paths))
+
+            # keep the players which have rows, tagging each row with the directory it came from
+            found = [(player_dir, player_df) for player_dir, player_df in zip(player_dirs, player_dfs)
+                     if player_df is not None and len(player_df)]
+            found_dirs = [player_dir for player_dir, _ in found]
+            df = pd.concat([player_df for _, player_df in found], ignore_index=True)
+            df.insert(0, "player_dir", pd.Categorical(np.repeat(found_dirs, [len(player_df) for _, player_df in found]),
+                                                      categories=found_dirs))
+
+            paths[kind] = season_location + PLAYER_STORE_FILES[kind]
+            feather.write_feather(df, paths[kind], compression="uncompressed")
+
+    print(f"Packed {len(player_dirs)} players for season {season} in {time.perf_counter() - start_time:.2f}s")
+    return paths
+
+
+def read_player_store(season, kind):
+    """
+    Reads a packed per-player table of a season.
+
+    Args:
+        season (str): The season to read.
+        kind (str): "gw" for the players' gameweeks this season, "history" for their previous seasons.
+
+    Returns:
+        Tuple[pd.DataFrame, dict]: The table and a dictionary of player_dir -> (start, stop) rows, or (None, None) if
+        the store has not been built or pyarrow is not installed.
+    """
+    path = data_directory_location + season + "/" + PLAYER_STORE_FILES[kind]
+    if feather is None or not os.path.exists(path):
+        return None, None
+
+    df = feather.read_table(path, memory_map=True).to_pandas()
+
+    # rows of each player are contiguous and stored in category order
+    counts = np.bincount(df["player_dir"].cat.codes.to_numpy(), minlength=len(df["player_dir"].cat.categories))
+    stops = np.cumsum(counts)
+    offsets = {player_dir: (stop - count, stop)
+               for player_dir, count, stop in zip(df["player_dir"].cat.categories, counts, stops)}
+    return df, offsets
+
+
+if __name__ == "__main__":
+    for season in seasons:
+        build_player_store(season)
@@ -0,0 +1,106 @@
+"""
+prepare_seasons.py
+This module runs the data preparation of every season in parallel. The seasons do not depend on each other, so each
+season's pipeline (optionally the cleaned players steps of add_to_cleaned_players.py, then the gameweek enrichment of
+add_to_merged_gameweeks.py) is run in its own process. A season which fails does not stop the others; its error is
+collected and reported with the wall time of every season. Steps whose outputs are up to date in the manifest are
+skipped.
+
+Functions
+prepare_season(season: str, clean_players: bool = False, force: bool = False) -> dict:
+Runs the data preparation of one season, returning its status, error and wall time rather than raising.
+
+prepare_seasons(seasons: list = None, clean_players: bool = False, force: bool = False, max_workers: int = None) -> pd.DataFrame:
+Runs prepare_season for each season across a process pool and reports the results.
+
+Usage
+Run the script to prepare every season, adding --clean-players to also run the cleaned players steps and --force to
+redo steps the manifest shows are up to date:
+$ python prepare_seasons.py
+"""
+
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import add_to_cleaned_players, add_to_merged_gameweeks
+
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+
+
+def prepare_season(season, clean_players=False, force=False):
+    """
+    Runs the data preparation of one season. Errors, including the validation errors raised by find_errors_in_gw, are
+    caught and returned so that they can be reported with the other seasons.
+
+    Args:
+        season (str): The season to prepare.
+        clean_players (bool, optional): Also add position, costs and team names to cleaned_players.csv first.
+        Defaults to False.
+        force (bool, optional): Redo steps which the manifest shows are up to date. Defaults to False.
+
+    Returns:
+        dict: The season, its status ("done", "up to date", "skipped" or "failed"), the error if it failed and the
+        seconds taken.
+    """
+    start_time = time.perf_counter()
+    status, error = "done", None
+    try:
+        if clean_players:
+            add_to_cleaned_players.clean_season(season, force)
+        if not Path(data_directory_location + season + "/gws/merged_gw.csv").exists():
+            status, error = "skipped", "No merged gameweeks file"
+        elif add_to_merged_gameweeks.enrich_season(season, force) is None:
+            status = "up to date"
+    except Exception as e:
+        # the full error is printed by the worker, the report keeps its first line
+        status, error = "failed", f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        traceback.print_exc()
+
+    return {"season": season, "status": status, "error": error, "seconds": time.perf_counter() - start_time}
+
+
+def prepare_seasons(seasons=None, clean_players=False, force=False, max_workers=None):
+    """
+    Prepares several seasons at once, one process per season.
+
+    Args:
+        seasons (list, optional): The seasons to prepare. Defaults to every season.
+        clean_players (bool, optional): Also redo the cleaned players steps. Defaults to False.
+        force (bool, optional): Redo steps which the manifest shows are up to date. Defaults to False.
+        max_workers (int, optional): The number of processes. Defaults to the number of CPUs.
+
+    Returns:
+        pd.DataFrame: The status, error and seconds taken of each season.
+    """
+    if seasons is None:
+        seasons = add_to_merged_gameweeks.seasons
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {season: executor.submit(prepare_season, season, clean_players, force) for season in seasons}
+
+    results = []
+    for season, future in futures.items():
+        # a worker process dying is reported the same way as an error in the pipeline
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append({"season": season, "status": "failed", "error": f"{type(e).__name__}: {e}",
+                            "seconds": None})
+    report = pd.DataFrame(results).set_index("season")
+
+    print()
+    print(report.round(2).to_string())
+    print(f"Prepared {len(seasons)} seasons in {time.perf_counter() - start_time:.2f}s")
+    return report
+
+
+if __name__ == "__main__":
+    report = prepare_seasons(clean_players="--clean-players" in sys.argv, force="--force" in sys.argv)
+    if (report["status"] == "failed").any():
+        sys.exit(1)
@@ -0,0 +1,238 @@
+"""
+recent_features.py
+This module builds a table of recent statistics features over several trailing windows and exponentially decayed sums,
+so that models can compare window choices without rewriting the merged gameweeks. add_to_merged_gameweeks.py only adds
+the 5-gameweek recent_ columns to merged_gw2.csv.
+
+For every source column of the recent_ statistics (e.g. total_points, bps, minutes) the table has:
+- recent_<column>_<window>: the sum of the column over the player's rows in the previous <window> gameweeks in the
+  data. recent_<column>_5 is the recent_<column> column of merged_gw2.csv.
+- recent_<column>_ewm<half life>: the sum of the column over all of the player's previous gameweeks, each weighted by
+  0.5 ** (gameweeks ago / half life), counting the previous gameweek as 0 gameweeks ago.
+As with the recent_ columns, the features are 0 in gameweek 1 and missing for a player with no rows in the window.
+
+Each season is turned into a dense (player x gameweek) array of per-gameweek totals, so every window and decay of every
+column is computed in one pass over the gameweeks rather than a pass per feature. The table has one row per
+(season, name, GW) and is saved as a Feather file in the data directory.
+
+Functions
+calculate_recent_features(gameweeks_df: pd.DataFrame, column_names: list = None, windows: list = None,
+                          half_lives: list = None) -> pd.DataFrame:
+Calculates the features of one season's gameweek table, with one row per (name, GW).
+
+build_recent_features(catalog: SeasonCatalog = None, column_names: list = None, windows: list = None,
+                      half_lives: list = None) -> pd.DataFrame:
+Calculates the features of every season in a catalog and saves them as the feature table.
+
+read_recent_features(columns: list = None) -> pd.DataFrame:
+Reads the feature table, or only some of its features.
+
+season_of_kickoff(kickoff_times: pd.Series) -> pd.Series:
+Returns the season of each kickoff time, for tables such as the test and train splits which have no season column.
+
+join_recent_features(gameweeks_df: pd.DataFrame, feature_names: list, features_df: pd.DataFrame = None) -> pd.DataFrame:
+Adds features from the feature table to a gameweek table which does not have them.
+
+Usage
+Run the script to build the feature table for every season:
+$ python recent_features.py
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.data.add_to_merged_gameweeks import RECENT_STAT_COLUMNS
+from src.data.schema import RECENT_PREFIX
+from src.data.season_catalog import SeasonCatalog
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional, the recent_ columns of merged_gw2.csv are always available
+    feather = None
+
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+
+FEATURE_TABLE = "recent_features.feather"
+FEATURE_WINDOWS = [3, 5, 8]
+FEATURE_HALF_LIVES = [2, 4]
+FEATURE_KEY_COLUMNS = ["season", "name", "GW"]
+
+
+def window_feature_name(column_name, window):
+    return RECENT_PREFIX + column_name + "_" + str(window)
+
+
+def decayed_feature_name(column_name, half_life):
+    return RECENT_PREFIX + column_name + "_ewm" + str(half_life)
+
+
+def calculate_recent_features(gameweeks_df, column_names=None, windows=None, half_lives=None):
+    """
+    Calculates the trailing window and exponentially decayed features of one season's gameweek table.
+
+    Args:
+        gameweeks_df (pd.DataFrame): A season's gameweek table.
+        column_names (list, optional): The columns to calculate features for. Defaults to the recent_ stat columns.
+        windows (list, optional): The trailing windows in gameweeks. Defaults to 3, 5 and 8.
+        half_lives (list, optional): The half lives in gameweeks of the decayed sums. Defaults to 2 and 4.
+
+    Returns:
+        pd.DataFrame: The name, GW and features (as float32) of each (name, GW) in the table.
+    """
+    column_names = RECENT_STAT_COLUMNS if column_names is None else column_names
+    windows = FEATURE_WINDOWS if windows is None else windows
+    half_lives = FEATURE_HALF_LIVES if half_lives is None else half_lives
+
+    # position of each row's player and of its gameweek in the sorted list of gameweeks in the data
+    player_codes, players = pd.factorize(gameweeks_df["name"])
+    gameweeks = np.sort(gameweeks_df["GW"].unique())
+    positions = np.searchsorted(gameweeks, gameweeks_df["GW"].to_numpy())
+    named = player_codes >= 0
+    player_codes, positions = player_codes[named], positions[named]
+
+    # per (player, gameweek) totals of every column and number of rows, missing values counting as 0
+    values = np.nan_to_num(gameweeks_df[column_names].to_numpy(dtype=np.float64)[named])
+    totals = np.zeros((len(players), len(gameweeks), len(column_names)))
+    np.add.at(totals, (player_codes, positions), values)
+    row_counts = np.zeros((len(players), len(gameweeks)), dtype=np.int64)
+    np.add.at(row_counts, (player_codes, positions), 1)
+
+    features = {}
+
+    # trailing sums, adding one more gameweek back at a time and keeping the sum at each window
+    window_sums = np.zeros_like(totals)
+    window_counts = np.zeros_like(row_counts)
+    for gameweeks_back in range(1, max(windows, default=0) + 1):
+        window_sums[:, gameweeks_back:] += totals[:, :-gameweeks_back]
+        window_counts[:, gameweeks_back:] += row_counts[:, :-gameweeks_back]
+        if gameweeks_back in windows:
+            sums = np.where(window_counts[:, :, None] > 0, window_sums, np.nan)
+            for i, column_name in enumerate(column_names):
+                features[window_feature_name(column_name, gameweeks_back)] = sums[:, :, i]
+
+    # decayed sums over every previous gameweek, built up one gameweek at a time
+    seen = np.cumsum(row_counts, axis=1) - row_counts > 0
+    for half_life in half_lives:
+        decay = 0.5 ** (1 / half_life)
+        decayed_sums = np.zeros_like(totals)
+        for position in range(1, len(gameweeks)):
+            decayed_sums[:, position] = decay * decayed_sums[:, position - 1] + totals[:, position - 1]
+        sums = np.where(seen[:, :, None], decayed_sums, np.nan)
+        for i, column_name in enumerate(column_names):
+            features[decayed_feature_name(column_name, half_life)] = sums[:, :, i]
+
+    # one row per (player, gameweek) in the data, gameweek 1 being 0 as there are no previous gameweeks
+    keys = np.unique(np.stack([player_codes, positions], axis=1), axis=0)
+    features_df = pd.DataFrame({"name": pd.Categorical(players[keys[:, 0]]), "GW": gameweeks[keys[:, 1]]})
+    first_gameweek = (features_df["GW"] == 1).to_numpy()
+    for feature_name, feature in features.items():
+        feature = feature[keys[:, 0], keys[:, 1]].astype(np.float32)
+        feature[first_gameweek] = 0
+        features_df[feature_name] = feature
+    return features_df
+
+
+def build_recent_features(catalog=None, column_names=None, windows=None, half_lives=None):
+    """
+    Calculates the features of every season in a catalog and saves them as the feature table.
+
+    Args:
+        catalog (SeasonCatalog, optional): The seasons to use. Defaults to a catalog of every season.
+        column_names (list, optional): The columns to calculate features for. Defaults to the recent_ stat columns.
+        windows (list, optional): The trailing windows in gameweeks. Defaults to 3, 5 and 8.
+        half_lives (list, optional): The half lives in gameweeks of the decayed sums. Defaults to 2 and 4.
+
+    Returns:
+        pd.DataFrame: The feature table, keyed by (season, name, GW).
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required to save the recent features table")
+    catalog = SeasonCatalog() if catalog is None else catalog
+
+    season_dfs = []
+    for season in catalog.get_seasons():
+        features_df = calculate_recent_features(catalog.get_season_gw_stats(season), column_names, windows,
+                                                half_lives)
+        features_df.insert(0, "season", season)
+        season_dfs.append(features_df)
+
+    features_df = pd.concat(season_dfs, ignore_index=True)
+    features_df["season"] = pd.Categorical(features_df["season"], categories=catalog.get_seasons())
+    features_df["name"] = features_df["name"].astype("category")
+    feather.write_feather(features_df, data_directory_location + FEATURE_TABLE, compression="uncompressed")
+    print(f"Recent features table made with {len(features_df.columns) - 3} features for {len(features_df)} rows")
+    return features_df
+
+
+def read_recent_features(columns=None):
+    """
+    Reads the feature table, memory-mapping the Feather file.
+
+    Args:
+        columns (list, optional): Only read these features. Defaults to reading every feature.
+
+    Returns:
+        pd.DataFrame: The season, name, GW and features of each row.
+    """
+    if columns is not None:
+        columns = FEATURE_KEY_COLUMNS + [column for column in columns if column not in FEATURE_KEY_COLUMNS]
+    return feather.read_table(data_directory_location + FEATURE_TABLE, columns=columns, memory_map=True).to_pandas()
+
+
+def season_of_kickoff(kickoff_times):
+    """
+    Returns the season of each kickoff time, e.g. 2021-22 for 2021-08-14. Seasons are taken to start in August, as the
+    2019-20 season finished in July 2020.
+
+    Args:
+        kickoff_times (pd.Series): Kickoff times, as int64 nanoseconds or strings.
+
+    Returns:
+        pd.Series: The season of each kickoff time.
+    """
+    kickoff_times = pd.to_datetime(kickoff_times, utc=True)
+    start_years = kickoff_times.dt.year - (kickoff_times.dt.month < 8)
+    return start_years.astype(str) + "-" + ((start_years + 1) % 100).astype(str).str.zfill(2)
+
+
+def join_recent_features(gameweeks_df, feature_names, features_df=None):
+    """
+    Adds features from the feature table to a gameweek table, e.g. one of the test and train splits. Features already in
+    the table are left as they are. Rows are matched on (season, name, GW), the season coming from the kickoff time if
+    the table has no season column.
+
+    Args:
+        gameweeks_df (pd.DataFrame): A gameweek table.
+        feature_names (list): The features wanted, which can include columns the table already has.
+        features_df (pd.DataFrame, optional): The feature table. Defaults to reading it.
+
+    Returns:
+        pd.DataFrame: The gameweek table with the features added, with the same index and row order.
+    """
+    missing = [feature_name for feature_name in feature_names if feature_name not in gameweeks_df.columns]
+    if not missing:
+        return gameweeks_df
+    if features_df is None:
+        features_df = read_recent_features(missing)
+
+    keys = pd.DataFrame({"season": gameweeks_df["season"].astype(str) if "season" in gameweeks_df.columns
+                         else season_of_kickoff(gameweeks_df["kickoff_time"]),
+                         "name": gameweeks_df["name"].astype(str), "GW": gameweeks_df["GW"].to_numpy()},
+                        index=gameweeks_df.index)
+    feature_index = pd.MultiIndex.from_arrays([features_df["season"].astype(str), features_df["name"].astype(str),
+                                               features_df["GW"].to_numpy()])
+    rows = feature_index.get_indexer(pd.MultiIndex.from_frame(keys))
+
+    gameweeks_df = gameweeks_df.copy()
+    for feature_name in missing:
+        values = features_df[feature_name].to_numpy()
+        gameweeks_df[feature_name] = np.where(rows >= 0, values[rows], np.nan).astype(np.float32)
+    return gameweeks_df
+
+
+if __name__ == "__main__":
+    build_recent_features()
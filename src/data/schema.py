@@ -0,0 +1,129 @@
+"""
+schema.py
+This module defines the column types used when loading gameweek tables (the merged gameweeks of each season and the
+files in test_and_train_data). Without it pandas reads names, teams and positions as Python strings and most small
+count stats as int64/float64, which makes each table several times larger than it needs to be.
+
+The schema uses:
+- categoricals for names, teams and positions,
+- int8/int16/int32 for counting stats, depending on their range,
+- float32 for ICT metrics, expected points and the recent_ statistics,
+- int64 nanoseconds since the epoch (UTC) for kickoff times, so they do not need parsing again.
+
+Integer columns which contain missing values are stored as float32 instead, as numpy integers cannot hold NaN.
+
+Functions
+apply_gameweek_schema(df: pd.DataFrame) -> pd.DataFrame:
+Casts the columns of a gameweek table to the schema types.
+
+read_gameweeks_csv(path: str, columns: list = None) -> pd.DataFrame:
+Reads a gameweek CSV file using the schema types.
+
+kickoff_time_to_string(kickoff_times: pd.Series) -> pd.Series:
+Converts int64 kickoff times back to the ISO format used in the CSV files, for writing tables back to CSV.
+
+memory_usage_mb(df: pd.DataFrame) -> float:
+Returns the memory used by a table in megabytes, including the contents of string columns.
+
+report_memory_usage(tables: dict) -> pd.DataFrame:
+Prints and returns the memory used by each of a dictionary of tables.
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLUMNS = ["name", "team", "position"]
+
+INTEGER_COLUMNS = {
+    "assists": "int8", "bonus": "int8", "clean_sheets": "int8", "goals_conceded": "int8", "goals_scored": "int8",
+    "own_goals": "int8", "penalties_missed": "int8", "penalties_saved": "int8", "red_cards": "int8", "saves": "int8",
+    "yellow_cards": "int8", "team_a_score": "int8", "team_h_score": "int8", "round": "int8", "GW": "int8",
+    "opponent_team": "int8", "won_game": "int8",
+    "bps": "int16", "minutes": "int16", "total_points": "int16", "value": "int16", "element": "int16",
+    "fixture": "int16",
+    "selected": "int32", "transfers_balance": "int32", "transfers_in": "int32", "transfers_out": "int32"
+}
+
+FLOAT_COLUMNS = ["creativity", "influence", "threat", "ict_index", "xP"]
+
+RECENT_PREFIX = "recent_"
+
+
+def apply_gameweek_schema(df):
+    """
+    Casts the columns of a gameweek table to the schema types. Columns that are not in the schema are left as they are.
+
+    Args:
+        df (pd.DataFrame): A gameweek table, e.g. a season's merged gameweeks.
+
+    Returns:
+        pd.DataFrame: The table with its columns cast.
+    """
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            if not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype("category")
+        elif column in INTEGER_COLUMNS:
+            if df[column].isna().any():
+                df[column] = df[column].astype("float32")
+            else:
+                df[column] = df[column].astype(INTEGER_COLUMNS[column])
+        elif column in FLOAT_COLUMNS or column.startswith(RECENT_PREFIX):
+            df[column] = df[column].astype("float32")
+        elif column == "was_home":
+            # saved as True/False in the merged gameweeks but as 1/0 in the test and train data
+            if df[column].dtype != bool:
+                df[column] = df[column].astype("int8")
+        elif column == "kickoff_time":
+            if df[column].dtype == object:
+                df[column] = pd.to_datetime(df[column], utc=True).values.astype(np.int64)
+
+    return df
+
+
+def read_gameweeks_csv(path, columns=None):
+    """
+    Reads a gameweek CSV file using the schema types.
+
+    Args:
+        path (str): The path of the CSV file.
+        columns (list, optional): Only read these columns. Defaults to reading all columns.
+
+    Returns:
+        pd.DataFrame: The typed table.
+    """
+    df = pd.read_csv(path, encoding="utf-8-sig", usecols=columns, low_memory=False,
+                     dtype={column: "category" for column in CATEGORICAL_COLUMNS})
+    return apply_gameweek_schema(df)
+
+
+def kickoff_time_to_string(kickoff_times):
+    """
+    Converts int64 kickoff times back to the ISO format used in the CSV files, e.g. 2021-08-14T11:30:00Z.
+    """
+    return pd.to_datetime(kickoff_times, utc=True).dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def memory_usage_mb(df):
+    """
+    Returns the memory used by a table in megabytes, including the contents of string columns.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def report_memory_usage(tables):
+    """
+    Prints and returns the memory used by each of a dictionary of tables.
+
+    Args:
+        tables (dict): A dictionary of table names to tables.
+
+    Returns:
+        pd.DataFrame: The number of rows, number of columns and megabytes used by each table.
+    """
+    report = pd.DataFrame({"rows": [len(df) for df in tables.values()],
+                           "columns": [len(df.columns) for df in tables.values()],
+                           "memory_mb": [memory_usage_mb(df) for df in tables.values()]},
+                          index=list(tables.keys()))
+    print(report.round(2))
+    return report
@@ -0,0 +1,124 @@
+"""
+season_catalog.py
+This module defines a class SeasonCatalog which loads the merged gameweeks of several seasons once into a single
+season-partitioned table, so experiments spanning seasons do not each re-read the per-season files.
+
+The seasons are stacked in the order given, and each season is sorted by gameweek then position, so any season,
+(season, gameweek) or (season, gameweek, position) is a contiguous block of rows which can be sliced without copying.
+Names, teams and positions share one set of categories across all seasons, so each string is stored once.
+
+The SeasonCatalog class includes methods to:
+
+Get the stacked gameweek table for every season loaded.
+Get a season's gameweek table, or a single gameweek or gameweek and position of a season.
+Get several seasons together, e.g. the seasons used for training.
+Get a season's cleaned players, read once and then kept.
+Create a PlayerData object for a season which uses the catalog rather than reading files.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from pathlib import Path
+
+from src.data.player_data import PlayerData
+from src.data.schema import CATEGORICAL_COLUMNS
+from src.data.season_store import read_merged_gameweeks, sort_gameweeks, build_gameweek_offsets
+
+
+class SeasonCatalog:
+    def __init__(self, seasons=None, columns=None):
+        self._data_location = str(Path(__file__).parent) + '/../../data/'
+        self._available_seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+        if seasons is None:
+            seasons = self._available_seasons
+        for season in seasons:
+            if season not in self._available_seasons:
+                raise ValueError(f"Season {season} is unavailable. Please choose from the following seasons:"
+                                 f"{self._available_seasons}")
+        self._seasons = list(seasons)
+        self._columns = columns
+
+        self._gameweeks = None
+        # (start, stop) row offsets of each season, and of each gameweek and position within a season
+        self._season_offsets = None
+        self._gw_offsets = None
+        self._gw_pos_offsets = None
+        self._cleaned_players = {}
+
+    def _load(self):
+        columns = None
+        if self._columns is not None:
+            columns = PlayerData._key_columns + [col for col in self._columns if col not in PlayerData._key_columns]
+
+        season_dfs = [sort_gameweeks(read_merged_gameweeks(season, columns)) for season in self._seasons]
+
+        # give the categorical columns the same categories in every season so they stay categorical when stacked
+        for column in CATEGORICAL_COLUMNS:
+            if all(column in df.columns for df in season_dfs):
+                categories = union_categoricals([df[column].astype("category") for df in season_dfs],
+                                                sort_categories=True).categories
+                for df in season_dfs:
+                    df[column] = df[column].astype(pd.CategoricalDtype(categories))
+
+        self._season_offsets = {}
+        self._gw_offsets = {}
+        self._gw_pos_offsets = {}
+        start = 0
+        for season, df in zip(self._seasons, season_dfs):
+            self._season_offsets[season] = (start, start + len(df))
+            self._gw_offsets[season], self._gw_pos_offsets[season] = build_gameweek_offsets(df)
+            start += len(df)
+
+        self._gameweeks = pd.concat(season_dfs)
+        season_labels = np.repeat(self._seasons, [len(df) for df in season_dfs])
+        self._gameweeks.insert(0, "season", pd.Categorical(season_labels, categories=self._seasons))
+
+    def get_seasons(self):
+        return list(self._seasons)
+
+    def get_all_gameweeks(self):
+        if self._gameweeks is None:
+            self._load()
+        return self._gameweeks
+
+    def get_season_gw_stats(self, season):
+        df = self.get_all_gameweeks()
+        start, stop = self._season_offsets[season]
+        return df.iloc[start:stop]
+
+    def get_gw_stats(self, season, gameweek):
+        df = self.get_season_gw_stats(season)
+        start, stop = self._gw_offsets[season][gameweek]
+        return df.iloc[start:stop]
+
+    def get_position_gw_stats(self, season, gameweek, position):
+        df = self.get_season_gw_stats(season)
+        season_gw_offsets = self._gw_offsets[season]
+        start, stop = self._gw_pos_offsets[season].get((gameweek, position), (season_gw_offsets[gameweek][0],) * 2)
+        return df.iloc[start:stop]
+
+    def get_multiple_seasons_gw_stats(self, seasons):
+        """
+        Returns the gameweek tables of several seasons together. If the seasons were loaded next to each other this is
+        a slice of the stacked table, otherwise the seasons are concatenated.
+        """
+        df = self.get_all_gameweeks()
+        offsets = [self._season_offsets[season] for season in seasons]
+        if all(offsets[i][1] == offsets[i + 1][0] for i in range(len(offsets) - 1)):
+            return df.iloc[offsets[0][0]:offsets[-1][1]]
+        return pd.concat([df.iloc[start:stop] for start, stop in offsets])
+
+    def get_cleaned_players(self, season):
+        if season not in self._cleaned_players:
+            path = self._data_location + season + "/cleaned_players.csv"
+            self._cleaned_players[season] = pd.read_csv(path, encoding="utf-8")
+        return self._cleaned_players[season].copy()
+
+    def get_player_data(self, season, condition_cache_size=128):
+        """
+        Returns a PlayerData object for the season which takes its tables from this catalog.
+        """
+        if season not in self._seasons:
+            raise ValueError(f"Season {season} has not been loaded into this catalog")
+        return PlayerData(season, condition_cache_size=condition_cache_size, catalog=self)
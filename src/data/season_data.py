@@ -8,35 +8,164 @@ Retrieve data for a specific season.
 Get team information for a specific season.
 Get fixture information for a specific season.
 Get fixture information for a specific gameweek within a season.
+Get dense (team id x gameweek) arrays of each team's opponent, home flag, difficulties and kickoff time.
+Look up the fixtures of many (team, gameweek) pairs, or every team over many gameweeks, in one vectorised call.
+
+The fixture arrays are built once from fixtures.csv and indexed directly by team id and gameweek. In a double gameweek
+the team's first fixture in fixtures.csv is used, and a blank gameweek has an opponent of -1.
 """
 
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+BLANK_FIXTURE = -1
+
 
 class SeasonData:
     def __init__(self, season):
         print("placeholder")
         self._data_location = str(Path(__file__).parent) + '/../../data/' + season + "/"
         self._season = season
+        self._teams = None
+        self._fixtures = None
+        self._fixture_arrays = None
 
     def get_teams(self):
-        path = self._data_location + 'teams.csv'
-        df = pd.read_csv(path)
-        return df
+        if self._teams is None:
+            path = self._data_location + 'teams.csv'
+            self._teams = pd.read_csv(path)
+        return self._teams.copy()
 
     def get_fixtures(self):
-        path = self._data_location + 'fixtures.csv'
-        df = pd.read_csv(path)
-        return df
+        if self._fixtures is None:
+            path = self._data_location + 'fixtures.csv'
+            self._fixtures = pd.read_csv(path)
+        return self._fixtures.copy()
 
     def get_gameweek_fixtures(self, gameweek):
         df = self.get_fixtures()
         df = df[df["event"] == gameweek]
         return df
 
+    def get_team_names(self):
+        """
+        Returns an array of team names indexed by team id, with an empty name at any unused id (e.g. 0).
+        """
+        teams = self.get_teams()
+        names = np.full(teams["id"].max() + 1, "", dtype=object)
+        names[teams["id"].to_numpy()] = teams["name"].to_numpy()
+        return names
+
+    def get_team_ids(self, team_names):
+        """
+        Returns the ids of a list of team names, as used in the team column of the gameweek tables.
+        """
+        teams = self.get_teams()
+        return pd.Series(teams["id"].to_numpy(), index=teams["name"]).loc[list(team_names)].to_numpy()
+
+    def _build_fixture_arrays(self):
+        fixtures = self.get_fixtures()
+        fixtures = fixtures[fixtures["event"].notna()]
+        n_teams = self.get_teams()["id"].max() + 1
+        n_gameweeks = int(fixtures["event"].max()) + 1
+
+        # one row per team per fixture, home sides first so sorting by fixture order keeps each team's first fixture
+        gameweeks = fixtures["event"].to_numpy(dtype=np.int64)
+        order = np.arange(len(fixtures))
+        home_teams = fixtures["team_h"].to_numpy()
+        away_teams = fixtures["team_a"].to_numpy()
+        home_difficulty = fixtures["team_h_difficulty"].to_numpy()
+        away_difficulty = fixtures["team_a_difficulty"].to_numpy()
+        kickoff = pd.to_datetime(fixtures["kickoff_time"], utc=True).values.astype(np.int64)
+
+        team = np.r_[home_teams, away_teams]
+        opponent = np.r_[away_teams, home_teams]
+        gameweek = np.r_[gameweeks, gameweeks]
+        home = np.r_[np.ones(len(fixtures), dtype=np.int8), np.zeros(len(fixtures), dtype=np.int8)]
+        team_difficulty = np.r_[home_difficulty, away_difficulty]
+        opponent_difficulty = np.r_[away_difficulty, home_difficulty]
+        kickoff = np.r_[kickoff, kickoff]
+
+        # where a team plays twice in a gameweek keep only its first row in fixture order, as fancy assignment to
+        # repeated cells does not say which value is kept
+        rows = np.argsort(np.r_[order, order], kind="stable")
+        _, first = np.unique(team[rows] * n_gameweeks + gameweek[rows], return_index=True)
+        rows = rows[first]
+        cells = (team[rows], gameweek[rows])
+
+        arrays = {"opponent": np.full((n_teams, n_gameweeks), BLANK_FIXTURE, dtype=np.int16),
+                  "is_home": np.full((n_teams, n_gameweeks), BLANK_FIXTURE, dtype=np.int8),
+                  "team_difficulty": np.full((n_teams, n_gameweeks), BLANK_FIXTURE, dtype=np.int8),
+                  "opponent_difficulty": np.full((n_teams, n_gameweeks), BLANK_FIXTURE, dtype=np.int8),
+                  "kickoff_time": np.full((n_teams, n_gameweeks), np.iinfo(np.int64).min, dtype=np.int64),
+                  "fixture_count": np.zeros((n_teams, n_gameweeks), dtype=np.int8)}
+        arrays["opponent"][cells] = opponent[rows]
+        arrays["is_home"][cells] = home[rows]
+        arrays["team_difficulty"][cells] = team_difficulty[rows]
+        arrays["opponent_difficulty"][cells] = opponent_difficulty[rows]
+        arrays["kickoff_time"][cells] = kickoff[rows]
+        arrays["fixture_count"][:] = np.bincount(team * n_gameweeks + gameweek,
+                                                 minlength=n_teams * n_gameweeks).reshape(n_teams, n_gameweeks)
+        self._fixture_arrays = arrays
+
+    def get_fixture_arrays(self):
+        """
+        Returns the dense fixture arrays of the season, each of shape (max team id + 1, last gameweek + 1) and indexed
+        as array[team_id, gameweek].
+
+        Returns:
+            dict: The arrays "opponent", "is_home", "team_difficulty", "opponent_difficulty" (all -1 in a blank
+            gameweek), "kickoff_time" (int64 nanoseconds, the minimum int64 in a blank gameweek) and
+            "fixture_count" (2 in a double gameweek).
+        """
+        if self._fixture_arrays is None:
+            self._build_fixture_arrays()
+        return self._fixture_arrays
+
+    def lookup_fixtures(self, team_ids, gameweeks):
+        """
+        Looks up the fixture of each (team id, gameweek) pair, e.g. the team and GW columns of a gameweek table.
+
+        Args:
+            team_ids (array-like): Team ids.
+            gameweeks (array-like): Gameweeks, of the same length as team_ids or a single gameweek.
 
+        Returns:
+            pd.DataFrame: One row per pair with the columns team_id, GW, opponent_team, is_home, team_difficulty,
+            opponent_difficulty, favourite_to_win, kickoff_time and fixture_count.
+        """
+        arrays = self.get_fixture_arrays()
+        team_ids, gameweeks = np.broadcast_arrays(np.asarray(team_ids, dtype=np.int64),
+                                                  np.asarray(gameweeks, dtype=np.int64))
+        cells = (team_ids, gameweeks)
+        team_difficulty = arrays["team_difficulty"][cells]
+        opponent_difficulty = arrays["opponent_difficulty"][cells]
+        return pd.DataFrame({"team_id": team_ids,
+                             "GW": gameweeks,
+                             "opponent_team": arrays["opponent"][cells],
+                             "is_home": arrays["is_home"][cells],
+                             "team_difficulty": team_difficulty,
+                             "opponent_difficulty": opponent_difficulty,
+                             "favourite_to_win": team_difficulty < opponent_difficulty,
+                             "kickoff_time": arrays["kickoff_time"][cells],
+                             "fixture_count": arrays["fixture_count"][cells]})
 
+    def get_fixture_grid(self, team_ids=None, gameweeks=None):
+        """
+        Looks up the fixtures of every team over many gameweeks, with one row per (team id, gameweek).
 
+        Args:
+            team_ids (array-like, optional): Team ids. Defaults to every team in teams.csv.
+            gameweeks (array-like, optional): Gameweeks. Defaults to every gameweek of the season.
 
+        Returns:
+            pd.DataFrame: As lookup_fixtures, ordered by team id then gameweek.
+        """
+        if team_ids is None:
+            team_ids = self.get_teams()["id"].to_numpy()
+        if gameweeks is None:
+            gameweeks = np.arange(1, self.get_fixture_arrays()["opponent"].shape[1])
+        team_grid, gameweek_grid = np.meshgrid(np.asarray(team_ids), np.asarray(gameweeks), indexing="ij")
+        return self.lookup_fixtures(team_grid.ravel(), gameweek_grid.ravel())
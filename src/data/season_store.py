@@ -0,0 +1,172 @@
+"""
+season_store.py
+This module provides a typed, columnar copy of each season's merged gameweek table so that it does not need to be
+parsed from CSV every time a PlayerData object is created (which happens in every worker process of the experiments).
+
+The merged gameweeks CSV is converted once into an uncompressed Arrow/Feather file next to it. Uncompressed Feather
+files can be memory-mapped, so opening a season only maps the file and reads the column metadata rather than parsing
+text. If pyarrow is not installed, or the Feather file is missing or older than the CSV, the CSV is read instead.
+
+Functions
+convert_season_to_feather(season: str) -> str:
+Converts the merged gameweeks CSV of a season into a Feather file and returns its path.
+
+is_feather_up_to_date(season: str) -> bool:
+Checks that the Feather file of a season exists and is newer than the CSV it was made from.
+
+read_merged_gameweeks(season: str, columns: list = None) -> pd.DataFrame:
+Reads the merged gameweeks table of a season, or only some of its columns, memory-mapping the Feather file if possible and falling back to the CSV.
+Both are typed using the schema in schema.py.
+
+sort_gameweeks(df: pd.DataFrame) -> pd.DataFrame:
+Sorts a season's gameweek table so each gameweek, and each position within a gameweek, is a contiguous block of rows.
+
+build_gameweek_offsets(df: pd.DataFrame) -> Tuple[dict, dict]:
+Finds the (start, stop) rows of each gameweek and each (gameweek, position) block of a sorted gameweek table.
+
+Usage
+Run the script to convert every season:
+$ python season_store.py
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from src.data.schema import read_gameweeks_csv, report_memory_usage
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional, the CSV files are always available
+    feather = None
+
+data_directory_location = str(Path(__file__).parent) + '/../../data/'
+seasons = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+
+MERGED_GW_CSV = "gws/merged_gw2.csv"
+MERGED_GW_FEATHER = "gws/merged_gw2.feather"
+
+
+def _csv_path(season):
+    return data_directory_location + season + "/" + MERGED_GW_CSV
+
+
+def _feather_path(season):
+    return data_directory_location + season + "/" + MERGED_GW_FEATHER
+
+
+def convert_season_to_feather(season):
+    """
+    Converts the merged gameweeks CSV of a season into an uncompressed Feather file so it can be memory-mapped.
+
+    Args:
+        season (str): The season to convert, e.g. "2021-22".
+
+    Returns:
+        str: The path of the Feather file written.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required to convert the merged gameweeks to Feather")
+
+    df = read_gameweeks_csv(_csv_path(season))
+    path = _feather_path(season)
+    # compression has to be off for the file to be memory-mapped rather than decompressed into memory
+    feather.write_feather(df, path, compression="uncompressed")
+    print(f"Feather file made for season {season} at {path}")
+    return path
+
+
+def is_feather_up_to_date(season):
+    """
+    Checks that the Feather file of a season exists and has not been made stale by a newer CSV.
+
+    Args:
+        season (str): The season to check.
+
+    Returns:
+        bool: True if the Feather file can be used in place of the CSV.
+    """
+    feather_path = _feather_path(season)
+    if feather is None or not os.path.exists(feather_path):
+        return False
+    csv_path = _csv_path(season)
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(feather_path):
+        return False
+    return True
+
+
+def read_merged_gameweeks(season, columns=None):
+    """
+    Reads the merged gameweeks table of a season. The Feather file is memory-mapped if it is up to date, otherwise the
+    CSV is parsed.
+
+    Args:
+        season (str): The season to read.
+        columns (list, optional): Only read these columns. Defaults to reading all columns.
+
+    Returns:
+        pd.DataFrame: The merged gameweeks table for the season, typed as in schema.py.
+    """
+    if is_feather_up_to_date(season):
+        table = feather.read_table(_feather_path(season), columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    return read_gameweeks_csv(_csv_path(season), columns)
+
+
+def sort_gameweeks(df):
+    """
+    Sorts a season's gameweek table by GW then position, so each gameweek, and each position within a gameweek, is a
+    contiguous block of rows. The sort is stable so rows keep their original order within a block.
+
+    Args:
+        df (pd.DataFrame): A season's gameweek table.
+
+    Returns:
+        pd.DataFrame: The sorted table.
+    """
+    return df.sort_values(["GW", "position"], kind="mergesort")
+
+
+def build_gameweek_offsets(df):
+    """
+    Finds the (start, stop) row numbers of each gameweek, and of each position within each gameweek, in a table sorted
+    by sort_gameweeks. Slicing the table with df.iloc[start:stop] then gives the block without copying it.
+
+    Args:
+        df (pd.DataFrame): A season's gameweek table, sorted by GW then position.
+
+    Returns:
+        Tuple[dict, dict]: A dictionary of gameweek to (start, stop), and a dictionary of (gameweek, position) to
+        (start, stop).
+    """
+    gameweeks = df["GW"].to_numpy()
+    positions = df["position"].to_numpy()
+
+    # row numbers where a new gameweek block begins
+    gw_starts = np.flatnonzero(np.r_[True, gameweeks[1:] != gameweeks[:-1]])
+    gw_stops = np.r_[gw_starts[1:], len(df)]
+    gw_offsets = {gameweeks[start]: (start, stop) for start, stop in zip(gw_starts, gw_stops)}
+
+    # row numbers where a new gameweek or position block begins
+    pos_starts = np.flatnonzero(np.r_[True, (gameweeks[1:] != gameweeks[:-1]) | (positions[1:] != positions[:-1])])
+    pos_stops = np.r_[pos_starts[1:], len(df)]
+    gw_pos_offsets = {(gameweeks[start], positions[start]): (start, stop)
+                      for start, stop in zip(pos_starts, pos_stops) if isinstance(positions[start], str)}
+
+    return gw_offsets, gw_pos_offsets
+
+
+if __name__ == "__main__":
+    tables = {}
+    for season in seasons:
+        if os.path.exists(_csv_path(season)):
+            convert_season_to_feather(season)
+            tables[season] = read_merged_gameweeks(season)
+        else:
+            print(f"No merged gameweeks file for season {season}")
+    report_memory_usage(tables)
@@ -12,26 +12,24 @@ Determine if a team is playing at home for a specific gameweek.
 Get the opponent's team ID for a specific gameweek.
 Get the opponent's team name for a specific gameweek.
 Determine if a team is the favorite to win a specific gameweek's match.
+
+The per-gameweek questions are answered from the fixture arrays of SeasonData, which are built once per season. Pass
+a shared SeasonData object when creating TeamData objects for several teams so that they share these arrays.
 """
 
 
-import pandas as pd
-from season_data import SeasonData
+from src.data.season_data import SeasonData, BLANK_FIXTURE
+
 
 class TeamData:
-    def __init__(self, team_id, season):
+    def __init__(self, team_id, season, season_data=None):
         print("placeholder")
-        self._data_location = '../../data/' + season + "/"
         self._season = season
         self._team_id = team_id
-        self._season_data = SeasonData(season)
+        self._season_data = season_data if season_data is not None else SeasonData(season)
 
     def get_team_name(self):
-        path = self._data_location + 'teams.csv'
-        df = pd.read_csv(path)
-        team = df[(df["id"] == self._team_id)]
-        return team["name"].tolist()[0]
-
+        return self._season_data.get_team_names()[self._team_id]
 
     def get_team_fixtures(self):
         df = self._season_data.get_fixtures()
@@ -43,39 +41,22 @@ class TeamData:
         fixture = df[df["event"] == gameweek]
         return fixture
 
+    def _get_fixture_value(self, array_name, gameweek):
+        arrays = self._season_data.get_fixture_arrays()
+        if arrays["opponent"][self._team_id, gameweek] == BLANK_FIXTURE:
+            raise ValueError(f"Team {self._team_id} has no fixture in gameweek {gameweek} of season {self._season}")
+        return arrays[array_name][self._team_id, gameweek]
+
     def is_home(self, gameweek):
-        game = self.get_gameweek_fixture(gameweek)
-        if game["team_h"].tolist()[0] == self._team_id:
-            return True
-        else:
-            return False
+        return bool(self._get_fixture_value("is_home", gameweek))
 
     def get_opponent_id(self, gameweek):
-        game = self.get_gameweek_fixture(gameweek)
-        if self.is_home(gameweek):
-            opponent_id = game["team_a"].tolist()[0]
-        else:
-            opponent_id = game["team_h"].tolist()[0]
-        return opponent_id
+        return int(self._get_fixture_value("opponent", gameweek))
 
     def get_opponent_name(self, gameweek):
-        path = self._data_location + 'teams.csv'
-        df = pd.read_csv(path)
-        opponent_id = self.get_opponent_id(gameweek)
-        team = df[(df["id"] == opponent_id)]
-        opponent_name = team["name"].tolist()[0]
-        return opponent_name
+        return self._season_data.get_team_names()[self.get_opponent_id(gameweek)]
 
     def favourite_to_win(self, gameweek):
-        game = self.get_gameweek_fixture(gameweek)
-        if self.is_home(gameweek):
-            team_difficulty = game["team_h_difficulty"].tolist()[0]
-            opponent_difficulty = game["team_a_difficulty"].tolist()[0]
-        else:
-            opponent_difficulty = game["team_h_difficulty"].tolist()[0]
-            team_difficulty = game["team_a_difficulty"].tolist()[0]
-
-        if team_difficulty < opponent_difficulty:
-            return True
-        else:
-            return False
+        team_difficulty = self._get_fixture_value("team_difficulty", gameweek)
+        opponent_difficulty = self._get_fixture_value("opponent_difficulty", gameweek)
+        return bool(team_difficulty < opponent_difficulty)
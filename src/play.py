@@ -3,7 +3,8 @@ play.py: A script to simulate a fantasy football team's performance throughout a
 
 The script uses linear programming to create an initial team and then simulates their performance
 over the season, making transfers and captains based on the 'predicted_points' variable and simulating
-the automatic changes an FPL team makes throughout the season.
+the automatic changes an FPL team makes throughout the season. The predicted points are scored by the
+standard models saved by parameterised_model.py (see predict_points.py).
 
 Usage:
     Run the script using the command: python play.py
@@ -11,20 +12,24 @@ Usage:
 Dependencies:
     - notebooks.calculate_performance
     - notebooks.pick_team_lp
-    - src.data.player_data
+    - src.data.season_catalog
 """
 
 from src.utils.calculate_performance import calculate_teams_performance
 from src.analysis.pick_team_lp import make_initial_team_lp, get_selected_players_gw_one_data
-from src.data.player_data import PlayerData
+from src.data.season_catalog import SeasonCatalog
 
 if __name__ == '__main__':
-    # Get initial, unordered team from linear programming and left over budget
+    # Load the season once for both picking the team and simulating it
     season = "2021-22"
-    selected_player_names, left_over_budget = make_initial_team_lp(season)
+    catalog = SeasonCatalog([season])
+
+    # Get initial, unordered team from linear programming and left over budget
+    selected_player_names, left_over_budget = make_initial_team_lp(season, catalog)
 
-    # Add data from gameweek 1 for each player
-    player_data = PlayerData(season)
+    # Add data from gameweek 1 for each player, with the points predicted by the standard models in the model store
+    player_data = catalog.get_player_data(season)
+    player_data.attach_predicted_points("standard")
     selected_players_df = get_selected_players_gw_one_data(player_data, selected_player_names)
 
     # Simulate season
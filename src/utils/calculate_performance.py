@@ -73,12 +73,12 @@ def calculate_players_performance_random(player_data: PlayerData, initial_player
     for gameweek in gameweeks:
         # Obtain a dataframe of all players for that gameweek
         if transfers:
-            all_players_df = player_data.get_position_players_gw_stats(gameweek, position)[['name', 'total_points',
-                                                                                            'position', 'GW',
-                                                                                            parameter]]
+            all_players_df = player_data.get_position_players_gw_stats(gameweek, position,
+                                                                        ['name', 'total_points', 'position', 'GW',
+                                                                         parameter])
         else:
-            all_players_df = player_data.get_position_players_gw_stats(gameweek, position)[['name', 'total_points',
-                                                                                            'position', 'GW']]
+            all_players_df = player_data.get_position_players_gw_stats(gameweek, position,
+                                                                        ['name', 'total_points', 'position', 'GW'])
 
         players_df = update_players_stats(players_df, all_players_df)
 
@@ -148,10 +148,9 @@ def calculate_teams_performance(player_data: PlayerData, initial_players_df, var
     # For each gameweek, make a transfer if specified, and update points
     for gameweek in gameweeks:
         # obtain a dataframe of all players for that gameweek
-        all_players_df = player_data.get_all_players_gw_stats(gameweek)[
-            ['name', 'minutes', 'kickoff_time', 'total_points',
-             'position', 'GW', 'value', "team",
-             variable]]
+        all_players_df = player_data.get_all_players_gw_stats(gameweek,
+                                                              ['name', 'minutes', 'kickoff_time', 'total_points',
+                                                               'position', 'GW', 'value', "team", variable])
 
         # Update stats for players in gameweek
         players_df = update_players_stats(players_df, all_players_df)
@@ -206,6 +205,9 @@ def create_condition(parameter, operator, value, players_df):
             value = players_df[parameter].max()
         elif value == "lowest":
             value = players_df[parameter].min()
+        # float32 columns print rounded, so write the value out in full to compare against it exactly
+        if isinstance(value, np.floating):
+            value = repr(float(value))
     condition = parameter + operator + str(value)
     return condition
 
@@ -1,10 +1,58 @@
-
-
-
+from collections import OrderedDict
 
 
 def check_team_size(players_df, initial_players_df):
     if players_df.shape[0] != initial_players_df.shape[0]:
         raise ValueError(f"""Final team does not have correct amount of players. Something has gone wrong.
                              Number of players has been changed from {initial_players_df.shape[0]} to {players_df.shape[0]} 
-                             {print(players_df)}""")
\ No newline at end of file
+                             {print(players_df)}""")
+
+
+class LRUCache:
+    """
+    A bounded least recently used cache. Once it holds `capacity` entries, adding a new entry evicts the entry that
+    has gone unused for longest. Counts hits and misses so the cache size can be tuned.
+
+    Args:
+        capacity (int): The maximum number of entries held. Must be at least 1.
+    """
+
+    def __init__(self, capacity=128):
+        if capacity < 1:
+            raise ValueError(f"Cache capacity must be at least 1, not {capacity}")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "capacity": self.capacity}
+
+    def items(self):
+        # a snapshot of the entries, least recently used first, which does not count as using them
+        return list(self._entries.items())
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
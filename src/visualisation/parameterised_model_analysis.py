@@ -1,10 +1,10 @@
-import pickle
 import matplotlib.pyplot as plt
 
-# access results from pickle file, so I don't need to run this file over and over as it takes a very long time.
-# rb means read byte for faster access
-pickle_in = open("model_results_dict.pickle", "rb")
-results_dict = pickle.load(pickle_in)
+from src.analysis.model_store import load_latest_artifact
+
+# access the results of the most recently trained standard models from the model store, so I don't need to train them
+# over and over. The artifacts are arrays, so they load without unpickling the models
+results_dict = {position: load_latest_artifact("standard", position) for position in ["fwd", "mid", "def", "gk"]}
 
 print(results_dict)
 
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from src.data import season_store
+from src.data.create_test_and_train import POSITIONS, make_splits
+from src.data.season_catalog import SeasonCatalog
+
+SEASONS = ["2018-19", "2019-20", "2020-21", "2021-22"]
+
+
+@pytest.fixture
+def data_location(tmp_path, monkeypatch):
+    # each season's merged gameweeks are out of gameweek order, as some of the training seasons' files are, with every
+    # position in every gameweek
+    for season_number, season in enumerate(SEASONS):
+        rows = []
+        for gameweek in [3, 1, 2]:
+            for position in ["MID", "GK", "FWD", "DEF", "MID", "FWD"]:
+                element = len(rows) + 1
+                rows.append({"name": f"Player_{season_number}_{element}", "position": position, "team": "Arsenal",
+                             "element": element, "GW": gameweek, "kickoff_time": f"2021-08-{10 + gameweek}T14:00:00Z",
+                             "total_points": element % 7, "was_home": element % 2 == 0})
+        (tmp_path / season / "gws").mkdir(parents=True)
+        pd.DataFrame(rows).to_csv(tmp_path / season / "gws" / "merged_gw2.csv", encoding="utf-8-sig", index=False)
+    monkeypatch.setattr(season_store, "data_directory_location", str(tmp_path) + "/")
+    return tmp_path
+
+
+def test_splits_keep_the_order_of_the_season_files(data_location):
+    splits = make_splits(SeasonCatalog(SEASONS))
+
+    # the splits as made before the catalog, each split's season files concatenated and masked by position
+    split_seasons = {"train": ["2018-19", "2019-20"], "validation": ["2020-21"], "test": ["2021-22"]}
+    for split, seasons in split_seasons.items():
+        split_df = pd.concat([pd.read_csv(data_location / season / "gws" / "merged_gw2.csv", encoding="utf-8-sig")
+                              for season in seasons])
+        for position_column, position in POSITIONS.items():
+            baseline_df = split_df[split_df["position"] == position_column]
+            assert splits[(split, position)]["name"].astype(str).tolist() == baseline_df["name"].tolist()
+            assert splits[(split, position)]["GW"].tolist() == baseline_df["GW"].tolist()
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.add_to_cleaned_players import calculate_initial_costs, convert_to_positions
+from src.data.add_to_merged_gameweeks import add_won_game_to_gameweeks, calculate_recent_stats, make_player_names
+
+
+# the row-wise versions these functions replaced, kept here to check the vectorised ones give the same results
+def old_calculate_won_game(row):
+    if row['team_h_score'] > row['team_a_score']:
+        if row['was_home']:
+            return 1
+        else:
+            return 0
+    if row['team_h_score'] < row['team_a_score']:
+        if row['was_home']:
+            return 0
+        else:
+            return 1
+    return 0
+
+
+def old_convert_to_position(row):
+    if row['element_type'] == 1:
+        return 'GK'
+    elif row['element_type'] == 2:
+        return 'DEF'
+    elif row['element_type'] == 3:
+        return 'MID'
+    elif row['element_type'] == 4:
+        return 'FWD'
+    else:
+        return 'N/A'
+
+
+# the loop over gameweek subsets calculate_recent_stats replaced, for one column
+def old_add_recent_stats(gameweeks_df, column_name):
+    gameweeks = sorted(gameweeks_df['GW'].unique())
+    to_merge_df_list = []
+
+    first_to_merge_df = gameweeks_df.loc[gameweeks_df['GW'] == 1]
+    first_to_merge_df = first_to_merge_df[['name', 'GW']].copy()
+    first_to_merge_df['recent_' + column_name] = 0
+    to_merge_df_list.append(first_to_merge_df)
+
+    gameweek_subsets = [[1], [1, 2], [1, 2, 3], [1, 2, 3, 4]]
+    for i in range(0, len(gameweeks) - 5, 1):
+        gameweek_subsets.append(gameweeks[i:i + 5])
+    for subset in gameweek_subsets:
+        subset_df = gameweeks_df[gameweeks_df['GW'].isin(subset)]
+        df_totals = subset_df.groupby('name')[column_name].sum().to_frame(name='recent_' + column_name)
+        df_totals = df_totals.reset_index()
+        df_totals["GW"] = gameweeks[gameweeks.index(subset[len(subset) - 1]) + 1]
+        to_merge_df_list.append(df_totals)
+
+    to_merge_df = pd.concat(to_merge_df_list)
+    return pd.merge(gameweeks_df, to_merge_df, on=["name", "GW"], how="left")
+
+
+@pytest.fixture
+def recent_gameweeks_df():
+    # seven gameweeks, so the last two windows are full. a plays every gameweek and twice in gameweek 3, b misses
+    # gameweeks 3 to 5 and c first plays in gameweek 4, so has no rows in some windows
+    games = [('a', gw) for gw in [1, 2, 3, 3, 4, 5, 6, 7]] + [('b', gw) for gw in [1, 2, 6, 7]] + \
+        [('c', gw) for gw in [4, 5, 6, 7]]
+    games = sorted(games, key=lambda game: game[1])
+    return pd.DataFrame({
+        'name': [name for name, _ in games],
+        'GW': [gw for _, gw in games],
+        'total_points': [(3 * i) % 11 - 1 for i in range(len(games))],
+        'creativity': [round(0.7 * i, 1) for i in range(len(games))]
+    })
+
+
+@pytest.fixture
+def gameweeks_df():
+    # home and away wins, losses and draws for home and away players, and games without scores
+    return pd.DataFrame({
+        'name': ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h'],
+        'was_home': [True, False, True, False, True, False, True, False],
+        'team_h_score': [2, 2, 0, 0, 1, 1, np.nan, np.nan],
+        'team_a_score': [1, 1, 3, 3, 1, 1, np.nan, 2]
+    })
+
+
+@pytest.fixture
+def players_df():
+    # an id left missing by the merge with player_idlist.csv, and unknown and missing element types
+    return pd.DataFrame({
+        'first_name': ['Mohamed', 'Ben', 'Ben', 'Hugo', 'Jo'],
+        'second_name': ['Salah', 'Davies', 'Davies', 'Lloris', 'Nobody'],
+        'id': [233, 220, 595, 310, np.nan],
+        'element_type': [3, 2, 2, 1, np.nan],
+        'now_cost': [130, 45, 50, np.nan, 40],
+        'cost_change_start': [5, -5, 0, 2, np.nan],
+        'total_points': [265, 40, 12, 120, 0]
+    })
+
+
+def test_won_game_matches_apply(gameweeks_df):
+    expected = gameweeks_df.apply(lambda row: old_calculate_won_game(row), axis=1)
+    won_game = add_won_game_to_gameweeks(gameweeks_df.copy())['won_game']
+    pd.testing.assert_series_equal(won_game, expected, check_names=False)
+    assert won_game.tolist() == [1, 0, 0, 1, 0, 0, 0, 0]
+
+
+def test_won_game_accepts_was_home_as_integers(gameweeks_df):
+    # was_home is 1/0 in the test and train splits
+    int_df = gameweeks_df.assign(was_home=gameweeks_df['was_home'].astype('int8'))
+    expected = add_won_game_to_gameweeks(gameweeks_df.copy())['won_game']
+    pd.testing.assert_series_equal(add_won_game_to_gameweeks(int_df)['won_game'], expected)
+
+
+def test_recent_stats_match_subset_loop(recent_gameweeks_df):
+    column_names = ['total_points', 'creativity']
+    recent_df = calculate_recent_stats(recent_gameweeks_df, column_names)
+    for column_name in column_names:
+        expected = old_add_recent_stats(recent_gameweeks_df, column_name)['recent_' + column_name]
+        pd.testing.assert_series_equal(recent_df['recent_' + column_name], expected, check_dtype=False)
+    assert recent_df['recent_total_points'].isna().any()
+
+
+def test_positions_match_apply(players_df):
+    players_df = pd.concat([players_df, players_df.head(1).assign(element_type=5)], ignore_index=True)
+    expected = players_df.apply(lambda row: old_convert_to_position(row), axis=1)
+    pd.testing.assert_series_equal(convert_to_positions(players_df['element_type']), expected, check_names=False)
+
+
+def test_initial_costs_match_apply(players_df):
+    expected = players_df.apply(lambda row: row['now_cost'] - row['cost_change_start'], axis=1)
+    pd.testing.assert_series_equal(calculate_initial_costs(players_df), expected, check_names=False)
+
+
+def test_player_names_match_apply(players_df):
+    expected = players_df.apply(lambda row: row["first_name"] + "_" + row["second_name"], axis=1)
+    pd.testing.assert_series_equal(make_player_names(players_df, with_id=False), expected, check_names=False)
+
+    expected = players_df.apply(lambda row: row['first_name'] + '_' + row['second_name'] + '_' + str(row['id']), axis=1)
+    pd.testing.assert_series_equal(make_player_names(players_df, with_id=True), expected, check_names=False)
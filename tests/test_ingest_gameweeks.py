@@ -0,0 +1,49 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.data import ingest_gameweeks
+from src.data.manifest import hash_file
+
+REPO_DATA = Path(__file__).parent.parent / "data"
+
+
+def _write_gameweek_files(gws_location):
+    # gameweek 2 has a match not yet played, so its scores are missing and the merged scores are read as float
+    gws_location.mkdir(parents=True)
+    (gws_location / "gw1.csv").write_text("name,round,team_a_score,team_h_score,xP\n"
+                                          "Bernd_Leno_1,1,2,0,0\n"
+                                          "Rob_Holding_2,1,2,0,0.0\n", encoding="utf-8")
+    (gws_location / "gw2.csv").write_text("name,round,team_a_score,team_h_score,xP\n"
+                                          "Bernd_Leno_1,2,,,1.5\n", encoding="utf-8")
+
+
+@pytest.fixture
+def data_location(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_gameweeks, "data_directory_location", str(tmp_path) + "/")
+    return tmp_path
+
+
+def test_merged_csv_keeps_the_values_of_the_gameweek_files(data_location):
+    _write_gameweek_files(data_location / "2021-22" / "gws")
+    ingest_gameweeks.ingest_season("2021-22")
+
+    merged_path = data_location / "2021-22" / ingest_gameweeks.MERGED_GW_RAW_CSV
+    assert merged_path.read_bytes() == ("\ufeffname,round,team_a_score,team_h_score,xP,GW\n"
+                                        "Bernd_Leno_1,1,2,0,0,1\n"
+                                        "Rob_Holding_2,1,2,0,0.0,1\n"
+                                        "Bernd_Leno_1,2,,,1.5,2\n").encode("utf-8")
+
+
+def test_rebuilding_an_unchanged_season_gives_the_same_bytes(data_location):
+    # 2019-20 has gameweeks with missing scores, which pandas would write back as 5.0 rather than 5
+    season = "2019-20"
+    shutil.copytree(REPO_DATA / season / "gws", data_location / season / "gws",
+                    ignore=shutil.ignore_patterns("merged_gw*"))
+    merged_path = str(data_location / season / ingest_gameweeks.MERGED_GW_RAW_CSV)
+
+    ingest_gameweeks.ingest_season(season, force=True)
+    assert hash_file(merged_path) == hash_file(str(REPO_DATA / season / ingest_gameweeks.MERGED_GW_RAW_CSV))
+    ingest_gameweeks.ingest_season(season, force=True)
+    assert hash_file(merged_path) == hash_file(str(REPO_DATA / season / ingest_gameweeks.MERGED_GW_RAW_CSV))
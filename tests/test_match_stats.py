@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from src.data.match_stats import (join_understat_features, join_understat_to_gameweeks, read_id_dict,
+                                  read_match_stats)
+
+
+def _gameweeks_of_2021_22(understat_df, n_rows):
+    # gameweek rows of the first players of id_dict.csv on the days of their understat matches, at 15:00 in England
+    id_dict = read_id_dict("2021-22")
+    # the understat files also hold matches of earlier seasons
+    matches = understat_df[understat_df["date"] >= "2021-08-01"].merge(id_dict, on="understat_id").head(n_rows)
+    kickoff_times = (matches["date"].dt.normalize() + pd.Timedelta(hours=15)).dt.tz_localize("Europe/London")
+    return pd.DataFrame({"name": "player", "GW": 1, "element": matches["element"].to_numpy(),
+                         "kickoff_time": kickoff_times.dt.tz_convert("UTC").dt.strftime("%Y-%m-%dT%H:%M:%SZ")})
+
+
+def test_season_without_understat_files_gives_missing_columns():
+    gameweeks_df = pd.DataFrame({"element": [1, 2], "kickoff_time": ["2016-08-13T14:00:00Z", "2016-08-13T14:00:00Z"]})
+    joined_df = join_understat_to_gameweeks(gameweeks_df, "2016-17", ["xG", "shots"])
+    assert joined_df["understat_xG"].isna().all() and joined_df["understat_shots"].isna().all()
+    assert joined_df["understat_xG"].dtype == np.float32
+
+
+def test_join_understat_features_joins_each_season():
+    understat_df = read_match_stats("2021-22", "understat")
+    gameweeks_df = pd.concat([_gameweeks_of_2021_22(understat_df, 5),
+                              pd.DataFrame({"name": "player", "GW": 1, "element": [1],
+                                            "kickoff_time": ["2016-08-13T14:00:00Z"]})], ignore_index=True)
+
+    joined_df = join_understat_features(gameweeks_df, ["understat_xG", "recent_assists"])
+    expected = join_understat_to_gameweeks(gameweeks_df.iloc[:5], "2021-22", ["xG"], understat_df)["understat_xG"]
+    assert expected.notna().all()
+    np.testing.assert_array_equal(joined_df["understat_xG"].iloc[:5], expected)
+    assert np.isnan(joined_df["understat_xG"].iloc[5])
+    assert "recent_assists" not in joined_df.columns
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from src.data import season_store
+from src.data.player_data import PlayerData
+
+
+@pytest.fixture
+def player_data(tmp_path, monkeypatch):
+    # a small merged gameweek table, read in place of the season's merged_gw2.csv. Bernd Leno (id 1) plays three
+    # games and Rúnar Alex Rúnarsson (id 2) plays one, so the player before Rúnarsson in the index has games
+    gameweeks_df = pd.DataFrame({
+        "name": ["Bernd_Leno_1", "Rúnar Alex_Rúnarsson_2", "Bernd_Leno_1", "Bernd_Leno_1"],
+        "position": ["GK", "GK", "GK", "GK"],
+        "element": [1, 2, 1, 1],
+        "kickoff_time": ["2021-08-13T19:00:00Z", "2021-08-13T19:00:00Z", "2021-08-22T15:30:00Z",
+                         "2021-08-28T11:30:00Z"],
+        "GW": [1, 1, 2, 3],
+        "total_points": [2, 6, 3, 1],
+        "was_home": [False, False, True, False]
+    })
+    (tmp_path / "2021-22" / "gws").mkdir(parents=True)
+    gameweeks_df.to_csv(tmp_path / "2021-22" / "gws" / "merged_gw2.csv", encoding="utf-8-sig", index=False)
+    monkeypatch.setattr(season_store, "data_directory_location", str(tmp_path) + "/")
+    return PlayerData("2021-22")
+
+
+def test_game_week_below_one_raises(player_data):
+    for game_week in [0, -1]:
+        with pytest.raises(ValueError, match="game_week"):
+            player_data.get_players_game_stats([("Rúnar Alex", "Rúnarsson")], game_week)
+
+
+def test_player_with_fewer_games_gets_their_last_game(player_data):
+    games_df = player_data.get_players_game_stats([("Bernd", "Leno"), ("Rúnar Alex", "Rúnarsson")], 3)
+    assert games_df["element"].tolist() == [1, 2]
+    assert games_df["total_points"].tolist() == [1, 6]
+    assert player_data.get_player_points_earned("Rúnar Alex", "Rúnarsson", 2) == 6
+    assert player_data.get_player_points_earned("Bernd", "Leno", 2) == 3
+
+
+def test_projections_are_bounded(player_data):
+    columns = ["name", "GW", "total_points", "was_home", "element"]
+    # every ordering of three columns is a different projection
+    projections = [[first, second, third] for first in columns for second in columns for third in columns
+                   if len({first, second, third}) == 3]
+    for projection in projections:
+        assert list(player_data.get_all_players_gw_stats(1, projection).columns) == projection
+    tables = player_data.get_memory_usage()
+    assert len(tables) == 1 + PlayerData._projection_cache_size
+    assert "merged_gw" + str(projections[-1]) in tables
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn import preprocessing
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.model_selection import GridSearchCV
+
+from src.analysis.parameterised_model import data_location, lasso_alphas, variables_dict
+from src.analysis.regularisation_path import (fit_lasso_cv, fit_ridge_cv, lasso_cv_scores, lasso_grid_scores,
+                                              ridge_cv_scores, select_alpha)
+from src.data.schema import read_gameweeks_csv
+
+
+@pytest.fixture
+def regression_data():
+    # a few informative variables among noisy ones, as in the position models
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = X @ np.array([1.5, 0.0, -0.7, 0.05, 0.0, 0.3]) + rng.normal(scale=2.0, size=300)
+    return X, y
+
+
+def test_select_alpha_takes_first_best():
+    assert select_alpha([0.1, 0.2, 0.3], [0.5, 0.7, 0.7]) == 0.2
+
+
+def test_ridge_matches_grid_search(regression_data):
+    X, y = regression_data
+    alphas = np.arange(1, 320, 1)
+    grid = GridSearchCV(Ridge(), {"alpha": alphas}).fit(X, y)
+
+    np.testing.assert_allclose(ridge_cv_scores(X, y, alphas), grid.cv_results_["mean_test_score"], rtol=0, atol=1e-12)
+    model, _ = fit_ridge_cv(X, y, alphas)
+    assert model.alpha == grid.best_params_["alpha"]
+
+
+def test_lasso_matches_grid_search(regression_data):
+    X, y = regression_data
+    alphas = np.arange(0.001, 0.2, 0.001)
+    grid = GridSearchCV(Lasso(), {"alpha": alphas}).fit(X, y)
+
+    assert np.array_equal(lasso_grid_scores(X, y, alphas[::20]), grid.cv_results_["mean_test_score"][::20])
+    model, curve = fit_lasso_cv(X, y, alphas)
+    assert model.alpha == grid.best_params_["alpha"]
+    assert len(curve) == len(alphas)
+
+
+@pytest.mark.skipif(not os.path.exists(data_location + "fwds_train.csv"), reason="fwds_train.csv has not been made")
+def test_lasso_matches_grid_search_where_the_path_does_not():
+    # on these rows the best alpha of the converged path is one step from GridSearchCV's choice
+    train_df = read_gameweeks_csv(data_location + "fwds_train.csv").dropna(subset=variables_dict["fwd"]).iloc[:5000]
+    X = preprocessing.StandardScaler().fit_transform(train_df[variables_dict["fwd"]].astype(np.float64))
+    y = train_df["total_points"].to_numpy(dtype=np.float64)
+    grid = GridSearchCV(Lasso(), {"alpha": lasso_alphas}).fit(X, y)
+    assert select_alpha(lasso_alphas, lasso_cv_scores(X, y, lasso_alphas)) != grid.best_params_["alpha"]
+
+    model, _ = fit_lasso_cv(X, y, lasso_alphas)
+    assert model.alpha == grid.best_params_["alpha"]